@@ -8,13 +8,222 @@ from PyQt5.QtWidgets import *
 import pyqtgraph as pg
 import numexpr as ne
 import mandelbrotTiled
+import mandelbrotCache
 import utils
-import threading
 import PGViewer
+import mandelbrotDeep
+import mandelbrotBuddha
+import sys
+import threading
+sys.path.append( "./cython")
+try: 
+    import mandelbrotCython
+    cythonOK = True
+except: 
+    cythonOK = False
+try: 
+    import mandelbrotNumba
+    numbaOK = True
+except: 
+    numbaOK = False
 
 LOG_HELPER = 0.001
-NROW = 5
-NCOL = 5
+#
+# float64 pixelates, if the pixel spacing is less than 
+# FLOAT64_SPACING_LIMIT * eps * max( |cx|, |cy|, 1)
+#
+FLOAT64_SPACING_LIMIT = 8.
+#
+# the same for double-double, beyond that: perturbation
+#
+DD_EPS = 2.**-104
+#
+# float32 is safe, if the pixel spacing is larger than 
+# FLOAT32_SPACING_LIMIT * eps32 * max( |cx|, |cy|, 1) and maxIter is
+# not larger than FLOAT32_MAX_ITER. The float32 orbits drift apart from 
+# the float64 orbits, the longer they are the more escape counts differ
+#
+FLOAT32_SPACING_LIMIT = 256.
+FLOAT32_MAX_ITER = 1024
+#
+# Numpy/Numexpr: iterations per numexpr call, the bounded pixels are 
+# compacted after each block. The numexpr compile time grows exponentially 
+# with the nesting, 16 takes seconds
+#
+NUMPY_BLOCK = 8
+#
+# progressive rendering: pixel grids with these steps, 1 is the full grid
+#
+PROGRESSIVE_STEPS = [ 8, 4, 2, 1]
+#
+# the number of frames that are kept for re-using pixels, 
+# cb_animateZoom needs the frames of one octave
+#
+FRAME_HISTORY = 1
+#
+# the bytes of the kept frames. The older frames of an animation keep 
+# the centre quarter, it is re-used at the 2x ratio one octave later
+#
+FRAME_BYTES = 256*2**20
+#
+# delta ratios which differ less than this from an integer are snapped
+#
+RATIO_TOLERANCE = 1e-9
+#
+# the pixel offsets i0, j0 are C ints in the kernel
+#
+OFFSET_MAX = 2**30
+#
+# resumable iterations, the status of a pixel, 
+# see mandelbrotCython.compute_mandelbrot_resume()
+#
+RESUME_INTERIOR = 1
+RESUME_BOUNDED = 2
+#
+# the free buffers that are kept per shape and dtype, see BufferPool
+#
+BUFFER_POOL_MAX = 8
+#
+# the DistEst horizon, see mandelbrotCython.compute_mandelbrot_gbuffer()
+#
+GBUFFER_HORIZON = 2**40
+#
+# adaptive anti-aliasing: pixels whose escape count differs by AA_ITER_DIFF 
+# or more from a neighbour or whose distance estimate is less than 
+# AA_DISTANCE pixels are re-sampled, jittered in the cells of an 
+# AA_GRID x AA_GRID grid. First in the AA_FIRST cells (rotated grid), 
+# if these escape counts differ by AA_ITER_DIFF, in all cells
+#
+AA_ITER_DIFF = 4
+AA_DISTANCE = 1.
+AA_GRID = 4
+AA_FIRST = [ ( 0, 1), ( 1, 3), ( 2, 0), ( 3, 2)]
+#
+# symmetry: the axis is on the pixel grid if its position, in pixels, 
+# is an integer within SYMMETRY_TOLERANCE
+#
+SYMMETRY_TOLERANCE = 1e-3
+#
+# prefetch: the views are calculated in bands of PREFETCH_ROWS rows, 
+# between the bands the thread sleeps, see prefetchMandelbrotSet()
+#
+PREFETCH_ROWS = 32
+PREFETCH_SLEEP = 0.01
+#
+# iteration statistics, the kernels accumulate per thread, see 
+# mandelbrotCython.stats_add(): escaped, boundary (max_iter, not 
+# culled, not periodic), histogram of log2( escape count)
+#
+ITER_STATS_SIZE = 34
+#
+# auto maxIter: raised, if more than AUTO_RAISE of the pixels of
+# the frame reach maxIter close to the boundary, lowered, if the boundary 
+# pixels are less than AUTO_RAISE/10 and AUTO_QUANTILE of the escape 
+# counts are below maxIter/8. Powers of 2, AUTO_MIN ... AUTO_MAX
+#
+AUTO_RAISE = 1e-3
+AUTO_QUANTILE = 0.9999
+AUTO_MIN = 64
+AUTO_MAX = 32768
+
+class Frame( object):
+    """
+    the escape counts of a rendered frame, 
+      pixel ( i, j) is at ( x0 + dx*( j0 + j), y0 + dx*( i0 + i)).
+    Frames derived from each other share the anchor x0, y0. 
+    The coordinates of coinciding pixels are calculated by the same 
+    expression, the escape counts are bit-identical if the frames were 
+    calculated by the same kernel path.
+    Resumable frames keep the orbits: zx, zy, status
+    single: calculated with float32, path: kernelPath( single)
+    width: the width of the grid, cropped frames keep a part of it
+    cached: escapeCount and zAbs are shared with the result cache, 
+      the cache returns them to the buffer pool, see releaseResult()
+    """
+    def __init__( self, x0, y0, dx, i0, j0, maxIter, horizon, escapeCount, zAbs, 
+                  zx = None, zy = None, status = None, single = False, path = None):
+        self.x0 = x0
+        self.y0 = y0
+        self.dx = dx
+        self.i0 = i0
+        self.j0 = j0
+        self.maxIter = maxIter
+        self.horizon = horizon
+        self.escapeCount = escapeCount
+        self.zAbs = zAbs
+        self.zx = zx
+        self.zy = zy
+        self.status = status
+        self.single = single
+        self.path = path
+        self.width = escapeCount.shape[1]
+        self.cached = False
+        return 
+
+    def nbytes( self):
+        return sum( temp.nbytes for temp in ( self.escapeCount, self.zAbs, 
+                                              self.zx, self.zy, self.status) 
+                    if temp is not None)
+
+class BufferPool( object):
+    """
+    reusable arrays, keyed by shape and dtype. 
+      get() returns a free buffer or allocates one, 
+      put() returns buffers which are no longer referenced. 
+    A new shape (widthM changed) drops the free buffers of other shapes
+    """
+    def __init__( self, maxFree = BUFFER_POOL_MAX):
+        self.free = {}
+        self.maxFree = maxFree
+        self.nAllocated = 0
+        return 
+
+    def get( self, shape, dtype, zero = True):
+        key = ( tuple( shape), np.dtype( dtype))
+        if self.free.get( key): 
+            buf = self.free[ key].pop()
+            if zero: 
+                buf.fill( 0)
+            return buf
+        for temp in list( self.free.keys()): 
+            if temp[0] != key[0]: 
+                del self.free[ temp]
+        self.nAllocated += 1
+        return np.zeros( shape, dtype = dtype)
+
+    def put( self, *buffers):
+        for buf in buffers: 
+            if buf is None: 
+                continue
+            temp = self.free.setdefault( ( buf.shape, buf.dtype), [])
+            if len( temp) < self.maxFree: 
+                temp.append( buf)
+        return 
+
+class GBuffer( object):
+    """
+    the channels of a frame, every smoothing mode is derived from them
+      escapeCount: int32, horizon 4, maxIter for interior pixels
+      extra: uint8, the iterations from |z| = 4 to GBUFFER_HORIZON
+      zx, zy: float32, z at GBUFFER_HORIZON
+      logDz: float32, log |dz|
+      smooth: float32, the smooth iteration count
+    key: the view, ( cx, cy, delta, width, maxIter)
+    aa: [( index, sub-sample GBuffer), ...], see FractalEngine.antiAliasGBuffer()
+    """
+    def __init__( self, key, width, height):
+        self.key = key
+        self.aa = None
+        self.escapeCount = np.zeros(( height, width), dtype=np.int32)
+        self.extra = np.zeros(( height, width), dtype=np.uint8)
+        self.zx = np.zeros(( height, width), dtype=np.float32)
+        self.zy = np.zeros(( height, width), dtype=np.float32)
+        self.logDz = np.zeros(( height, width), dtype=np.float32)
+        self.smooth = np.zeros(( height, width), dtype=np.float32)
+        return 
+
+    def channels( self): 
+        return ( self.escapeCount, self.extra, self.zx, self.zy, self.logDz, self.smooth)
 
 class FractalEngine( QWidget):
     """
@@ -26,14 +235,51 @@ class FractalEngine( QWidget):
     def __init__(self, parent=None, colorPars = None):
         super().__init__(parent)
         self.name = "FractalEngine" 
+        self.local = threading.local()
         self.parent = parent
         self.colorPars = colorPars
+        self.precision = "float64"
+        self.tilePool = None
+        self.frameCache = []
+        self.frameHistory = FRAME_HISTORY
+        self.numpyState = None
+        self.gBuffer = None
+        self.bufferPool = BufferPool()
+        self.cancelFlags = {}
+        #
+        # the renders and the prefetch share frameCache, bufferPool, gBuffer, 
+        # tilePool and the buffers of the result cache, one at a time
+        #
+        self.renderLock = threading.RLock()
+        self.resultCache = mandelbrotCache.ResultCache( release = self.releaseResult)
+        return 
+
+    @property
+    def parent( self): 
+        """
+        MBSMainWindow, in the worker of the RenderService: the 
+          RenderView of the request, see mandelbrotRender
+        """
+        view = getattr( self.local, 'view', None)
+        if view is not None: 
+            return view
+        return self.mainWindow
+
+    @parent.setter
+    def parent( self, parent): 
+        self.mainWindow = parent
         return 
 
     def calcMandelbrotSet( self, display = True):
         """
-        calculates self.dataMandelbrotSet
+        calculates self.dataMandelbrotSet, 
+          the render in flight is cancelled, the renders are serialized
         """
+        self.cancelRender( "M")
+        with self.renderLock: 
+            return self.renderMandelbrotSet( display)
+
+    def renderMandelbrotSet( self, display = True):
         #print( "%s.calcMandelbrotSet" % self.name)
         
         if self.parent.widthM == 256:
@@ -47,15 +293,34 @@ class FractalEngine( QWidget):
         #    self.parent.operatorWidget.logWidget.append( "calcMBS")
         
         self.parent.isFilteredM = False
+
+        if self.parent.density != "Off": 
+            return self.calcBuddhabrot( display)
+
+        precision = self.selectPrecision()
+        if precision != self.precision: 
+            self.parent.logWidget.append( "calcMandelbrotSet: precision %s -> %s" % 
+                                          ( self.precision, precision))
+            self.precision = precision
+        if precision == "perturbation": 
+            return self.calcMandelbrotSetDeep()
+        if precision == "dd": 
+            return self.calcMandelbrotSetDD()
+
+        if ( self.parent.gBuffer == "True" or self.parent.antiAlias == "True") and \
+           self.parent.cython == "True": 
+            return self.calcMandelbrotSetGBuffer()
         
         if self.colorPars.smooth == "DZ": 
             if self.parent.cython == "True":
                 return self.calcMandelbrotSetDzCython()
+            elif self.parent.numba == "True" and numbaOK: 
+                return self.calcMandelbrotSetDzNumba()
             else: 
                 return self.calcMandelbrotSetDZ()
 
         if self.parent.cython == "True": 
-            return self.calcMandelbrotSetCython()
+            return self.calcMandelbrotSetCython( display)
 
         if self.parent.numba == "True": 
             return self.calcMandelbrotSetNumba()
@@ -66,12 +331,353 @@ class FractalEngine( QWidget):
         if self.parent.numpy == "False":
             if cythonOK: 
                 self.parent.cython = "True"
-                self.parent.cythonAction.setChecked( self.parent.cython == "True")
+                #
+                # the worker: RenderService.applyView() checks the action
+                #
+                if self.parent is self.mainWindow: 
+                    self.parent.cythonAction.setChecked( self.parent.cython == "True")
                 return self.calcMandelbrotSetCython()
             self.parent.logWidget.append( "calcMandelbrotSet: select a method")
             return 
 
         return self.calcMandelbrotSetNumpy()
+
+    def selectPrecision( self):
+        """
+        returns 'float32', 'float64', 'dd' (double-double) or 'perturbation'
+          the pixel spacing is compared to the float64 resolution at the center
+          float32: overview zooms, Cython and Numpy only, see FLOAT32_MAX_ITER, 
+            no smoothing, |z|^2 at the DistEst horizon overflows float32
+        """
+        if self.parent.deep == "True": 
+            return "perturbation"
+        
+        spacing = self.parent.deltaM/float( self.parent.widthM)
+        scale = max( abs( self.parent.cxM), abs( self.parent.cyM), 1.)
+        if self.parent.float32 == "True" and self.colorPars.smooth == "None" and \
+           self.parent.gBuffer != "True" and self.parent.antiAlias != "True" and \
+           self.parent.maxIterM <= FLOAT32_MAX_ITER and \
+           spacing >= FLOAT32_SPACING_LIMIT*np.finfo( np.float32).eps*scale: 
+            return "float32"
+        if spacing >= FLOAT64_SPACING_LIMIT*np.finfo( np.float64).eps*scale:
+            return "float64"
+        #
+        # the double-double kernel exists in Cython only
+        #
+        if cythonOK and spacing >= FLOAT64_SPACING_LIMIT*DD_EPS*scale:
+            return "dd"
+        
+        return "perturbation"
+
+    def syncDecimalMembers( self):
+        """
+        the decimal strings carry the digits that do not fit into cxM, etc.
+          Call it whenever cxM, cyM or deltaM are moved, e.g. snapped 
+          to the pixel grid, a stale string would move the view back
+        """
+        self.parent.cxMStr = mandelbrotDeep.syncDecimal( self.parent.cxM, self.parent.cxMStr)
+        self.parent.cyMStr = mandelbrotDeep.syncDecimal( self.parent.cyM, self.parent.cyMStr)
+        self.parent.deltaMStr = mandelbrotDeep.syncDecimal( self.parent.deltaM, self.parent.deltaMStr, 
+                                                            mandelbrotDeep.DELTA_MIN)
+        return 
+
+    def startRender( self, name):
+        """
+        name: 'M' or 'J'. The running render of name is cancelled, 
+          returns the cancel flag of the new render, a one-element 
+          int32 array, polled by the Cython kernels. Renders started 
+          from processEvents() cancel the render which called it.
+          The RenderView of a request brings its own flag
+        """
+        self.cancelRender( name)
+        flag = getattr( self.parent, 'cancelFlag', None)
+        if flag is None: 
+            flag = np.zeros( 1, dtype=np.int32)
+        self.cancelFlags[ name] = flag
+        return flag
+
+    def cancelRender( self, name):
+        if name in self.cancelFlags: 
+            self.cancelFlags[ name][0] = 1
+        return 
+
+    def cancelRenders( self):
+        """
+        the Stop button
+        """
+        for temp in self.cancelFlags.values(): 
+            temp[0] = 1
+        return 
+
+    def renderCancelled( self, cancel, name): 
+        """
+        True, if the render has been cancelled, the result is stale and dropped
+        """
+        if cancel[0] == 0: 
+            return False
+        if self.parent.debugSpeed == "True" and not self.parent.isAnimating: 
+            self.parent.logWidget.append( "%s: cancelled, result dropped" % name)
+        return True
+
+    def normalizeMandelbrotSet( self, escapeCount, zAbs, horizon):
+        """
+        escape counts are normalized to DATA_NORM, DistEst smoothing
+          DistEst, Cython: mandelbrotCython.normalize_escape, one pass, 
+          the result is the only allocation
+        """
+        if self.colorPars.smooth == "DistEst" and cythonOK and \
+           escapeCount.dtype == np.int32 and zAbs.dtype == np.float64: 
+            output = np.empty( escapeCount.shape, dtype=np.float64)
+            mandelbrotCython.normalize_escape( escapeCount, zAbs, self.parent.maxIterM, 
+                                               float( utils.DATA_NORM), float( horizon), 
+                                               True, LOG_HELPER, output)
+            return output
+
+        corr = (utils.DATA_NORM-1)/float( self.parent.maxIterM - 1)
+        escapeCount = escapeCount.astype(np.float64)
+        escapeCount *= corr
+
+        if self.colorPars.smooth != "DistEst":
+            return escapeCount
+        
+        log_horizon = np.log2(np.log(horizon))
+        temp = np.log( np.where( zAbs <= 0., LOG_HELPER, zAbs))
+        temp[ temp <= 0.] = LOG_HELPER
+        output = escapeCount
+        corr = np.nan_to_num( escapeCount + 
+                              1 - np.log2( temp)*corr + log_horizon)
+        return np.where(output != 0, corr, output)
+
+    def normalizeMandelbrotSetDz( self, result, resultMax = None):
+        """
+        DZ: normalized to DATA_NORM, gamma correction
+        """
+        if resultMax is None: 
+            resultMax = np.max( result)
+        if resultMax > 0.: 
+            result = result/resultMax
+        norm = result ** 0.8  # gamma correction
+        norm /= 2.
+        norm *= utils.DATA_NORM
+        return norm*(utils.DATA_NORM-1)/float( self.parent.maxIterM - 1)
+
+    def calcMandelbrotSetGBuffer( self):
+        """
+        Cython, the G-buffer is calculated, if the view changed, 
+          otherwise the smoothing mode is applied to the cached buffer. 
+          antiAlias: the sub-samples are kept with the buffer
+        """
+        width = self.parent.widthM
+        maxIter = self.parent.maxIterM
+        key = ( self.parent.cxM, self.parent.cyM, self.parent.deltaM, width, maxIter)
+        xmin = self.parent.cxM - self.parent.deltaM/2.
+        ymin = self.parent.cyM - self.parent.deltaM/2.
+        dx = self.parent.deltaM/float( width)
+
+        startTime = time.time()
+        cancel = self.startRender( "M")
+        cached = ( self.gBuffer is not None and self.gBuffer.key == key)
+        if not cached: 
+            self.gBuffer = None
+            gBuffer = GBuffer( key, width, width)
+            if self.parent.tiled == "True": 
+                def f( tile):
+                    mandelbrotTiled.mandelbrotGBufferTile( tile, xmin, dx, ymin, dx, maxIter, gBuffer, cancel)
+                tiles = mandelbrotTiled.makeTiles( width, width, self.parent.tileSize)
+                self.getTilePool().run( f, tiles, self.parent.app.processEvents)
+            else: 
+                mandelbrotCython.compute_mandelbrot_gbuffer( xmin, dx, ymin, dx, 0, 0, maxIter, 
+                                                             *gBuffer.channels(), cancel = cancel)
+            if self.renderCancelled( cancel, "M"): 
+                return 
+            self.gBuffer = gBuffer
+        timeCalc = time.time() - startTime
+
+        startTime = time.time()
+        aa = None
+        if self.parent.antiAlias == "True" and not self.parent.isAnimating: 
+            if self.gBuffer.aa is None: 
+                self.gBuffer.aa = self.antiAliasGBuffer( self.gBuffer, xmin, ymin, dx)
+            aa = self.gBuffer.aa
+        timeAA = time.time() - startTime
+        if self.renderCancelled( cancel, "M"): 
+            return 
+
+        startTime = time.time()
+        self.parent.dataMandelbrotSet = self.colorGBuffer( self.gBuffer, aa)
+
+        if self.parent.debugSpeed == "True" and not self.parent.isAnimating: 
+            temp = ""
+            if aa is not None: 
+                temp = ", AA %s pixels, %5.3f s" % ( 
+                    " + ".join( [ "%d x %d" % elm[1].escapeCount.shape for elm in aa]), timeAA)
+            self.parent.logWidget.append( "M: %5.3f s, Cython, G-buffer %s%s, %s %5.3f s" % 
+                                          ( timeCalc, ( "cached" if cached else "calculated"), temp, 
+                                            self.colorPars.smooth, time.time() - startTime))
+
+        if self.parent.execDynOp == "True": 
+            if self.parent.operatorWidget is not None: 
+                self.parent.operatorWidget.cb_runOp()
+
+        self.MBSUpdated.emit( self.parent.dataMandelbrotSet)
+        return 
+
+    def colorGBuffer( self, gBuffer, aa = None):
+        """
+        the smoothing modes, derived from the G-buffer
+          None: the escape counts
+          DistEst: the escape counts at GBUFFER_HORIZON and |z|
+          DZ: smooth iteration plus distance, see compute_mandelbrot_dz
+        aa: [( index, sub-sample GBuffer), ...], the pixels are replaced by 
+          the mean of their sub-samples, in this order
+        """
+        buffers = [ gBuffer]
+        if aa is not None: 
+            buffers.extend( [ elm[1] for elm in aa])
+        if self.colorPars.smooth == "DistEst": 
+            output = [ self.normalizeMandelbrotSet( 
+                temp.escapeCount + temp.extra, 
+                np.hypot( temp.zx, temp.zy).astype( np.float64), GBUFFER_HORIZON) for temp in buffers]
+        elif self.colorPars.smooth == "DZ": 
+            #
+            # the sub-samples are normalized with the maximum of the frame
+            #
+            result = [ self.gBufferDz( temp) for temp in buffers]
+            resultMax = np.max( result[0])
+            output = [ self.normalizeMandelbrotSetDz( temp, resultMax) for temp in result]
+        else: 
+            output = [ self.normalizeMandelbrotSet( temp.escapeCount, None, 4) for temp in buffers]
+        if aa is not None: 
+            for ( elm, temp) in zip( aa, output[1:]): 
+                if len( elm[0][0]) > 0: 
+                    output[0][ elm[0]] = temp.mean( axis = 1)
+        return output[0]
+
+    def gBufferDistance( self, gBuffer):
+        """
+        the distance estimate |z| log|z| / |dz|, 0. for interior pixels
+        """
+        escaped = gBuffer.escapeCount < self.parent.maxIterM
+        zAbs = np.hypot( gBuffer.zx, gBuffer.zy).astype( np.float64)
+        zAbs[ ~escaped] = 1.
+        return zAbs*np.log( zAbs)/np.exp( gBuffer.logDz.astype( np.float64))
+
+    def gBufferDz( self, gBuffer):
+        """
+        DZ: log( 1 + smooth iteration + log( 1 + distance)), 0. for interior pixels
+        """
+        result = np.log( 1. + gBuffer.smooth + np.log1p( self.gBufferDistance( gBuffer)))
+        result[ gBuffer.escapeCount >= self.parent.maxIterM] = 0.
+        return result
+
+    def antiAliasGBuffer( self, gBuffer, xmin, ymin, dx):
+        """
+        adaptive anti-aliasing, the pixels at edges of the escape counts 
+          and close to the boundary (distance estimate) are flagged and 
+          sampled in the AA_FIRST cells. The flagged pixels whose samples 
+          differ get the remaining cells of the AA_GRID x AA_GRID grid. 
+          The jitter is seeded, re-rendering a view gives the same image.
+
+        returns [( index, sub-sample GBuffer), ( index, sub-sample GBuffer)], 
+          the channels are ( nPixels, nSamples)
+        """
+        escapeCount = gBuffer.escapeCount
+        flags = np.zeros( escapeCount.shape, dtype=bool)
+        temp = np.abs( np.diff( escapeCount, axis = 1)) >= AA_ITER_DIFF
+        flags[:, 1:] |= temp
+        flags[:, :-1] |= temp
+        temp = np.abs( np.diff( escapeCount, axis = 0)) >= AA_ITER_DIFF
+        flags[1:, :] |= temp
+        flags[:-1, :] |= temp
+        flags |= ( escapeCount < self.parent.maxIterM) & \
+                 ( self.gBufferDistance( gBuffer) < AA_DISTANCE*dx)
+        ( i, j) = np.nonzero( flags)
+
+        rng = np.random.default_rng( 0)
+        cells = AA_FIRST + [ ( a, b) for a in range( AA_GRID) for b in range( AA_GRID) 
+                             if ( a, b) not in AA_FIRST]
+        nFirst = len( AA_FIRST)
+        first = self.gBufferSamples( gBuffer.key, i, j, xmin, ymin, dx, cells[:nFirst], rng)
+
+        temp = np.concatenate(( first.escapeCount, escapeCount[ i, j][:, None]), axis = 1)
+        k = np.nonzero( temp.max( axis = 1) - temp.min( axis = 1) >= AA_ITER_DIFF)[0]
+        rest = self.gBufferSamples( gBuffer.key, i[ k], j[ k], xmin, ymin, dx, cells[nFirst:], rng)
+        full = GBuffer( gBuffer.key, len( cells), len( k))
+        for ( temp, tempFirst, tempRest) in zip( full.channels(), first.channels(), rest.channels()): 
+            temp[:, :nFirst] = tempFirst[ k]
+            temp[:, nFirst:] = tempRest
+        return [ (( i, j), first), (( i[ k], j[ k]), full)]
+
+    def gBufferSamples( self, key, i, j, xmin, ymin, dx, cells, rng): 
+        """
+        the G-buffer of one jittered sample per cell for the pixels ( i, j), 
+          compute_mandelbrot_gbuffer_points, parallel
+        """
+        a = np.array( [ elm[0] for elm in cells])
+        b = np.array( [ elm[1] for elm in cells])
+        x = xmin + dx*( j[:, None] + ( b + rng.random(( len( j), len( cells))))/AA_GRID - 0.5)
+        y = ymin + dx*( i[:, None] + ( a + rng.random(( len( i), len( cells))))/AA_GRID - 0.5)
+        sub = GBuffer( key, len( cells), len( i))
+        mandelbrotCython.compute_mandelbrot_gbuffer_points( x, y, dx/AA_GRID, self.parent.maxIterM, 
+                                                            *sub.channels())
+        return sub
+
+    def calcMandelbrotSetDeep( self):
+        """
+        deep zooms, perturbation theory, see mandelbrotDeep.py
+        """
+        self.syncDecimalMembers()
+        if self.colorPars.smooth == "DistEst": 
+            horizon = 2**40
+        else: 
+            horizon = 4
+
+        startTime = time.time()
+        ( escapeCount, zAbs, info) = mandelbrotDeep.computeMandelbrotDeep(
+            self.parent.cxMStr, self.parent.cyMStr, self.parent.deltaMStr, 
+            self.parent.widthM, self.parent.maxIterM, horizon, 
+            useCython = (self.parent.cython == "True"))
+
+        self.parent.dataMandelbrotSet = self.normalizeMandelbrotSet( escapeCount, zAbs, horizon)
+
+        if self.parent.debugSpeed == "True" and not self.parent.isAnimating: 
+            self.parent.logWidget.append( 
+                "M: %5.3f s, Perturbation, ref %d, skip %d, bits %d, rebases %d, FloatExp %s, Cython %s" % 
+                (( time.time() - startTime), info[ 'refLen'], info[ 'skip'], info[ 'bits'], 
+                 info[ 'rebases'], repr( info[ 'floatExp']), repr( info[ 'cython'])))
+
+        self.MBSUpdated.emit( self.parent.dataMandelbrotSet)
+
+        return 
+    
+    def calcMandelbrotSetDD( self):
+        """
+        mid-depth zooms, double-double Cython kernel, the center 
+        is taken from the decimal strings
+        """
+        self.syncDecimalMembers()
+        if self.colorPars.smooth == "DistEst": 
+            horizon = 2**40
+        else: 
+            horizon = 4
+
+        startTime = time.time()
+        ( cxh, cxl) = mandelbrotDeep.decimalToDD( self.parent.cxMStr)
+        ( cyh, cyl) = mandelbrotDeep.decimalToDD( self.parent.cyMStr)
+        ( escapeCount, zAbs) = mandelbrotCython.compute_mandelbrot_dd( 
+            self.parent.widthM, self.parent.widthM, 
+            cxh, cxl, cyh, cyl, self.parent.deltaM, 
+            self.parent.maxIterM, horizon)
+
+        self.parent.dataMandelbrotSet = self.normalizeMandelbrotSet( escapeCount, zAbs, horizon)
+
+        if self.parent.debugSpeed == "True" and not self.parent.isAnimating: 
+            self.parent.logWidget.append( "M: %5.3f s, Cython, double-double" % 
+                                          (( time.time() - startTime)))
+
+        self.MBSUpdated.emit( self.parent.dataMandelbrotSet)
+
+        return 
     
     def calcMandelbrotSetNumpy( self, display = True):
 
@@ -101,26 +707,90 @@ class FractalEngine( QWidget):
         c = x + y[:,None]*1j
         self.parent.progressLbl.setStyleSheet("background-color:lightblue")
         self.parent.app.processEvents()
+        #
+        # the pixels are flat arrays, z and c are tuples: ( complex128,) or 
+        # float32 ( real, imag), numexpr has no complex64
+        #
+        single = ( self.precision == "float32")
+        c = c.ravel()
+        if single: 
+            c = ( c.real.astype( np.float32), c.imag.astype( np.float32))
+            z = ( np.zeros( c[0].shape, np.float32), np.zeros( c[0].shape, np.float32))
+        else: 
+            c = ( c,)
+            z = ( np.zeros( c[0].shape, np.complex128),)
 
-        z = np.zeros(c.shape, np.complex128)
-
-        escapeCount = np.zeros(c.shape) 
+        escapeCount = np.zeros( c[0].shape)
+        #
+        # resumable: maxIter has been raised, same view, 
+        # the iteration continues from the last z
+        #
+        itStart = 0
+        key = ( cx, cy, delta, width, horizon, self.precision)
+        if self.parent.resumable == "True" and self.numpyState is not None: 
+            ( keyOld, maxIterOld, escapeCountOld, zOld) = self.numpyState
+            if keyOld == key and maxIterOld < maxIter: 
+                escapeCount = escapeCountOld.copy()
+                z = zOld
+                itStart = maxIterOld
+        self.numpyState = None
         
         startTime = time.time()
-        for it in range( maxIter):
-            notdone = ne.evaluate('z.real*z.real + z.imag*z.imag < %g' % float( horizon))
-            #
-            # escapeCount is set to it at the positions where notdone is true
-            #
-            escapeCount[notdone] = it
-            z = ne.evaluate('where(notdone,z**2+c,z)')
-            if (it % 100) == 0 and display:
+        stopped = False
+        #
+        # active set: the indices of the bounded pixels, their z and c are 
+        # compacted after each block of NUMPY_BLOCK iterations
+        #
+        active = np.flatnonzero( self.numpyBounded( z, horizon))
+        zA = tuple( temp[ active] for temp in z)
+        cA = tuple( temp[ active] for temp in c)
+        it = itStart
+        while it < maxIter and len( active) > 0: 
+            k = min( NUMPY_BLOCK, maxIter - it)
+            zNew = self.numpyBlock( zA, cA, k)
+            bounded = self.numpyBounded( zNew, horizon)
+            if not bounded.all(): 
+                #
+                # the pixels which escaped in this block are replayed 
+                # step by step, escapeCount is set to it at the positions 
+                # where notdone is true
+                #
+                escaped = ~bounded
+                idx = active[ escaped]
+                zE = tuple( temp[ escaped] for temp in zA)
+                cE = tuple( temp[ escaped] for temp in cA)
+                for i in range( k): 
+                    notdone = self.numpyBounded( zE, horizon)
+                    escapeCount[ idx[ notdone]] = it + i
+                    zE = self.numpyStep( zE, cE, notdone)
+                for ( temp, tempE) in zip( z, zE): 
+                    temp[ idx] = tempE
+                active = active[ bounded]
+                zA = tuple( temp[ bounded] for temp in zNew)
+                cA = tuple( temp[ bounded] for temp in cA)
+            else: 
+                zA = zNew
+            it += k
+            if ( it//100) != ( it - k)//100 and display:
+                escapeCount[ active] = it - 1
                 self.parent.progressLbl.setText( "Progress: %4d/%4d M" % ( it, maxIter))
                 self.parent.app.processEvents()
-                self.MBSUpdated.emit( escapeCount)
+                self.MBSUpdated.emit( escapeCount.reshape( width, width))
                 
             if self.parent.stopRequested:
+                stopped = True
                 break
+        #
+        # the pixels that are still bounded
+        #
+        escapeCount[ active] = it - 1
+        for ( temp, tempA) in zip( z, zA): 
+            temp[ active] = tempA
+
+        if self.parent.resumable == "True" and not self.parent.isAnimating and not stopped: 
+            self.numpyState = ( key, maxIter, escapeCount, z)
+
+        escapeCount = escapeCount.reshape( width, width)
 
         if escapeCount.shape[0] == 10: 
             print( "calcMandelbrotSet-0: corr %g escapeCount %s" %
@@ -133,7 +803,11 @@ class FractalEngine( QWidget):
         # https://linas.org/art-gallery/escape/smooth.html
         #
         if self.parent.viewerMain.smooth == "DistEst": 
-            temp = np.log( abs(z))
+            if single: 
+                temp = np.log( np.hypot( z[0], z[1]).astype( np.float64))
+            else: 
+                temp = np.log( abs( z[0]))
+            temp = temp.reshape( width, width)
             temp[ temp <= 0.] = LOG_HELPER
             escapeCount = np.nan_to_num( escapeCount + 1 - np.log2( temp) + log_horizon)
             
@@ -144,8 +818,8 @@ class FractalEngine( QWidget):
         self.MBSUpdated.emit( self.parent.dataMandelbrotSet)
         
         if self.parent.debugSpeed == "True": 
-            self.parent.logWidget.append( "M: %5.3f s, Numpy/Numexpr" % 
-                                   (( time.time() - startTime)))
+            self.parent.logWidget.append( "M: %5.3f s, Numpy/Numexpr, %s, iterations %d - %d" % 
+                                   (( time.time() - startTime), self.precision, itStart, maxIter))
 
         if display: 
             self.parent.progressLbl.setText( "Progress: %4d/%4d M" % ( it, maxIter))
@@ -154,244 +828,906 @@ class FractalEngine( QWidget):
 
         return 
 
-    def calcMandelbrotSetCython( self):
-        # 
+    def numpyBounded( self, z, horizon):
+        """
+        |z|^2 < horizon, z: ( complex128,) or ( real, imag) float32
+        """
+        if len( z) == 1: 
+            zc = z[0]
+            return ne.evaluate( 'zc.real*zc.real + zc.imag*zc.imag < %g' % float( horizon))
+        ( zr, zi) = z
+        horizon2 = np.float32( horizon)
+        return ne.evaluate( 'zr*zr + zi*zi < horizon2')
+
+    def numpyBlock( self, z, c, k):
+        """
+        k iterations without escape checks, complex128: one numexpr call. 
+          The orbits that escape may overflow, see numpyStep()
+        """
+        if len( z) == 1: 
+            ( zc, cc) = ( z[0], c[0])
+            expr = 'zc'
+            for i in range( k): 
+                expr = '(%s)**2+cc' % expr
+            return ( ne.evaluate( expr),)
+        ( zr, zi) = z
+        ( cr, ci) = c
+        for i in range( k): 
+            ( zr, zi) = ( ne.evaluate( 'zr*zr - zi*zi + cr'), ne.evaluate( '2*zr*zi + ci'))
+        return ( zr, zi)
+
+    def numpyStep( self, z, c, notdone):
+        """
+        one iteration, z is frozen where notdone is False
+        """
+        if len( z) == 1: 
+            ( zc, cc) = ( z[0], c[0])
+            return ( ne.evaluate( 'where(notdone,zc**2+cc,zc)'),)
+        ( zr, zi) = z
+        ( cr, ci) = c
+        return ( ne.evaluate( 'where(notdone,zr*zr - zi*zi + cr,zr)'), 
+                 ne.evaluate( 'where(notdone,2*zr*zi + ci,zi)'))
+
+    def calcMandelbrotSetCython( self, display = True):
+        """
+        Cython, tiled or not tiled. 
+          progressive: coarse grids ( PROGRESSIVE_STEPS) are calculated 
+          first and displayed, every pass calculates only new pixels
+        """
         #print( "FractalEngine.calcMBSCython: cx %g cy %g delta %g width %d maxIter %d " % 
         #       ( self.parent.cxM, self.parent.cyM, 
         #         self.parent.deltaM, self.parent.widthM, self.parent.maxIterM))
 
-        if self.parent.tiled == "True": 
-            self.calcMandelbrotSetCythonTiled()
-            return
-        
-        startTime = time.time()
-        if self.parent.viewerMain.smooth == "DistEst": 
+        if self.parent.marianiSilver == "True": 
+            return self.calcMandelbrotSetMarianiSilver()
+
+        cancel = self.startRender( "M")
+        if self.colorPars.smooth == "DistEst": 
             horizon = 2**40
         else: 
             horizon = 4
-        log_horizon = np.log2(np.log(horizon))
-        
-        (escapeCount, zAbs) = mandelbrotCython.compute_mandelbrot( 
-            self.parent.widthM, self.parent.widthM, 
-            self.parent.cxM - self.parent.deltaM/2., 
-            self.parent.cxM + self.parent.deltaM/2., 
-            self.parent.cyM - self.parent.deltaM/2., 
-            self.parent.cyM + self.parent.deltaM/2., 
-            self.parent.maxIterM, horizon)
+        width = self.parent.widthM
+        xmin = self.parent.cxM - self.parent.deltaM/2.
+        ymin = self.parent.cyM - self.parent.deltaM/2.
+        dx = self.parent.deltaM/float( width)
+        maxIter = self.parent.maxIterM
+        symmetry = ( self.parent.symmetry == "True")
+        if symmetry: 
+            temp = self.snapSymmetric( ymin, dx, width)
+            if temp != ymin: 
+                ymin = temp
+                self.parent.cyM = ymin + self.parent.deltaM/2.
+                self.syncDecimalMembers()
+        single = ( self.precision == "float32")
+        key = self.resultKey( "M", xmin, ymin, dx, width, maxIter, horizon, single)
+        entry = self.cachedResult( key)
+        if entry is not None: 
+            return self.showCachedMandelbrotSet( entry, horizon, single)
 
-        corr = (utils.DATA_NORM-1)/float( self.parent.maxIterM - 1)
-        escapeCount = escapeCount.astype(np.float64)
-        escapeCount *= corr
+        #
+        # the buffers of the evicted frames are re-used, see storeFrame(), 
+        # the resume kernel reads escapeCount, zx, zy, status
+        #
+        pool = self.bufferPool
+        escapeCount = pool.get(( width, width), np.int32)
+        zAbs = pool.get(( width, width), np.float64, zero = False)
+        done = pool.get(( width, width), bool)
+        #
+        # the SIMD and float32 kernels keep no orbits
+        #
+        if self.parent.resumable == "True" and self.parent.simd == "False" and \
+           not single and not self.parent.isAnimating: 
+            zx = pool.get(( width, width), np.float64)
+            zy = pool.get(( width, width), np.float64)
+            status = pool.get(( width, width), np.uint8)
+        else: 
+            ( zx, zy, status) = ( None, None, None)
 
-        if self.parent.debugSpeed == "True": 
-            self.parent.logWidget.append( "M: %5.3f s, Cython, not tiled, prange() %s" % 
-                                   (( time.time()-startTime)))
+        startTime = time.time()
+        ( x0, y0, i0, j0, nReused) = ( xmin, ymin, 0, 0, 0)
+        if self.parent.reusePixels == "True" or status is not None: 
+            ( x0, y0, dx, i0, j0, nReused) = self.reuseFrame( 
+                xmin, ymin, dx, maxIter, horizon, escapeCount, zAbs, done, zx, zy, status, 
+                resumeOnly = ( self.parent.reusePixels != "True"), single = single)
+            if nReused > 0: 
+                #
+                # the grid has been snapped to the samples of the cached frame
+                #
+                self.parent.cxM = x0 + dx*( j0 + width/2.)
+                self.parent.cyM = y0 + dx*( i0 + width/2.)
+                self.parent.deltaM = dx*width
+                self.syncDecimalMembers()
+        #
+        # conjugate symmetry, the mirrored rows are copied
+        #
+        mirror = None
+        if symmetry: 
+            mirror = self.mirrorRange( y0, dx, i0, width)
 
-        if self.parent.viewerMain.smooth == "DistEst":
-            zAbs[ zAbs <= 0.] = LOG_HELPER
-            temp = np.log( zAbs)
-            temp[ temp <= 0.] = LOG_HELPER
-            output = escapeCount
-            corr = np.nan_to_num( escapeCount + 
-                                  1 - np.log2( temp)*corr + log_horizon)
-            self.parent.dataMandelbrotSet = np.where(output != 0, corr, output)
-        else:
-            self.parent.dataMandelbrotSet = escapeCount
+        if display and self.parent.progressive == "True" and not self.parent.isAnimating: 
+            steps = PROGRESSIVE_STEPS
+        else: 
+            steps = [ 1]
+
+        todo = pool.get(( width, width), bool, zero = False)
+        stats = self.newIterStats()
+        if nReused > 0: 
+            self.addIterStats( stats, escapeCount[ done], zAbs[ done], maxIter)
+        for step in steps: 
+            todo.fill( False)
+            todo[::step, ::step] = True
+            todo &= ~done
+            if mirror is not None: 
+                mirrored = self.mirrorTodo( mirror, todo, done)
+            self.computeMasked( todo, escapeCount, zAbs, x0, dx, y0, dx, i0, j0, maxIter, horizon, 
+                                zx, zy, status, single, cancel, stats)
+            if self.renderCancelled( cancel, "M"): 
+                pool.put( todo, done, escapeCount, zAbs, zx, zy, status)
+                return 
+            done |= todo
+            if mirror is not None: 
+                self.mirrorRows( mirror, mirrored, done, escapeCount, zAbs, zx, zy, status)
+            if step > 1: 
+                #
+                # the viewer stretches the coarse grid to the world rect
+                #
+                self.MBSUpdated.emit( self.normalizeMandelbrotSet( 
+                    escapeCount[::step, ::step], zAbs[::step, ::step], horizon))
+                self.parent.app.processEvents()
+
+        pool.put( todo, done)
+        frame = Frame( x0, y0, dx, i0, j0, maxIter, horizon, escapeCount, zAbs, 
+                       zx, zy, status, single, self.kernelPath( single))
+        self.storeFrame( frame)
+        frame.cached = self.cacheResult( key, escapeCount = escapeCount, zAbs = zAbs, 
+                                         grid = np.array( [ x0, y0, dx, i0, j0]))
+        self.parent.dataMandelbrotSet = self.normalizeMandelbrotSet( escapeCount, zAbs, horizon)
+        info = self.adjustMaxIter( stats)
+
+        if self.parent.debugSpeed == "True" and not self.parent.isAnimating: 
+            if self.parent.tiled == "True": 
+                temp = "tiled, tile size %d, %d threads" % ( self.parent.tileSize, self.getTilePool().nThreads)
+            else: 
+                temp = "not tiled"
+            if single: 
+                temp += ", SIMD %d lanes" % mandelbrotCython.simd_lanes( True)
+            elif self.parent.simd == "True": 
+                temp += ", SIMD %d lanes" % mandelbrotCython.simd_lanes()
+            if mirror is not None: 
+                temp += ", mirrored %d rows" % ( mirror[1] - mirror[0])
+            self.parent.logWidget.append( "M: %5.3f s, Cython, %s, %s, passes %s, reused %d pixels (%.1f%%)%s" % 
+                                          (( time.time() - startTime), self.precision, temp, repr( steps), 
+                                           nReused, 100.*nReused/float( width*width), 
+                                           info + self.cacheInfo()))
+
+        if self.parent.execDynOp == "True": 
+            if self.parent.operatorWidget is not None: 
+                self.parent.operatorWidget.cb_runOp()
 
         self.MBSUpdated.emit( self.parent.dataMandelbrotSet)
             
         return 
 
-    def calcMandelbrotSetCythonTiled( self):
-        # 
-        #print( "FractalEngine.calcMBSCythonTiled: cx %g cy %g delta %g width %d maxIter %d " % 
-        #       ( self.parent.cxM, self.parent.cyM, 
-        #         self.parent.deltaM, self.parent.widthM, self.parent.maxIterM))
-        
+    def storeFrame( self, frame):
+        """
+        keeps the last self.frameHistory frames and at most FRAME_BYTES, 
+          the newest frame is always kept. frameHistory > 1: the older 
+          frames are cropped, see cropFrame(). 
+          The arrays of the evicted frames go to the buffer pool
+        """
+        self.frameCache.append( frame)
+        if self.frameHistory > 1 and len( self.frameCache) > 1: 
+            self.cropFrame( self.frameCache[-2])
+        nKeep = 0
+        nBytes = 0
+        for temp in reversed( self.frameCache): 
+            nBytes += temp.nbytes()
+            if nKeep == self.frameHistory or ( nKeep > 0 and nBytes > FRAME_BYTES): 
+                break
+            nKeep += 1
+        for temp in self.frameCache[:-nKeep]: 
+            if not temp.cached and temp.escapeCount.shape[1] == temp.width: 
+                self.bufferPool.put( temp.escapeCount, temp.zAbs)
+            self.bufferPool.put( temp.zx, temp.zy, temp.status)
+        del self.frameCache[:-nKeep]
+        return 
+
+    def cropFrame( self, frame):
+        """
+        keeps the centre quarter of escapeCount and zAbs, the pixels that 
+          a frame of half the dx and about the same centre re-uses. 
+          The orbits are dropped, the frame is no longer resumable. 
+          The cropped arrays do not go to the buffer pool, another shape 
+          would drop its free buffers
+        """
+        ( height, width) = frame.escapeCount.shape
+        if width < frame.width: 
+            return 
+        ( a, b) = ( height//4, width//4)
+        escapeCount = frame.escapeCount[ a:a + height//2, b:b + width//2].copy()
+        zAbs = frame.zAbs[ a:a + height//2, b:b + width//2].copy()
+        if not frame.cached: 
+            self.bufferPool.put( frame.escapeCount, frame.zAbs)
+        self.bufferPool.put( frame.zx, frame.zy, frame.status)
+        frame.escapeCount = escapeCount
+        frame.zAbs = zAbs
+        ( frame.zx, frame.zy, frame.status) = ( None, None, None)
+        frame.i0 += a
+        frame.j0 += b
+        frame.cached = False
+        return 
+
+    def resultKey( self, kind, xmin, ymin, dx, width, maxIter, horizon, single = False): 
+        """
+        the key of the raw result in self.resultCache, the kernel path 
+          is part of the key, see kernelPath(). 
+          Julia sets: the key contains c. The channels are part of the key
+        """
+        if kind == "J": 
+            kind = ( "J", self.parent.cxM, self.parent.cyM)
+        return ( kind, xmin, ymin, dx, width, maxIter, horizon, 
+                 self.kernelPath( single), ( "escapeCount", "zAbs"))
+
+    def kernelPath( self, single = False): 
+        """
+        the backend, precision and SIMD of the kernels that calculate 
+          the raw result. The paths are not bit-identical, Numba uses 
+          fastmath, -march=native contracts to FMA
+        """
+        if self.parent.cython == "True": 
+            if single: 
+                return ( "cython", "float32")
+            if self.parent.simd == "True": 
+                return ( "cython", "float64", "simd")
+            return ( "cython", "float64")
+        if self.parent.numba == "True": 
+            return ( "numba", "float64", "fastmath")
+        return ( "numpy", "float64")
+
+    def cachedResult( self, key): 
+        """
+        the cached raw result of key or None, not in animations. 
+          Mandelbrot sets: a cached grid less than 1/2 pixel away is 
+          used, the view is snapped to it, see reuseFrame()
+        """
+        if self.parent.resultCache != "True" or self.parent.isAnimating: 
+            return None
+        self.syncDiskCache()
+        if key[0] != "M": 
+            return self.resultCache.get( key)
+        return self.resultCache.get( key, lambda other: self.nearKey( key, other))
+
+    def nearKey( self, key, other): 
+        ( kind, xmin, ymin, dx) = key[:4]
+        if other[0] != kind or other[4:] != key[4:] or \
+           abs( other[3] - dx) > RATIO_TOLERANCE*dx: 
+            return False
+        return abs( other[1] - xmin) < dx/2. and abs( other[2] - ymin) < dx/2.
+
+    def cacheResult( self, key, **arrays): 
+        """
+        the arrays are handed to the cache, not copied, they must not be 
+          modified afterwards. Returns True, if the cache took them
+        """
+        if self.parent.resultCache != "True" or self.parent.isAnimating: 
+            return False
+        self.syncDiskCache()
+        return self.resultCache.put( key, arrays, copy = False)
+
+    def releaseResult( self, entry): 
+        """
+        an entry dropped by the result cache, its buffers go to the pool 
+          or back to the frame that shares them
+        """
+        for frame in self.frameCache: 
+            if frame.escapeCount is entry[ 'escapeCount']: 
+                frame.cached = False
+                return 
+        self.bufferPool.put( entry[ 'escapeCount'], entry[ 'zAbs'])
+        return 
+
+    def syncDiskCache( self): 
+        """
+        the disk tier is used with Flags-Disk cache only
+        """
+        if self.parent.diskCache == "True": 
+            self.resultCache.diskBytes = mandelbrotCache.DISK_BYTES
+        else: 
+            self.resultCache.diskBytes = 0
+        return 
+
+    def cacheInfo( self): 
+        """
+        the hit and miss counts, for debugSpeed
+        """
+        if self.parent.resultCache != "True": 
+            return ""
+        return ", " + self.resultCache.info()
+
+    def showCachedMandelbrotSet( self, entry, horizon, single): 
+        """
+        a cache hit, the grid of the cached result is restored, 
+          the pixels are copied to a frame, see reuseFrame()
+        """
+        startTime = time.time()
+        ( x0, y0, dx, i0, j0) = entry[ 'grid']
+        ( i0, j0) = ( int( i0), int( j0))
+        width = self.parent.widthM
+        self.parent.cxM = x0 + dx*( j0 + width/2.)
+        self.parent.cyM = y0 + dx*( i0 + width/2.)
+        self.parent.deltaM = dx*width
+        self.syncDecimalMembers()
+        escapeCount = self.bufferPool.get(( width, width), np.int32, zero = False)
+        zAbs = self.bufferPool.get(( width, width), np.float64, zero = False)
+        escapeCount[:] = entry[ 'escapeCount']
+        zAbs[:] = entry[ 'zAbs']
+        self.storeFrame( Frame( x0, y0, dx, i0, j0, self.parent.maxIterM, horizon, 
+                                escapeCount, zAbs, single = single, 
+                                path = self.kernelPath( single)))
+        self.parent.dataMandelbrotSet = self.normalizeMandelbrotSet( escapeCount, zAbs, horizon)
+
+        if self.parent.debugSpeed == "True" and not self.parent.isAnimating: 
+            self.parent.logWidget.append( "M: %5.3f s, cache hit%s" % 
+                                          ( time.time() - startTime, self.cacheInfo()))
+
+        if self.parent.execDynOp == "True": 
+            if self.parent.operatorWidget is not None: 
+                self.parent.operatorWidget.cb_runOp()
+
+        self.MBSUpdated.emit( self.parent.dataMandelbrotSet)
+        return 
+
+    def prefetchMandelbrotSet( self, share = 1., label = "prefetch"): 
+        """
+        see renderPrefetch(), serialized with the renders
+        """
+        with self.renderLock: 
+            return self.renderPrefetch( share, label)
+
+    def renderPrefetch( self, share = 1., label = "prefetch"): 
+        """
+        calculates the view of self.parent, a RenderView of the 
+          prefetcher, into the result cache, nothing is displayed, 
+          the frame cache is not touched, see renderLock. 
+          Cython (not tiled) or Numba, float32/float64 only.
+          share: the fraction of a core, the thread sleeps between the 
+          bands of PREFETCH_ROWS rows. Returns True, if the view has 
+          been calculated, False if cancelled or not applicable
+        """
+        if self.parent.resultCache != "True" or self.parent.widthM == 256 or \
+           self.colorPars.smooth == "DZ": 
+            return False
+        precision = self.selectPrecision()
+        if precision not in ( "float32", "float64"): 
+            return False
+        if self.parent.cython == "True": 
+            if self.parent.gBuffer == "True" or self.parent.antiAlias == "True" or \
+               self.parent.marianiSilver == "True": 
+                return False
+            single = ( precision == "float32")
+        elif self.parent.numba == "True" and numbaOK: 
+            single = False
+        else: 
+            return False
+
+        cancel = self.parent.cancelFlag
         if self.colorPars.smooth == "DistEst": 
             horizon = 2**40
         else: 
             horizon = 4
         width = self.parent.widthM
-        
-        mandelbrotTiled.TileWorker.NCOL = NCOL
-        mandelbrotTiled.TileWorker.NROW = NROW
-        mandelbrotTiled.TileWorker.width = width
-        mandelbrotTiled.TileWorker.finalImage = np.zeros(( width, width), dtype=np.float64)
-        mandelbrotTiled.TileWorker.finalZAbs = np.zeros(( width, width), dtype=np.float64)
-        mandelbrotTiled.TileWorker.xmin = self.parent.cxM - self.parent.deltaM/2.
-        mandelbrotTiled.TileWorker.xmax = self.parent.cxM + self.parent.deltaM/2.
-        mandelbrotTiled.TileWorker.ymin = self.parent.cyM - self.parent.deltaM/2.
-        mandelbrotTiled.TileWorker.ymax = self.parent.cyM + self.parent.deltaM/2.
-        mandelbrotTiled.TileWorker.max_iter = self.parent.maxIterM
-        mandelbrotTiled.TileWorker.horizon = horizon
-        mandelbrotTiled.TileWorker.finished_count = 0
-        mandelbrotTiled.TileWorker.total_tiles = NROW*NCOL
-        
-        #
-        # to ensure that collect() is thread-safe 
-        # if the GUI is updated from collect, signals have to used
-        # because direct GUI updates from threads are unsafe
-        #
-        mandelbrotTiled.TileWorker.lock = threading.Lock()
-        
+        xmin = self.parent.cxM - self.parent.deltaM/2.
+        ymin = self.parent.cyM - self.parent.deltaM/2.
+        dx = self.parent.deltaM/float( width)
+        maxIter = self.parent.maxIterM
+        mirror = None
+        if self.parent.symmetry == "True": 
+            ymin = self.snapSymmetric( ymin, dx, width)
+            mirror = self.mirrorRange( ymin, dx, 0, width)
+        key = self.resultKey( "M", xmin, ymin, dx, width, maxIter, horizon, single)
+        if self.resultCache.contains( key): 
+            return False
+
         startTime = time.time()
-        workers = []
+        escapeCount = np.zeros(( width, width), dtype=np.int32)
+        zAbs = np.zeros(( width, width), dtype=np.float64)
+        rows = np.ones(( width, width), dtype=bool)
+        done = np.zeros(( width, width), dtype=bool)
+        if mirror is not None: 
+            mirrored = self.mirrorTodo( mirror, rows, done)
+        todo = np.zeros(( width, width), dtype=bool)
+        for i in range( 0, width, PREFETCH_ROWS): 
+            busy = time.time()
+            todo.fill( False)
+            todo[ i:i+PREFETCH_ROWS] = rows[ i:i+PREFETCH_ROWS]
+            if self.parent.cython == "True": 
+                self.computeMasked( todo, escapeCount, zAbs, xmin, dx, ymin, dx, 0, 0, maxIter, horizon, 
+                                    single = single, cancel = cancel)
+            else: 
+                mandelbrotNumba.compute_mandelbrot_masked( xmin, dx, ymin, dx, 0, 0, maxIter, float( horizon), 
+                                                           todo.view( np.uint8), escapeCount, zAbs, 
+                                                           cancel = cancel)
+            idle = time.time() + ( time.time() - busy)*( 1. - share)/share
+            while cancel[0] == 0 and time.time() < idle: 
+                time.sleep( PREFETCH_SLEEP)
+            if cancel[0] != 0: 
+                return False
+        if mirror is not None: 
+            self.mirrorRows( mirror, mirrored, done, escapeCount, zAbs)
+        self.cacheResult( key, escapeCount = escapeCount, zAbs = zAbs, 
+                          grid = np.array( [ xmin, ymin, dx, 0, 0]))
 
-        for row in range( NROW): 
-            for col in range( NCOL): 
-                worker = mandelbrotTiled.TileWorker( col, row)
-                workers.append( worker)
-                worker.start()
+        if self.parent.debugSpeed == "True" and not self.parent.isAnimating: 
+            self.parent.logWidget.append( "P: %5.3f s, %s, %d%% CPU%s" % 
+                                          ( time.time() - startTime, label, 100*share, self.cacheInfo()))
+        return True
 
-        while mandelbrotTiled.TileWorker.finished_count < NROW*NCOL:
-            self.parent.app.processEvents()
+    def reuseFrame( self, xmin, ymin, dx, maxIter, horizon, escapeCount, zAbs, done, 
+                    zx = None, zy = None, status = None, resumeOnly = False, single = False):
+        """
+        zoom-in: if dx is frame.dx/r, r integer, every r-th pixel of the new 
+          grid coincides with a pixel of the cached frame. The new grid is 
+          snapped (< 1/2 pixel) to the cached samples, these pixels are 
+          copied to escapeCount, zAbs and marked in done. 
+          The cached frame with the smallest r is used.
+        pan: r == 1, the cached frame is shifted by whole pixels, 
+          only the L-shaped region that came into view remains to be done
+        maxIter raised: resumable frames ( status not None), the bounded 
+          pixels are copied with their orbits but not marked in done, 
+          they are continued. resumeOnly: the same grid, maxIter raised
+        single: frames of other kernel paths, e.g. float32 and float64, 
+          are not mixed, see kernelPath()
+
+        returns ( x0, y0, dx, i0, j0, nReused), the snapped grid, see Frame
+        """
+        width = escapeCount.shape[1]
+        best = None
+        path = self.kernelPath( single)
+        for frame in reversed( self.frameCache): 
+            if frame.width != width or frame.horizon != horizon or \
+               frame.path != path: 
+                continue
+            if frame.maxIter != maxIter: 
+                if frame.maxIter > maxIter or frame.status is None or status is None: 
+                    continue
+            elif status is not None and frame.status is None: 
+                continue
+            ratio = frame.dx/dx
+            r = int( round( ratio))
+            if r < 1 or abs( ratio - r) > RATIO_TOLERANCE*r: 
+                continue
+            #
+            # the old pixel o is the new pixel k + r*o
+            #
+            kx = ( frame.x0 + frame.dx*frame.j0 - xmin)/( frame.dx/r)
+            ky = ( frame.y0 + frame.dx*frame.i0 - ymin)/( frame.dx/r)
+            if abs( kx) >= r*width or abs( ky) >= r*width: 
+                continue
+            if resumeOnly and ( r != 1 or round( kx) != 0 or round( ky) != 0 or 
+                                frame.maxIter == maxIter): 
+                continue
+            if best is None or r < best[1]: 
+                best = ( frame, r, int( round( kx)), int( round( ky)))
+        if best is None: 
+            return ( xmin, ymin, dx, 0, 0, 0)
+
+        ( frame, r, kx, ky) = best
+        ( x0, y0, dx) = ( frame.x0, frame.y0, frame.dx/r)
+        i0 = r*frame.i0 - ky
+        j0 = r*frame.j0 - kx
+        if abs( i0) > OFFSET_MAX or abs( j0) > OFFSET_MAX: 
+            #
+            # new anchor, the copied pixels are off by rounding errors
+            #
+            ( x0, y0, i0, j0) = ( x0 + dx*j0, y0 + dx*i0, 0, 0)
 
         #
-        # make sure that there is not left-over
+        # cropped frames have fewer rows and columns, see cropFrame()
         #
-        for elm in workers:
-            elm.quit()
+        oi = np.arange( frame.escapeCount.shape[0])
+        oj = np.arange( frame.escapeCount.shape[1])
+        j = kx + r*oj
+        jOK = ( j >= 0) & ( j < width)
+        i = ky + r*oi
+        iOK = ( i >= 0) & ( i < width)
+        new = np.ix_( i[ iOK], j[ jOK])
+        old = np.ix_( oi[ iOK], oj[ jOK])
+        escapeCount[ new] = frame.escapeCount[ old]
+        zAbs[ new] = frame.zAbs[ old]
+        done[ new] = True
+        if status is not None: 
+            zx[ new] = frame.zx[ old]
+            zy[ new] = frame.zy[ old]
+            status[ new] = frame.status[ old]
+            if frame.maxIter < maxIter: 
+                escapeCount[ status == RESUME_INTERIOR] = maxIter
+                done[ status == RESUME_BOUNDED] = False
+
+        return ( x0, y0, dx, i0, j0, np.count_nonzero( iOK)*np.count_nonzero( jOK))
+
+    def snapSymmetric( self, vmin, dv, n):
+        """
+        if the axis, v = 0, is in the view, vmin is moved by less than dv/4 
+          such that the axis is on the pixel grid or halfway between pixels
+        """
+        if vmin >= 0. or vmin + dv*( n - 1) <= 0.: 
+            return vmin
+        return -round( -2.*vmin/dv)*dv/2.
+
+    def mirrorAxis( self, vmin, dv, k0):
+        """
+        returns m, the pixel k at vmin + dv*( k0 + k) mirrors the 
+          pixel m - k across v = 0, or None
+        """
+        m = -2.*( vmin/dv + k0)
+        if abs( m - round( m)) > SYMMETRY_TOLERANCE: 
+            return None
+        return int( round( m))
+
+    def mirrorRange( self, vmin, dv, k0, n):
+        """
+        returns ( a, b, m): the pixels a <= k < b are the mirror images 
+          of the pixels m - k, m - k < a, or None
+        """
+        m = self.mirrorAxis( vmin, dv, k0)
+        if m is None: 
+            return None
+        a = m//2 + 1
+        b = min( n - 1, m) + 1
+        if b <= a: 
+            return None
+        return ( a, b, m)
+
+    def mirrorTodo( self, mirror, todo, done):
+        """
+        the todo pixels of the mirrored rows are replaced by their 
+          mirror images, returns the mirrored todo pixels
+        """
+        ( a, b, m) = mirror
+        mirrored = todo[ a:b].copy()
+        todo[ a:b] = False
+        todo[ m-b+1:m-a+1] |= mirrored[::-1] & ~done[ m-b+1:m-a+1]
+        return mirrored
+
+    def mirrorRows( self, mirror, mirrored, done, escapeCount, zAbs, zx = None, zy = None, status = None):
+        """
+        copies the mirror images to the mirrored pixels, 
+          the orbits are conjugated
+        """
+        ( a, b, m) = mirror
+        for ( temp, sign) in (( escapeCount, 1), ( zAbs, 1), ( zx, 1), ( zy, -1), ( status, 1)): 
+            if temp is None: 
+                continue
+            src = temp[ m-b+1:m-a+1][::-1]
+            if sign < 0: 
+                src = -src
+            np.copyto( temp[ a:b], src, where = mirrored)
+        done[ a:b] |= mirrored
+        return 
+
+    def computeMasked( self, todo, escapeCount, zAbs, xmin, dx, ymin, dy, i0, j0, maxIter, horizon, 
+                       zx = None, zy = None, status = None, single = False, cancel = None, 
+                       stats = None):
+        """
+        calculates the pixels where todo is True, in place, 
+          pixel ( i, j) is at ( xmin + dx*( j0 + j), ymin + dy*( i0 + i))
+        tiled: the tiles without work are skipped
+        status not None: resumable, the orbits continue from zx, zy
+        simd: compute_mandelbrot_simd, lanes of pixels in lockstep
+        single: compute_mandelbrot_f32, float32 lanes
+        cancel: see startRender()
+        stats: see newIterStats(), the counts are added
+        """
+        simd = ( self.parent.simd == "True")
+        if self.parent.tiled == "True": 
+            #
+            # the tiles write into escapeCount, zAbs, no overlap, no lock, 
+            # every worker has its row of stats
+            #
+            pool = self.getTilePool()
+            def f( tile):
+                temp = None
+                if stats is not None: 
+                    k = pool.workerIndex()
+                    temp = stats[ k:k+1]
+                if status is not None: 
+                    mandelbrotTiled.mandelbrotResumeTile( tile, xmin, dx, ymin, dy, i0, j0, maxIter, horizon, 
+                                                          todo, escapeCount, zAbs, zx, zy, status, cancel, 
+                                                          temp)
+                else: 
+                    mandelbrotTiled.mandelbrotTile( tile, xmin, dx, ymin, dy, i0, j0, maxIter, horizon, 
+                                                    todo, escapeCount, zAbs, simd, single, cancel, temp)
+            ( height, width) = todo.shape
+            tiles = mandelbrotTiled.makeTiles( width, height, self.parent.tileSize)
+            pool.run( f, tiles, self.parent.app.processEvents)
+        elif status is not None: 
+            mandelbrotCython.compute_mandelbrot_resume( xmin, dx, ymin, dy, i0, j0, maxIter, horizon, 
+                                                        todo.view( np.uint8), escapeCount, zAbs, 
+                                                        zx, zy, status, cancel = cancel, stats = stats)
+        elif single: 
+            mandelbrotCython.compute_mandelbrot_f32( xmin, dx, ymin, dy, i0, j0, maxIter, horizon, 
+                                                     todo.view( np.uint8), escapeCount, zAbs, 
+                                                     cancel = cancel, stats = stats)
+        elif simd: 
+            mandelbrotCython.compute_mandelbrot_simd( xmin, dx, ymin, dy, i0, j0, maxIter, horizon, 
+                                                      todo.view( np.uint8), escapeCount, zAbs, 
+                                                      cancel = cancel, stats = stats)
+        else: 
+            mandelbrotCython.compute_mandelbrot_masked( xmin, dx, ymin, dy, i0, j0, maxIter, horizon, 
+                                                        todo.view( np.uint8), escapeCount, zAbs, 
+                                                        cancel = cancel, stats = stats)
+        return 
 
-        escapeCount = mandelbrotTiled.TileWorker.finalImage
-        zAbs = mandelbrotTiled.TileWorker.finalZAbs
+    def newIterStats( self): 
+        """
+        the per-thread rows of the iteration statistics, int64, 
+          enough rows for the OpenMP, Numba and tile pool threads. 
+          Tiled: the pool is created first, the rows follow its size
+        """
+        nRows = 1
+        if cythonOK: 
+            nRows = max( nRows, mandelbrotCython.stats_threads())
+        if numbaOK: 
+            nRows = max( nRows, mandelbrotNumba.statsThreads())
+        if self.parent.tiled == "True" or self.tilePool is not None: 
+            nRows = max( nRows, self.getTilePool().nThreads)
+        return np.zeros(( nRows, ITER_STATS_SIZE), dtype=np.int64)
+
+    def addIterStats( self, stats, escapeCount, zAbs, maxIter): 
+        """
+        the copied pixels are added to the first row of stats, the layout 
+          of mandelbrotCython.stats_add(). The statistics describe the 
+          whole frame, not only the pixels calculated, e.g. the resumed ones
+        """
+        escaped = escapeCount[ escapeCount < maxIter]
+        stats[ 0, 0] += escaped.size
+        stats[ 0, 1] += np.count_nonzero( zAbs[ escapeCount >= maxIter] > 0.)
         #
-        # nongil cython code has no sqrt()
+        # frexp: the exponent is the bit length
         #
-        #zAbs = np.sqrt( zAbs) 
-        
-        corr = (utils.DATA_NORM-1)/float( self.parent.maxIterM - 1)
-        escapeCount = escapeCount.astype(np.float64)
-        escapeCount *= corr
-
-        if self.colorPars.smooth == "DistEst":
-            zAbs[ zAbs <= 0.] = LOG_HELPER
-            temp = np.log( zAbs)
-            temp[ temp <= 0.] = LOG_HELPER
-            output = escapeCount
-            log_horizon = np.log2(np.log(horizon))
-            corr = np.nan_to_num( escapeCount + 
-                                  1 - np.log2( temp)*corr + log_horizon)
-            self.parent.dataMandelbrotSet = np.where(output != 0, corr, output)
-        else:
-            self.parent.dataMandelbrotSet = escapeCount
+        hist = np.bincount( np.frexp( escaped)[1], minlength = ITER_STATS_SIZE - 2)
+        stats[ 0, 2:] += hist[ :ITER_STATS_SIZE - 2]
+        return
 
-        if self.parent.debugSpeed == "True": 
-            if not self.parent.isAnimating: 
-                self.parent.logWidget.append( "M: %5.3f s, Cython, tiled, CardioidBulb %s, prange() %s" % 
-                                       (( time.time() - startTime), repr( self.parent.cardioidBulb), repr( self.parent.prange))) 
+    def adjustMaxIter( self, stats): 
+        """
+        the rows of stats are merged. autoMaxIter: maxIterM of the next 
+          frame is raised or lowered, see AUTO_RAISE. 
+          Returns the text for debugSpeed
+        """
+        stats = stats.sum( axis = 0)
+        ( escaped, boundary, hist) = ( stats[0], stats[1], stats[2:])
+        n = escaped + boundary
+        if n == 0: 
+            return ""
+        maxIter = self.parent.maxIterM
+        info = ", escaped %d, boundary %.2f%%" % ( escaped, 100.*boundary/n)
+        if self.parent.autoMaxIter != "True": 
+            return info
+        new = maxIter
+        if boundary > AUTO_RAISE*n: 
+            new = 2**int( np.log2( maxIter) + 1)
+        elif boundary < AUTO_RAISE/10.*n and escaped > 0: 
+            #
+            # AUTO_QUANTILE of the escape counts are below 2**b
+            #
+            b = int( np.searchsorted( np.cumsum( hist), AUTO_QUANTILE*escaped))
+            if 2**( b + 3) <= maxIter: 
+                new = 2**( b + 2)
+        new = min( max( new, min( AUTO_MIN, maxIter)), max( AUTO_MAX, maxIter))
+        if new != maxIter: 
+            self.parent.maxIterM = new
+            info += ", maxIter %d -> %d" % ( maxIter, new)
+        return info
+
+    def calcBuddhabrot( self, display = True):
+        """
+        density: Buddhabrot or Nebulabrot, see mandelbrotBuddha. The 
+          samples are drawn in batches, the image is emitted after each 
+          batch, the next request cancels the render. 
+          Nebulabrot: RGB, uint8, not with dynamic operators
+        """
+        if cythonOK and self.parent.cython == "True": 
+            ( useCython, nPlanes) = ( True, mandelbrotCython.stats_threads())
+        elif numbaOK: 
+            ( useCython, nPlanes) = ( False, mandelbrotNumba.statsThreads())
+        else: 
+            self.parent.logWidget.append( "calcBuddhabrot: no Cython, no Numba")
+            return 
 
+        nebula = ( self.parent.density == "Nebulabrot" and self.parent.execDynOp != "True")
+        width = self.parent.widthM
+        xmin = self.parent.cxM - self.parent.deltaM/2.
+        ymin = self.parent.cyM - self.parent.deltaM/2.
+        dx = self.parent.deltaM/float( width)
+        channelIter = mandelbrotBuddha.channelIters( self.parent.maxIterM, nebula)
 
-        if self.parent.execDynOp == "True": 
-            if self.parent.operatorWidget is not None: 
-                self.parent.operatorWidget.cb_runOp()
+        startTime = time.time()
+        cancel = self.startRender( "M")
+        render = mandelbrotBuddha.Buddhabrot( xmin, ymin, dx, width, channelIter, useCython, nPlanes)
+        render.pilot( cancel)
+        while render.nSamples < mandelbrotBuddha.BUDDHA_SAMPLES: 
+            if self.renderCancelled( cancel, "M"): 
+                return 
+            render.batch( cancel)
+            if display and not self.parent.isAnimating: 
+                self.MBSUpdated.emit( self.buddhabrotImage( render, nebula))
+                self.parent.app.processEvents()
+        if self.renderCancelled( cancel, "M"): 
+            return 
 
+        self.parent.dataMandelbrotSet = self.buddhabrotImage( render, nebula)
+        if self.parent.debugSpeed == "True" and not self.parent.isAnimating: 
+            self.parent.logWidget.append( "M: %5.3f s, %s, %s, %d threads, %d samples, %.1f%% reach the view, maxIter %s" % 
+                                          (( time.time() - startTime), self.parent.density, 
+                                           "Cython" if useCython else "Numba", render.nPlanes, render.nSamples, 
+                                           100.*render.nHits/render.nSamples, 
+                                           "/".join( [ str( temp) for temp in channelIter])))
         self.MBSUpdated.emit( self.parent.dataMandelbrotSet)
+        return 
 
-        return
-
-    def calcMandelbrotSetDzCython( self):
+    def buddhabrotImage( self, render, nebula): 
+        """
+        Buddhabrot: normalized to DATA_NORM, Nebulabrot: RGB, uint8
+        """
+        image = render.image()
+        if nebula: 
+            return ( 255.*image).astype( np.uint8)
+        return image[:, :, 0]*( utils.DATA_NORM - 1)
 
-        if self.parent.tiled == "True": 
-            self.calcMandelbrotSetDzCythonTiled()
-            return
-        
+    def calcMandelbrotSetMarianiSilver( self):
+        """
+        solid guessing, rectangles with a uniform border are filled.
+        debugSpeed: the result is compared to the full render
+        """
+        if self.colorPars.smooth == "DistEst": 
+            horizon = 2**40
+        else: 
+            horizon = 4
         width = self.parent.widthM
         xmin = self.parent.cxM - self.parent.deltaM/2.
         xmax = self.parent.cxM + self.parent.deltaM/2.
         ymin = self.parent.cyM - self.parent.deltaM/2.
         ymax = self.parent.cyM + self.parent.deltaM/2.
+        #
+        # DistEst needs zAbs of every escaped pixel
+        #
+        fillEscaped = (self.colorPars.smooth != "DistEst")
 
-        max_iter = self.parent.maxIterM
-
-        x = np.linspace(xmin, xmax, width)
-        y = np.linspace(ymin, ymax, width)
-        X, Y = np.meshgrid(x, y)
-        C = X + 1j * Y
         startTime = time.time()
+        ( escapeCount, zAbs) = mandelbrotCython.compute_mandelbrot_ms( 
+            width, width, xmin, xmax, ymin, ymax, 
+            self.parent.maxIterM, horizon, fill_escaped = fillEscaped)
+        timeMS = time.time() - startTime
 
-        # Compute smoothed Mandelbrot
-        result = mandelbrotCython.mandelbrot_dz(C, max_iter=max_iter)
+        if self.parent.debugSpeed == "True" and not self.parent.isAnimating: 
+            startTime = time.time()
+            ( escapeFull, zAbsFull) = mandelbrotCython.compute_mandelbrot( 
+                width, width, xmin, xmax, ymin, ymax, 
+                self.parent.maxIterM, horizon, periodicity = True)
+            timeFull = time.time() - startTime
+            nDiff = np.count_nonzero( escapeCount != escapeFull)
+            self.parent.logWidget.append( 
+                "M: %5.3f s, Cython, Mariani-Silver, full render %5.3f s, %d pixels (%.3f%%) differ" % 
+                ( timeMS, timeFull, nDiff, 100.*nDiff/float( escapeCount.size)))
+
+        self.parent.dataMandelbrotSet = self.normalizeMandelbrotSet( escapeCount, zAbs, horizon)
+
+        if self.parent.execDynOp == "True": 
+            if self.parent.operatorWidget is not None: 
+                self.parent.operatorWidget.cb_runOp()
 
-        # Normalize and plot
-        norm = result / np.max(result)
-        norm = norm ** 0.8  # gamma correction
-        norm /= 2.
-        norm *= utils.DATA_NORM
-        
-        corr = (utils.DATA_NORM-1)/float( self.parent.maxIterM - 1)
-        escapeCount = np.copy( norm)
-        escapeCount = escapeCount.astype(np.float64)
-        escapeCount *= corr
-        if self.parent.debugSpeed == "True": 
-            self.parent.logWidget.append( "M: %5.3f s, Cython, Dz, min %g, max%g " % 
-                                   (( time.time() - startTime), 
-                                    escapeCount.min(), escapeCount.max()))
-        self.parent.dataMandelbrotSet = escapeCount
         self.MBSUpdated.emit( self.parent.dataMandelbrotSet)
 
         return 
 
-
-    def calcMandelbrotSetDzCythonTiled( self):
-
+    def benchmarkKernels( self):
+        """
+        the Cython and Numba kernels on the current view, 1 thread, 
+          the speed-up per core relative to the first kernel
+        """
+        if not cythonOK and not numbaOK: 
+            self.parent.logWidget.append( "benchmarkKernels: no Cython, no Numba")
+            return 
         width = self.parent.widthM
+        maxIter = self.parent.maxIterM
         xmin = self.parent.cxM - self.parent.deltaM/2.
-        xmax = self.parent.cxM + self.parent.deltaM/2.
         ymin = self.parent.cyM - self.parent.deltaM/2.
-        ymax = self.parent.cyM + self.parent.deltaM/2.
+        dx = self.parent.deltaM/float( width)
+        todo = np.ones(( width, width), dtype=np.uint8)
+
+        def masked( func): 
+            def f(): 
+                func( xmin, dx, ymin, dx, 0, 0, maxIter, 4, todo, 
+                      np.zeros(( width, width), dtype=np.int32), 
+                      np.zeros(( width, width), dtype=np.float64), num_threads = 1)
+            return f
+        kernels = []
+        if cythonOK: 
+            kernels += [ 
+                ( "compute_mandelbrot", 
+                  lambda: mandelbrotCython.compute_mandelbrot( width, width, xmin, xmin + dx*width, 
+                                                               ymin, ymin + dx*width, maxIter, 4, 
+                                                               periodicity = True, num_threads = 1)), 
+                ( "compute_mandelbrot_masked", masked( mandelbrotCython.compute_mandelbrot_masked)), 
+                ( "compute_mandelbrot_simd, %d lanes" % mandelbrotCython.simd_lanes(), 
+                  masked( mandelbrotCython.compute_mandelbrot_simd)), 
+                ( "compute_mandelbrot_f32, %d lanes" % mandelbrotCython.simd_lanes( True), 
+                  masked( mandelbrotCython.compute_mandelbrot_f32)), 
+            ]
+        if numbaOK: 
+            #
+            # the first call compiles or loads the cache, not timed
+            #
+            def numba(): 
+                mandelbrotNumba.compute_mandelbrot_masked( 
+                    xmin, dx, ymin, dx, 0, 0, maxIter, 4., todo, 
+                    np.zeros(( width, width), dtype=np.int32), np.zeros(( width, width), dtype=np.float64))
+            mandelbrotNumba.compute_mandelbrot_masked( 
+                xmin, dx, ymin, dx, 0, 0, maxIter, 4., np.ones(( 1, 1), dtype=np.uint8), 
+                np.zeros(( 1, 1), dtype=np.int32), np.zeros(( 1, 1), dtype=np.float64))
+            kernels.append(( "mandelbrotNumba.compute_mandelbrot_masked", numba))
+            mandelbrotNumba.setNumThreads( 1)
+        self.parent.logWidget.append( "benchmarkKernels: width %d, maxIter %d, 1 thread" % 
+                                      ( width, maxIter))
+        timeRef = None
+        for ( name, f) in kernels: 
+            startTime = time.time()
+            f()
+            temp = time.time() - startTime
+            if timeRef is None: 
+                timeRef = temp
+            self.parent.logWidget.append( "  %-44s %6.3f s, speed-up %5.2f" % 
+                                          ( name, temp, timeRef/temp))
+            self.parent.app.processEvents()
+        if numbaOK: 
+            mandelbrotNumba.setNumThreads()
+        return 
 
-        if self.colorPars.smooth == "DistEst": 
-            horizon = 2**40
-        else: 
-            horizon = 4
+    def getTilePool( self):
+        """
+        the worker threads are created once
+        """
+        if self.tilePool is None: 
+            self.tilePool = mandelbrotTiled.TilePool()
+        return self.tilePool
 
-        log_horizon = np.log2(np.log(horizon))
+    def calcMandelbrotSetDzCython( self):
+        """
+        smooth iteration plus distance, compute_mandelbrot_dz, 
+          nogil and parallel, tiled: the TilePool
+        """
+        width = self.parent.widthM
+        xmin = self.parent.cxM - self.parent.deltaM/2.
+        ymin = self.parent.cyM - self.parent.deltaM/2.
+        dx = self.parent.deltaM/float( width)
+        maxIter = self.parent.maxIterM
 
-        mandelbrotTiled.TileWorkerDz.NCOL = NCOL
-        mandelbrotTiled.TileWorkerDz.NROW = NROW
-        mandelbrotTiled.TileWorkerDz.width = width
-        mandelbrotTiled.TileWorkerDz.finalImage = np.zeros(( width, width), dtype=np.float64)
-        mandelbrotTiled.TileWorkerDz.xmin = xmin
-        mandelbrotTiled.TileWorkerDz.xmax = xmax
-        mandelbrotTiled.TileWorkerDz.ymin = ymin
-        mandelbrotTiled.TileWorkerDz.ymax = ymax
-        mandelbrotTiled.TileWorkerDz.max_iter = self.parent.maxIterM
-        mandelbrotTiled.TileWorkerDz.horizon = horizon
-        mandelbrotTiled.TileWorkerDz.finished_count = 0
-        mandelbrotTiled.TileWorkerDz.total_tiles = NROW*NCOL
-        mandelbrotTiled.TileWorkerDz.lock = threading.Lock()
-        
+        result = np.zeros(( width, width), dtype=np.float64)
         startTime = time.time()
-        for row in range( NROW): 
-            for col in range( NCOL): 
-                temp = mandelbrotTiled.TileWorkerDz( col, row)
-                temp.finished.connect( temp.collect)
-                temp.run()
-
-        while mandelbrotTiled.TileWorkerDz.finished_count < NROW*NCOL:
-            self.parent.app.processEvents()
-
-        result = mandelbrotTiled.TileWorkerDz.finalImage
+        cancel = self.startRender( "M")
+        if self.parent.tiled == "True": 
+            def f( tile):
+                mandelbrotTiled.mandelbrotDzTile( tile, xmin, dx, ymin, dx, maxIter, result, cancel)
+            tiles = mandelbrotTiled.makeTiles( width, width, self.parent.tileSize)
+            self.getTilePool().run( f, tiles, self.parent.app.processEvents)
+            temp = "tiled, tile size %d, %d threads" % ( self.parent.tileSize, self.getTilePool().nThreads)
+        else: 
+            mandelbrotCython.compute_mandelbrot_dz( xmin, dx, ymin, dx, 0, 0, maxIter, result, 
+                                                    cancel = cancel)
+            temp = "not tiled"
+        if self.renderCancelled( cancel, "M"): 
+            return 
 
-        # Normalize and plot
-        norm = result / np.max( result)
-        norm = norm ** 0.8  # gamma correction
-        norm /= 2.
-        norm *= utils.DATA_NORM  
-        
-        corr = (utils.DATA_NORM-1)/float( self.parent.maxIterM - 1)
-        escapeCount = np.copy( norm)
-        escapeCount = escapeCount.astype(np.float64)
-        escapeCount *= corr
-        if self.parent.debugSpeed == "True": 
-            self.parent.logWidget.append( "%5.3f s, Cython, Dz, tiled, min %g, max%g " % 
-                                   (( time.time() - startTime), 
+        escapeCount = self.normalizeMandelbrotSetDz( result)
+        if self.parent.debugSpeed == "True" and not self.parent.isAnimating: 
+            self.parent.logWidget.append( "M: %5.3f s, Cython, Dz, %s, min %g, max %g" % 
+                                   (( time.time() - startTime), temp, 
                                     escapeCount.min(), escapeCount.max()))
         self.parent.dataMandelbrotSet = escapeCount
         self.MBSUpdated.emit( self.parent.dataMandelbrotSet)
-        
-        return
+
+        return 
     
     def calcMandelbrotSetDZ( self):
         """
@@ -472,94 +1808,93 @@ class FractalEngine( QWidget):
             
 
     def calcMandelbrotSetNumba( self):
-
-        if self.colorPars.smooth != "None": 
-            self.parent.logWidget.append( "calcNumba: smooth must be None'")
+        """
+        mandelbrotNumba, parallel CPU kernels, if Cython is not built. 
+          The first call of a session loads the compiled code from the cache.
+          symmetry: see calcMandelbrotSetCython()
+        """
+        if not numbaOK: 
+            self.parent.logWidget.append( "calcNumba: no Numba")
             return 
-            
-        # Parameters
+
+        if self.colorPars.smooth == "DistEst": 
+            horizon = 2**40
+        else: 
+            horizon = 4
         width = self.parent.widthM
         xmin = self.parent.cxM - self.parent.deltaM/2.
-        xmax = self.parent.cxM + self.parent.deltaM/2.
         ymin = self.parent.cyM - self.parent.deltaM/2.
-        ymax = self.parent.cyM + self.parent.deltaM/2.
+        dx = self.parent.deltaM/float( width)
+        maxIter = self.parent.maxIterM
+        mirror = None
+        if self.parent.symmetry == "True": 
+            temp = self.snapSymmetric( ymin, dx, width)
+            if temp != ymin: 
+                ymin = temp
+                self.parent.cyM = ymin + self.parent.deltaM/2.
+                self.syncDecimalMembers()
+            mirror = self.mirrorRange( ymin, dx, 0, width)
+        key = self.resultKey( "M", xmin, ymin, dx, width, maxIter, horizon)
+        entry = self.cachedResult( key)
+        if entry is not None: 
+            return self.showCachedMandelbrotSet( entry, horizon, False)
+
+        escapeCount = np.zeros(( width, width), dtype=np.int32)
+        zAbs = np.zeros(( width, width), dtype=np.float64)
+        todo = np.ones(( width, width), dtype=bool)
+        done = np.zeros(( width, width), dtype=bool)
 
-        max_iter = self.parent.maxIterM
+        startTime = time.time()
+        cancel = self.startRender( "M")
+        if mirror is not None: 
+            mirrored = self.mirrorTodo( mirror, todo, done)
+        stats = self.newIterStats()
+        mandelbrotNumba.compute_mandelbrot_masked( xmin, dx, ymin, dx, 0, 0, maxIter, float( horizon), 
+                                                   todo.view( np.uint8), escapeCount, zAbs, 
+                                                   stats = stats, cancel = cancel)
+        if self.renderCancelled( cancel, "M"): 
+            return 
+        if mirror is not None: 
+            self.mirrorRows( mirror, mirrored, done, escapeCount, zAbs)
+        self.cacheResult( key, escapeCount = escapeCount, zAbs = zAbs, 
+                          grid = np.array( [ xmin, ymin, dx, 0, 0]))
+
+        self.parent.dataMandelbrotSet = self.normalizeMandelbrotSet( escapeCount, zAbs, horizon)
+        info = self.adjustMaxIter( stats)
+        if self.parent.debugSpeed == "True" and not self.parent.isAnimating: 
+            temp = ""
+            if mirror is not None: 
+                temp = ", mirrored %d rows" % ( mirror[1] - mirror[0])
+            self.parent.logWidget.append( "M: %5.3f s, Numba, %d threads%s%s%s" % 
+                                          (( time.time() - startTime), 
+                                           mandelbrotNumba.numba.get_num_threads(), temp, 
+                                           info, self.cacheInfo()))
+
+        self.MBSUpdated.emit( self.parent.dataMandelbrotSet)
+        return 
 
+    def calcMandelbrotSetDzNumba( self):
+        """
+        smooth iteration plus distance, mandelbrotNumba.compute_mandelbrot_dz
+        """
+        width = self.parent.widthM
+        xmin = self.parent.cxM - self.parent.deltaM/2.
+        ymin = self.parent.cyM - self.parent.deltaM/2.
+        dx = self.parent.deltaM/float( width)
+
+        result = np.zeros(( width, width), dtype=np.float64)
         startTime = time.time()
-        
-        # Allocate output arrays
-        image_gpu = np.zeros(( width, width), dtype=np.uint32)
-        """
-        for Mandelbrot set: 
-          - one thread per pixel
-          - threads per block: (16, 16) is a common sweet spot
-          - blockspergrid_x, ~_y: how many blocks are
-            needed to cover the whole image
-            +  (a + b - 1)/b
-              = Even if the image size is not divisible by 16,
-                you still launch enough blocks.
-              = Extra threads simply exit early inside the kernel.
-            + blockspergrid = (63, 63)
-          - 1 Mio threads do not run simultaneously
-            + they are scheduled in warps (32 threads) and blocks
-              (e.g. 256 theads)
-              and they are executed in waves
-            + warps are the physical execution unit
-            + You launch 1,000,000 threads.
-            + The GPU queues them.
-            + It runs as many as it can at once (depending on SM count,
-              occupancy, registers, etc.).
-            + When one warp stalls (e.g., waiting on memory), another warp runs.
-          - SIMT - single instruction multiple threads, SIMT
-          - all 32 threads within one warp
-            + execute the same instruction
-            + at the same time
-            + on different data
-          - each warp executes in lockstep (SIMT)
-        """
-        threadsperblock = (16, 16)
-        """
-        block: 16 x 16 threads
-        Warp 0: threads (0 - 31)
-        Warp 1: threads (32 - 63)
-        Warp 2: threads (64 - 95)
-        ...
-        Warp 7: threads (224 - 255)
-        """
-        blockspergrid_x = (width + threadsperblock[0] - 1) // threadsperblock[0]
-        blockspergrid_y = (width + threadsperblock[1] - 1) // threadsperblock[1]
-        blockspergrid = (blockspergrid_x, blockspergrid_y) # (63, 63) 
-        """
-        blocks define cooperation between threads
-          + share data via shared memory
-          + synchronize threads with __syncthreads()
-            (no synchronize across blocks)
-          + cooperate on partial results using shared memory
-        blocks are the unit of scheduling on SMs (streaming multiprocessors)
-        blocks define resource allocation
-          - each block get a chunk of shared memory
-          - ... a budget of registers
-          -  ... a set of warps
-        """
-        d_image = cuda.to_device(image_gpu)
-        mandelbrot_kernel[blockspergrid, threadsperblock]( xmin, xmax,
-                                                           ymin, ymax,
-                                                           d_image, max_iter)
-        """
-        obj[ key] is the same as obj.__getitem__( Key)
-        Cuda overrides __getitem__
-        """
-        escapeCount = d_image.copy_to_host()
+        cancel = self.startRender( "M")
+        mandelbrotNumba.compute_mandelbrot_dz( xmin, dx, ymin, dx, self.parent.maxIterM, result, 
+                                               cancel = cancel)
+        if self.renderCancelled( cancel, "M"): 
+            return 
 
-        corr = (utils.DATA_NORM-1)/float( self.parent.maxIterM - 1)
-        escapeCount = escapeCount.astype(np.float64)
-        escapeCount *= corr
+        escapeCount = self.normalizeMandelbrotSetDz( result)
         if self.parent.debugSpeed == "True" and not self.parent.isAnimating: 
-            self.parent.logWidget.append( "M: %5.3f s, numba, min %g, max %g " % 
+            self.parent.logWidget.append( "M: %5.3f s, Numba, Dz, min %g, max %g" % 
                                    (( time.time() - startTime), 
                                     escapeCount.min(), escapeCount.max()))
-
         self.parent.dataMandelbrotSet = escapeCount
         self.MBSUpdated.emit( self.parent.dataMandelbrotSet)
         return 
@@ -660,6 +1995,14 @@ class FractalEngine( QWidget):
 # ===
 
     def calcJuliaSet( self, display = True):
+        """
+        calculates self.dataJuliaSet, see calcMandelbrotSet()
+        """
+        self.cancelRender( "J")
+        with self.renderLock: 
+            return self.renderJuliaSet( display)
+
+    def renderJuliaSet( self, display = True):
         # 
         if self.parent.juliaMode == 'Off':
             return 
@@ -668,6 +2011,8 @@ class FractalEngine( QWidget):
         
         if self.parent.cython == "True":
             return self.calcJuliaSetCython()
+        if self.parent.numba == "True" and numbaOK: 
+            return self.calcJuliaSetNumba()
 
         argout = True
 
@@ -749,52 +2094,64 @@ class FractalEngine( QWidget):
         if self.parent.tiled == "True":
             return self.calcJuliaSetCythonTiled()
         
-        # Define the complex plane grid
-        re_min = self.cxJ - self.deltaJ/2.
-        re_max = self.cxJ + self.deltaJ/2.
-        im_min = self.cyJ - self.deltaJ/2.
-        im_max = self.cyJ + self.deltaJ/2.
-
-        real = np.linspace(re_min, re_max, self.widthJ)
-        imag = np.linspace(im_min, im_max, self.widthJ)
-        real_grid, imag_grid = np.meshgrid(real, imag)
+        width = self.parent.widthJ
+        xmin = self.parent.cxJ - self.parent.deltaJ/2.
+        ymin = self.parent.cyJ - self.parent.deltaJ/2.
+        dx = self.parent.deltaJ/float( width)
 
-        if self.smooth == "DistEst": 
+        if self.colorPars.smooth == "DistEst": 
             horizon = 2**40
         else: 
             horizon = 4
         log_horizon = np.log2(np.log(horizon))
 
         startTime = time.time()
-        (output, zAbs) = mandelbrotCython.compute_julia( real_grid, imag_grid, 
-                                                         self.cxM, self.cyM, 
-                                                         self.maxIterJ, horizon)
+        ( xmin, ymin, mirror) = self.juliaMirror( xmin, ymin, dx, width)
+        key = self.resultKey( "J", xmin, ymin, dx, width, self.parent.maxIterJ, horizon)
+        entry = self.cachedResult( key)
+        if entry is not None: 
+            ( output, zAbs, info) = ( entry[ 'escapeCount'], entry[ 'zAbs'], ", cache hit")
+        else: 
+            cancel = self.startRender( "J")
+            output = np.zeros(( width, width), dtype=np.int32)
+            zAbs = np.zeros(( width, width), dtype=np.float64)
+            for ( x0, y0, w, h) in self.juliaRects( width, mirror): 
+                ( output[ y0:y0+h, x0:x0+w], zAbs[ y0:y0+h, x0:x0+w]) = mandelbrotCython.compute_julia_bounds( 
+                    w, h, xmin + dx*x0, xmin + dx*( x0 + w), ymin + dx*y0, ymin + dx*( y0 + h), 
+                    self.parent.cxM, self.parent.cyM, self.parent.maxIterJ, horizon, cancel = cancel)
+            if self.renderCancelled( cancel, "J"): 
+                return 
+            self.mirrorJulia( mirror, output, zAbs)
+            self.cacheResult( key, escapeCount = output, zAbs = zAbs)
+            info = self.juliaMirrorInfo( mirror)
 
-        if self.debugSpeed == "True": 
-            if not self.isAnimating: 
-                self.logWidget.append( "J: %5.3f s, Cython" % (time.time() - startTime))
+        if self.parent.debugSpeed == "True": 
+            if not self.parent.isAnimating: 
+                self.parent.logWidget.append( "J: %5.3f s, Cython%s%s" % 
+                                              ( time.time() - startTime, info, self.cacheInfo()))
 
         output = output.astype(np.float64)
-        output *= utils.DATA_NORM/float( self.maxIterJ) 
+        output *= utils.DATA_NORM/float( self.parent.maxIterJ) 
 
-        if self.smooth == "DistEst": 
+        if self.colorPars.smooth == "DistEst": 
             temp = np.log( zAbs)
             temp[ temp <= 0.] = LOG_HELPER
             output = np.nan_to_num( output + 1 - np.log2( temp) + log_horizon) 
 
-        self.dataJuliaSet = output
+        self.parent.dataJuliaSet = output
         self.JuliaSetUpdated.emit( self.parent.dataJuliaSet)
 
         return 
 
     def calcJuliaSetCythonTiled( self):
-        import threading
 
-        width = self.parent.widthM
-        xmin = self.parent.cxM - self.parent.deltaM/2.
-        xmax = self.parent.cxM + self.parent.deltaM/2.
-        ymin = self.parent.cyM - self.parent.deltaM/2.
-        ymax = self.parent.cyM + self.parent.deltaM/2.
+        width = self.parent.widthJ
+        xmin = self.parent.cxJ - self.parent.deltaJ/2.
+        ymin = self.parent.cyJ - self.parent.deltaJ/2.
+        dx = self.parent.deltaJ/float( width)
+        cx = self.parent.cxM
+        cy = self.parent.cyM
+        maxIter = self.parent.maxIterJ
 
         if self.colorPars.smooth == "DistEst": 
             horizon = 2**40
@@ -802,53 +2159,42 @@ class FractalEngine( QWidget):
             horizon = 4
         log_horizon = np.log2(np.log(horizon))
 
-        mandelbrotTiled.TileWorkerJulia.NCOL = NCOL
-        mandelbrotTiled.TileWorkerJulia.NROW = NROW
-        mandelbrotTiled.TileWorkerJulia.width = width
-        mandelbrotTiled.TileWorkerJulia.cxM = self.parent.cxM
-        mandelbrotTiled.TileWorkerJulia.cyM = self.parent.cyM
-        mandelbrotTiled.TileWorkerJulia.cxJ = self.parent.cxJ
-        mandelbrotTiled.TileWorkerJulia.cyJ = self.parent.cyJ
-        mandelbrotTiled.TileWorkerJulia.deltaJ = self.parent.deltaJ
-        mandelbrotTiled.TileWorkerJulia.finalImage = np.zeros(( width, width), dtype=np.float64)
-        mandelbrotTiled.TileWorkerJulia.finalZAbs = np.zeros(( width, width), dtype=np.float64)
-        mandelbrotTiled.TileWorkerJulia.xmin = xmin
-        mandelbrotTiled.TileWorkerJulia.xmax = xmax
-        mandelbrotTiled.TileWorkerJulia.ymin = ymin
-        mandelbrotTiled.TileWorkerJulia.ymax = ymax
-        mandelbrotTiled.TileWorkerJulia.maxIterJ = self.parent.maxIterJ
-        mandelbrotTiled.TileWorkerJulia.horizon = horizon
-        mandelbrotTiled.TileWorkerJulia.finished_count = 0
-        mandelbrotTiled.TileWorkerJulia.total_tiles = NROW*NCOL
-        mandelbrotTiled.TileWorkerJulia.lock = threading.Lock()
+        escapeCount = np.zeros(( width, width), dtype=np.int32)
+        zAbs = np.zeros(( width, width), dtype=np.float64)
+        def f( tile):
+            mandelbrotTiled.juliaTile( tile, xmin, dx, ymin, dx, cx, cy, maxIter, horizon, 
+                                       escapeCount, zAbs, cancel)
         
         startTime = time.time()
-        workers = []
-        #self.parent.logWidget.append( "Starting Julia workers")
-
-        for row in range( NROW): 
-            for col in range( NCOL): 
-                worker = mandelbrotTiled.TileWorkerJulia( col, row)
-                workers.append( worker)
-                worker.start()
-
-        while mandelbrotTiled.TileWorkerJulia.finished_count < NROW*NCOL:
-            self.parent.app.processEvents()
+        ( xmin, ymin, mirror) = self.juliaMirror( xmin, ymin, dx, width)
+        key = self.resultKey( "J", xmin, ymin, dx, width, maxIter, horizon)
+        entry = self.cachedResult( key)
+        if entry is not None: 
+            escapeCount[:] = entry[ 'escapeCount']
+            zAbs[:] = entry[ 'zAbs']
+            info = ", cache hit"
+        else: 
+            cancel = self.startRender( "J")
+            tiles = []
+            for ( x0, y0, w, h) in self.juliaRects( width, mirror): 
+                tiles += [ ( x0 + tx, y0 + ty, tw, th) 
+                           for ( tx, ty, tw, th) in mandelbrotTiled.makeTiles( w, h, self.parent.tileSize)]
+            self.getTilePool().run( f, tiles, self.parent.app.processEvents)
+            if self.renderCancelled( cancel, "J"): 
+                return 
+            self.mirrorJulia( mirror, escapeCount, zAbs)
+            self.cacheResult( key, escapeCount = escapeCount, zAbs = zAbs)
+            info = self.juliaMirrorInfo( mirror)
 
-        escapeCount = mandelbrotTiled.TileWorkerJulia.finalImage
-        zAbs = mandelbrotTiled.TileWorkerJulia.finalZAbs
-        #
-        # nongil cython code has no sqrt()
-        #
-        #zAbs = np.sqrt( zAbs) 
-        
-        corr = utils.DATA_NORM/float( self.parent.maxIterM)
+        corr = utils.DATA_NORM/float( self.parent.maxIterJ)
         escapeCount = escapeCount.astype(np.float64)
         escapeCount *= corr
 
         if self.colorPars.smooth == "DistEst":
-            zAbs[ zAbs <= 0.] = LOG_HELPER
-            temp = np.log( zAbs)
+            #
+            # zAbs is shared with the result cache, see cacheResult()
+            #
+            temp = np.log( np.where( zAbs <= 0., LOG_HELPER, zAbs))
             temp[ temp <= 0.] = LOG_HELPER
             output = escapeCount
             corr = np.nan_to_num( escapeCount + 
@@ -859,10 +2205,117 @@ class FractalEngine( QWidget):
         
         if self.parent.debugSpeed == "True": 
             if not self.parent.isAnimating: 
-                self.parent.logWidget.append( "J: %5.3f s, Cython, tiled" % 
-                                       (( time.time() - startTime)))
+                self.parent.logWidget.append( "J: %5.3f s, Cython, tiled%s%s" % 
+                                       (( time.time() - startTime), info, self.cacheInfo()))
 
         self.JuliaSetUpdated.emit( self.parent.dataJuliaSet)
                 
         return
-    
+
+    def calcJuliaSetNumba( self):
+        """
+        mandelbrotNumba.compute_julia, the rectangles left by the symmetry
+        """
+        width = self.parent.widthJ
+        xmin = self.parent.cxJ - self.parent.deltaJ/2.
+        ymin = self.parent.cyJ - self.parent.deltaJ/2.
+        dx = self.parent.deltaJ/float( width)
+        maxIter = self.parent.maxIterJ
+
+        if self.colorPars.smooth == "DistEst": 
+            horizon = 2**40
+        else: 
+            horizon = 4
+        log_horizon = np.log2(np.log(horizon))
+
+        startTime = time.time()
+        ( xmin, ymin, mirror) = self.juliaMirror( xmin, ymin, dx, width)
+        key = self.resultKey( "J", xmin, ymin, dx, width, maxIter, horizon)
+        entry = self.cachedResult( key)
+        if entry is not None: 
+            ( output, zAbs, info) = ( entry[ 'escapeCount'], entry[ 'zAbs'], ", cache hit")
+        else: 
+            cancel = self.startRender( "J")
+            output = np.zeros(( width, width), dtype=np.int32)
+            zAbs = np.zeros(( width, width), dtype=np.float64)
+            for ( x0, y0, w, h) in self.juliaRects( width, mirror): 
+                mandelbrotNumba.compute_julia( xmin + dx*x0, dx, ymin + dx*y0, dx, 
+                                               self.parent.cxM, self.parent.cyM, maxIter, float( horizon), 
+                                               output[ y0:y0+h, x0:x0+w], zAbs[ y0:y0+h, x0:x0+w], 
+                                               cancel = cancel)
+            if self.renderCancelled( cancel, "J"): 
+                return 
+            self.mirrorJulia( mirror, output, zAbs)
+            self.cacheResult( key, escapeCount = output, zAbs = zAbs)
+            info = self.juliaMirrorInfo( mirror)
+
+        if self.parent.debugSpeed == "True" and not self.parent.isAnimating: 
+            self.parent.logWidget.append( "J: %5.3f s, Numba%s%s" % 
+                                          ( time.time() - startTime, info, self.cacheInfo()))
+
+        output = output.astype(np.float64)
+        output *= utils.DATA_NORM/float( maxIter) 
+
+        if self.colorPars.smooth == "DistEst": 
+            temp = np.log( zAbs)
+            temp[ temp <= 0.] = LOG_HELPER
+            output = np.nan_to_num( output + 1 - np.log2( temp) + log_horizon) 
+
+        self.parent.dataJuliaSet = output
+        self.JuliaSetUpdated.emit( self.parent.dataJuliaSet)
+        return 
+
+    def juliaMirror( self, xmin, ymin, dx, width):
+        """
+        z -> -z, the pixel ( i, j) mirrors the pixel ( mi - i, mj - j), 
+          the grid is snapped, see snapSymmetric(), cxJ and cyJ follow 
+          the snapped grid, as cyM in calcMandelbrotSet()
+        returns ( xmin, ymin, mirror), mirror: ( a, b, mi, c, d, mj), the 
+          pixels a <= i < b, c <= j < d are copied, or None
+        """
+        if self.parent.symmetry != "True": 
+            return ( xmin, ymin, None)
+        ( x, y) = ( xmin, ymin)
+        xmin = self.snapSymmetric( xmin, dx, width)
+        ymin = self.snapSymmetric( ymin, dx, width)
+        if xmin != x: 
+            self.parent.cxJ = xmin + self.parent.deltaJ/2.
+        if ymin != y: 
+            self.parent.cyJ = ymin + self.parent.deltaJ/2.
+        rows = self.mirrorRange( ymin, dx, 0, width)
+        mj = self.mirrorAxis( xmin, dx, 0)
+        if rows is None or mj is None: 
+            return ( xmin, ymin, None)
+        c = max( 0, mj - width + 1)
+        d = min( width - 1, mj) + 1
+        if d <= c: 
+            return ( xmin, ymin, None)
+        return ( xmin, ymin, rows + ( c, d, mj))
+
+    def juliaRects( self, width, mirror): 
+        """
+        returns the rectangles ( x0, y0, w, h) to be calculated
+        """
+        if mirror is None: 
+            return [ ( 0, 0, width, width)]
+        ( a, b, mi, c, d, mj) = mirror
+        rects = [ ( 0, 0, width, a), ( 0, b, width, width - b), 
+                  ( 0, a, c, b - a), ( d, a, width - d, b - a)]
+        return [ temp for temp in rects if temp[2] > 0 and temp[3] > 0]
+
+    def mirrorJulia( self, mirror, *arrays): 
+        """
+        copies the point mirror images
+        """
+        if mirror is None: 
+            return 
+        ( a, b, mi, c, d, mj) = mirror
+        for temp in arrays: 
+            temp[ a:b, c:d] = temp[ mi-b+1:mi-a+1, mj-d+1:mj-c+1][::-1, ::-1]
+        return 
+
+    def juliaMirrorInfo( self, mirror): 
+        if mirror is None: 
+            return ""
+        ( a, b, mi, c, d, mj) = mirror
+        return ", mirrored %d pixels" % (( b - a)*( d - c))
@@ -568,7 +568,10 @@ class Viewer(QWidget):
 
         normFunc = self.getNormFunc(M)
 
-        if self.colorPars.shaded == 'True':
+        #
+        # Nebulabrot, RGB: no shading, imshow ignores cmap and norm
+        #
+        if self.colorPars.shaded == 'True' and M.ndim == 2:
             light = colors.LightSource(azdeg=self.colorPars.azDeg, altdeg=self.colorPars.altDeg)
             M = light.shade(
                 M,
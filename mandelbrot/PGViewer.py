@@ -122,7 +122,7 @@ VIEWER_Attrs = METADATA_MEMBERS + \
     [ 'app', 'hud', 'view', 'plot', 'viewBox', 'img', 'lut', 'autoLevels',
       'resetMarker', 'polyLine', 'idxmap', 'parent', 'name', 
       'rotateWaitTime', 'colorRotateValue', 'colorPars', 
-      'xmin', 'xmax', 'ymin', 'ymax', 'H', 'W', 'idxmaxp', 
+      'xmin', 'xmax', 'ymin', 'ymax', 'H', 'W', 'idxmaxp', 'viewRange', 
      ]
 
 class Viewer(QWidget):
@@ -134,6 +134,7 @@ class Viewer(QWidget):
     clickedShiftMB1 = pyqtSignal( int, int, float, float, str)
     clickedMB2 = pyqtSignal(float, float)
     clickedMB3 = pyqtSignal( float, float)
+    dragged = pyqtSignal( float, float)
     deltaLbl = pyqtSignal( str)
     def __init__(self,
                  parent = None,
@@ -195,6 +196,7 @@ class Viewer(QWidget):
         # Disable right-click menu
         #self.viewBox.setMenuEnabled(False)
         self.plot.scene().sigMouseClicked.connect( self.onMouseClicked)
+        self.viewBox.sigRangeChangedManually.connect( self.onRangeChangedManually)
 
         # --- Colormap ---
         self.setColormap(colormap)
@@ -242,6 +244,7 @@ class Viewer(QWidget):
         self.resetMarker = None
         self.polyLine = None
         self.xmin = None
+        self.viewRange = None
 
         return 
 
@@ -315,6 +318,22 @@ class Viewer(QWidget):
 
         return 
 
+    def onRangeChangedManually( self, mask):
+        """
+        drag-panning: the ViewBox has moved the image, the center of the 
+        visible range is emitted. Zooming with the mouse wheel is ignored.
+        """
+        if self.viewRange is None:
+            return
+        ( xRange, yRange) = self.viewBox.viewRange()
+        ( xRangeOld, yRangeOld) = self.viewRange
+        widthOld = xRangeOld[1] - xRangeOld[0]
+        if abs( ( xRange[1] - xRange[0]) - widthOld) > 1e-6*widthOld:
+            return
+        self.dragged.emit( ( self.xmin + self.xmax)/2. + ( xRange[0] - xRangeOld[0]), 
+                           ( self.ymin + self.ymax)/2. + ( yRange[0] - yRangeOld[0]))
+        return
+
     def handleIterPath( self, event):
         mousePoint = self.plot.vb.mapSceneToView( event)
         #
@@ -839,6 +858,11 @@ class Viewer(QWidget):
                 print( "%s" % line)
             return
         #
+        # Nebulabrot, RGB, the rows are y like the escape counts
+        #
+        if M.ndim == 3 and M.shape[2] == 3:
+            M = np.ascontiguousarray( M.transpose( 1, 0, 2))
+        #
         # created by us
         #
         if M.ndim == 3:
@@ -851,6 +875,7 @@ class Viewer(QWidget):
             # the visible rangfe corresponds to world coordinates
             self.viewBox.setRange( xRange=( self.xmin, self.xmax),
                                    yRange=( self.ymin, self.ymax), padding=0)
+            self.viewRange = self.viewBox.viewRange()
             # puts the png inot the fractal space
             tr = QTransform()
             tr.translate( self.xmin, self.ymin)
@@ -926,6 +951,10 @@ class Viewer(QWidget):
         #       (self.name, self.xmin, self.xmax, self.ymin, self.ymax))
         self.viewBox.setRange( xRange=( self.xmin, self.xmax),
                                yRange=( self.ymin, self.ymax), padding=0)
+        #
+        # drag-panning is measured relative to this range
+        #
+        self.viewRange = self.viewBox.viewRange()
 
         tr = QTransform()
         tr.translate( self.xmin, self.ymin)
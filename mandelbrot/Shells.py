@@ -15,6 +15,7 @@ class ViewerShell(QWidget):
     clickedShiftMB1 = pyqtSignal( int, int, float, float, str)
     clickedMB2 = pyqtSignal(float, float)
     clickedMB3 = pyqtSignal( float, float)
+    dragged = pyqtSignal( float, float)
     deltaLbl = pyqtSignal( str)
     coloringOutput = pyqtSignal( np.ndarray, matplotlib.image.AxesImage) 
     
@@ -45,6 +46,7 @@ class ViewerShell(QWidget):
         self.pg.clickedShiftMB1.connect(self.clickedShiftMB1)
         self.pg.clickedMB2.connect(self.clickedMB2)
         self.pg.clickedMB3.connect(self.clickedMB3)
+        self.pg.dragged.connect(self.dragged)
         self.pg.deltaLbl.connect(self.deltaLbl)
         #self.pg.coloringOutput.connect(self.coloringOutput)
 
@@ -0,0 +1,12 @@
+#!/usr/bin/env python3
+"""
+the tests run from any directory, the modules and the Cython
+extension (cython/, build_ext --inplace) are imported from here
+"""
+import os
+import sys
+
+HERE = os.path.dirname( os.path.abspath( __file__))
+for temp in ( HERE, os.path.join( HERE, "cython")):
+    if temp not in sys.path:
+        sys.path.insert( 0, temp)
@@ -1,6 +1,8 @@
 # cython: boundscheck=False, wraparound=False, cdivision=True, initializedcheck=False
 from cython.parallel cimport prange
 cimport cython
+from libc.math cimport fabs, sqrt
+cimport openmp
 import numpy as np
 
 @cython.cfunc
@@ -17,61 +19,762 @@ cdef bint in_bulbP(double x, double y) nogil:
     return xp * xp + y * y < 0.0625
 
 
+#
+# num_threads: the OpenMP threads of the prange loops, 0: all cores.
+#   The tile kernels run with 1, the TilePool is parallel
+#
+#
+# periodicity checking, Brent: the orbit is compared to a checkpoint
+#   which is moved to the current z after 1, 2, 4, 8, ... iterations.
+#   If z returns to the checkpoint (|z - zc|^2 < eps2), the orbit is
+#   periodic, the pixel is interior and lam is the period.
+#   eps is tied to the pixel spacing, see periodicity_eps2()
+#
+cdef double PERIODICITY_EPS = 1e-3
+
+@cython.cfunc
+cdef double periodicity_eps2(double dx, double dy) noexcept nogil:
+    cdef double eps = PERIODICITY_EPS * min(fabs(dx), fabs(dy))
+    return eps * eps
+
+#
+# cooperative cancellation: the kernels poll cancel[0], a one-element
+#   int32 array owned by FractalEngine, per pixel or per row. If another
+#   thread or the GUI (between tiles) sets it, the remaining pixels are
+#   skipped and the kernel returns True. Every render has its own array.
+#
+cdef extern from *:
+    """
+    static inline int mandel_cancelled(const int *flag)
+    {
+        return flag != 0 && *(const volatile int *)flag != 0;
+    }
+    """
+    int mandel_cancelled(const int *flag) noexcept nogil
+
+cdef const int *cancel_ptr(int[:] cancel):
+    if cancel is None:
+        return NULL
+    return &cancel[0]
+
+#
+# iteration statistics: the kernels accumulate per thread into the row
+#   stats[thread, :], int64, the rows are merged by FractalEngine.
+#   [0]: escaped pixels
+#   [1]: pixels which reached max_iter, neither culled nor periodic,
+#        they are close to the boundary
+#   [2 + b]: escaped pixels with 2^(b-1) <= iter < 2^b, 32 bins
+#   stats_threads(): the rows needed for num_threads = 0
+#
+cdef int STATS_COLS = 34
+STATS_SIZE = STATS_COLS
+
+def stats_threads():
+    return openmp.omp_get_max_threads()
+
+@cython.cfunc
+@cython.inline
+cdef void stats_add(long long *s, int iter, int max_iter, double zabs) noexcept nogil:
+    cdef int b = 0
+    if iter < max_iter:
+        s[0] += 1
+        while iter > 0:
+            iter >>= 1
+            b += 1
+        s[2 + b] += 1
+    elif zabs > 0.0:
+        s[1] += 1
+
+cdef long long *stats_ptr(long long[:, :] stats, int num_threads) except? NULL:
+    if stats is None:
+        return NULL
+    if stats.shape[0] < num_threads or stats.shape[1] != STATS_COLS or \
+       stats.strides[1] != 8 or stats.strides[0] != 8 * STATS_COLS:
+        raise ValueError("stats: contiguous ( %d, %d) int64 expected" % (num_threads, STATS_COLS))
+    return &stats[0, 0]
+
+#
+# the checkpoint may have been set before the orbit settled on the cycle,
+#   lam is a multiple of the period then. Walk the cycle once more.
+#
+@cython.cfunc
+cdef int orbit_period(double zx, double zy, double cx, double cy,
+                      int lam, double eps2) noexcept nogil:
+    cdef int k
+    cdef double x = zx, y = zy, t
+    for k in range(1, lam):
+        t = x * x - y * y + cx
+        y = 2.0 * x * y + cy
+        x = t
+        if (x - zx) * (x - zx) + (y - zy) * (y - zy) < eps2:
+            return k
+    return lam
+
+
+@cython.cfunc
+@cython.inline
+cdef int mandel_pixel(double x, double y,
+                      int max_iter, double horizon2, double eps2,
+                      double *zabs, int *per) noexcept nogil:
+    """
+    escape count of c = x + i y, zabs: |z|^2, per: the period or 0
+    """
+    cdef int iter, lam, power
+    cdef double zx, zy, zx2, zy2, ckx, cky
+
+    if in_bulbP(x, y):
+        zabs[0] = 0.0
+        per[0] = 2
+        return max_iter
+    if in_cardioidP(x, y):
+        zabs[0] = 0.0
+        per[0] = 1
+        return max_iter
+
+    zx = 0.0
+    zy = 0.0
+    zx2 = 0.0
+    zy2 = 0.0
+    iter = 0
+    ckx = 0.0
+    cky = 0.0
+    lam = 0
+    power = 1
+
+    while zx2 + zy2 < horizon2 and iter < max_iter:
+        zy = 2.0 * zx * zy + y
+        zx = zx2 - zy2 + x
+        zx2 = zx * zx
+        zy2 = zy * zy
+        iter += 1
+        if eps2 > 0.0:
+            lam += 1
+            if (zx - ckx) * (zx - ckx) + (zy - cky) * (zy - cky) < eps2:
+                break
+            if lam == power:
+                ckx = zx
+                cky = zy
+                power *= 2
+                lam = 0
+
+    if zx2 + zy2 < horizon2 and iter < max_iter:
+        zabs[0] = 0.0
+        per[0] = orbit_period(zx, zy, x, y, lam, eps2)
+        return max_iter
+
+    zabs[0] = zx2 + zy2
+    per[0] = 0
+    return iter
+
+
 @cython.cfunc
 cdef void mandel_row(int i,
                      int width,
                      double xmin, double dx,
                      double y,
                      int max_iter, double horizon2,
+                     double eps2,
                      int[:, :] image,
-                     double[:, :] zAbs) noexcept nogil:
-    cdef int j, iter
-    cdef double x, zx, zy, zx2, zy2
+                     double[:, :] zAbs,
+                     int[:, :] period) noexcept nogil:
+    cdef int j
 
     for j in range(width):
-        x = xmin + dx * j
+        image[i, j] = mandel_pixel(xmin + dx * j, y, max_iter, horizon2, eps2,
+                                   &zAbs[i, j], &period[i, j])
+
+
+def compute_mandelbrot( int width, int height, double xmin, double xmax,
+                        double ymin, double ymax, int max_iter, double horizon,
+                        bint periodicity = False, bint return_period = False,
+                        int num_threads = 0):
+    """
+    returns escape counts and |z|, 
+      return_period: the period of the interior pixels as third array,
+      0 for escaped pixels and pixels that reached max_iter
+    """
+    cdef double[:, :] zAbs = np.zeros((height, width), dtype=np.float64)
+    cdef int[:, :] image = np.zeros((height, width), dtype=np.int32)
+    cdef int[:, :] period = np.zeros((height, width), dtype=np.int32)
+
+    cdef double dx = (xmax - xmin) / width
+    cdef double dy = (ymax - ymin) / height
+    cdef double horizon2 = horizon * horizon
+    cdef double eps2 = 0.0
+
+    cdef int i
+    cdef double y
+
+    if periodicity:
+        eps2 = periodicity_eps2(dx, dy)
+    if num_threads <= 0:
+        num_threads = openmp.omp_get_max_threads()
+
+    with nogil:
+        for i in prange(height, schedule='static', num_threads=num_threads):
+            y = ymin + dy * i
+            mandel_row(i, width, xmin, dx, y,
+                       max_iter, horizon2, eps2,
+                       image, zAbs, period)
+
+    if return_period:
+        return np.asarray(image), np.sqrt(np.asarray(zAbs)), np.asarray(period)
+    return np.asarray(image), np.sqrt(np.asarray(zAbs))
+
+#
+# calculates the pixels with todo[i, j] != 0, in place, zAbs is |z|.
+#   Pixel ( i, j) is at ( xmin + dx*(j0 + j), ymin + dy*(i0 + i)),
+#   i0, j0: the origin of a tile, the positions are identical to
+#   compute_mandelbrot for the whole frame.
+#   Used for progressive passes and for reusing pixels of the last frame
+#
+def compute_mandelbrot_masked( double xmin, double dx, double ymin, double dy,
+                               int i0, int j0, int max_iter, double horizon,
+                               unsigned char[:, :] todo,
+                               int[:, :] image, double[:, :] zAbs,
+                               bint periodicity = True, int num_threads = 0,
+                               int[:] cancel = None, long long[:, :] stats = None):
+
+    cdef int height = todo.shape[0]
+    cdef int width = todo.shape[1]
+    cdef double horizon2 = horizon * horizon
+    cdef double eps2 = 0.0
+    cdef double z2, y
+    cdef int i, j, per
+    cdef const int *flag = cancel_ptr(cancel)
+    cdef long long *s
+
+    if periodicity:
+        eps2 = periodicity_eps2(dx, dy)
+    if num_threads <= 0:
+        num_threads = openmp.omp_get_max_threads()
+    cdef long long *s0 = stats_ptr(stats, num_threads)
+
+    with nogil:
+        for i in prange(height, schedule='dynamic', num_threads=num_threads):
+            y = ymin + dy * (i0 + i)
+            s = NULL
+            if s0 != NULL:
+                s = s0 + STATS_COLS * openmp.omp_get_thread_num()
+            for j in range(width):
+                if todo[i, j] == 0:
+                    continue
+                if mandel_cancelled(flag):
+                    break
+                image[i, j] = mandel_pixel(xmin + dx * (j0 + j), y,
+                                           max_iter, horizon2, eps2, &z2, &per)
+                zAbs[i, j] = sqrt(z2)
+                if s != NULL:
+                    stats_add(s, image[i, j], max_iter, z2)
+    return mandel_cancelled(flag) != 0
+
+#
+# resumable iterations: the orbit state is kept, raising max_iter
+#   continues the pixels that are still bounded from their last z.
+#   status: RESUME_ESCAPED, RESUME_INTERIOR (culled or periodic),
+#   RESUME_BOUNDED (reached max_iter, can be continued)
+#
+cdef int RESUME_ESCAPED = 0
+cdef int RESUME_INTERIOR = 1
+cdef int RESUME_BOUNDED = 2
+
+@cython.cfunc
+@cython.inline
+cdef int mandel_resume(double x, double y, int max_iter, double horizon2, double eps2,
+                       int *iter, double *zx, double *zy, double *zabs) noexcept nogil:
+    """
+    continues the orbit of c = x + i y from z = zx + i zy at iteration iter,
+    iter == 0: a new pixel, z = 0. Returns the status, zabs: |z|^2
+    """
+    cdef int n = iter[0], lam = 0, power = 1
+    cdef double ax = zx[0], ay = zy[0], ax2, ay2, ckx, cky
+
+    if n == 0 and (in_bulbP(x, y) or in_cardioidP(x, y)):
+        iter[0] = max_iter
+        zabs[0] = 0.0
+        return RESUME_INTERIOR
+
+    ax2 = ax * ax
+    ay2 = ay * ay
+    ckx = ax
+    cky = ay
+    while ax2 + ay2 < horizon2 and n < max_iter:
+        ay = 2.0 * ax * ay + y
+        ax = ax2 - ay2 + x
+        ax2 = ax * ax
+        ay2 = ay * ay
+        n += 1
+        if eps2 > 0.0:
+            lam += 1
+            if (ax - ckx) * (ax - ckx) + (ay - cky) * (ay - cky) < eps2:
+                break
+            if lam == power:
+                ckx = ax
+                cky = ay
+                power *= 2
+                lam = 0
+
+    zx[0] = ax
+    zy[0] = ay
+    if ax2 + ay2 < horizon2 and n < max_iter:
+        iter[0] = max_iter
+        zabs[0] = 0.0
+        return RESUME_INTERIOR
+    iter[0] = n
+    zabs[0] = ax2 + ay2
+    if ax2 + ay2 < horizon2:
+        return RESUME_BOUNDED
+    return RESUME_ESCAPED
+
+#
+# like compute_mandelbrot_masked, the state of the todo pixels is
+#   continued: image (iterations done), zx, zy. New pixels have
+#   image 0, zx, zy 0. status is set, zAbs is |z|
+#
+def compute_mandelbrot_resume( double xmin, double dx, double ymin, double dy,
+                               int i0, int j0, int max_iter, double horizon,
+                               unsigned char[:, :] todo,
+                               int[:, :] image, double[:, :] zAbs,
+                               double[:, :] zx, double[:, :] zy,
+                               unsigned char[:, :] status,
+                               bint periodicity = True, int num_threads = 0,
+                               int[:] cancel = None, long long[:, :] stats = None):
+
+    cdef int height = todo.shape[0]
+    cdef int width = todo.shape[1]
+    cdef double horizon2 = horizon * horizon
+    cdef double eps2 = 0.0
+    cdef double z2, y
+    cdef int i, j
+    cdef const int *flag = cancel_ptr(cancel)
+    cdef long long *s
+
+    if periodicity:
+        eps2 = periodicity_eps2(dx, dy)
+    if num_threads <= 0:
+        num_threads = openmp.omp_get_max_threads()
+    cdef long long *s0 = stats_ptr(stats, num_threads)
+
+    with nogil:
+        for i in prange(height, schedule='dynamic', num_threads=num_threads):
+            y = ymin + dy * (i0 + i)
+            s = NULL
+            if s0 != NULL:
+                s = s0 + STATS_COLS * openmp.omp_get_thread_num()
+            for j in range(width):
+                if todo[i, j] == 0:
+                    continue
+                if mandel_cancelled(flag):
+                    break
+                status[i, j] = mandel_resume(xmin + dx * (j0 + j), y, max_iter, horizon2, eps2,
+                                             &image[i, j], &zx[i, j], &zy[i, j], &z2)
+                zAbs[i, j] = sqrt(z2)
+                if s != NULL:
+                    stats_add(s, image[i, j], max_iter, z2 if status[i, j] == RESUME_BOUNDED else 0.0)
+    return mandel_cancelled(flag) != 0
+
+#
+# SIMD kernel, mandelbrotSimd.h: the pixels of a row are iterated in
+#   groups of MANDEL_LANES lanes, finished lanes are refilled.
+#   Same interface as compute_mandelbrot_masked, the rows of todo,
+#   image, zAbs have to be contiguous.
+#   single: float32, twice the lanes, the pixel positions are calculated
+#   in float64 and rounded
+#
+cdef extern from "mandelbrotSimd.h" nogil:
+    int MANDEL_LANES
+    int MANDEL_SIMD
+    void mandel_simd_row(int width, const unsigned char *todo,
+                         double xmin, double dx, int j0, double y,
+                         int max_iter, double horizon2, double eps2,
+                         int *image, double *zabs)
+    void mandel_simd_row_f32(int width, const unsigned char *todo,
+                             double xmin, double dx, int j0, double y,
+                             int max_iter, double horizon2, double eps2,
+                             int *image, double *zabs)
+
+def simd_lanes( bint single = False):
+    """
+    returns the number of lanes, 1: the scalar fallback
+    """
+    if not MANDEL_SIMD:
+        return 1
+    if single:
+        return 2 * MANDEL_LANES
+    return MANDEL_LANES
+
+def compute_mandelbrot_simd( double xmin, double dx, double ymin, double dy,
+                             int i0, int j0, int max_iter, double horizon,
+                             unsigned char[:, :] todo,
+                             int[:, :] image, double[:, :] zAbs,
+                             bint periodicity = True, int num_threads = 0,
+                             bint single = False, int[:] cancel = None,
+                             long long[:, :] stats = None):
+
+    cdef int height = todo.shape[0]
+    cdef int width = todo.shape[1]
+    cdef double horizon2 = horizon * horizon
+    cdef double eps2 = 0.0
+    cdef int i, j
+    cdef const int *flag = cancel_ptr(cancel)
+    cdef long long *s
+
+    if todo.strides[1] != 1 or image.strides[1] != 4 or zAbs.strides[1] != 8:
+        raise ValueError("compute_mandelbrot_simd: the rows have to be contiguous")
+    if periodicity:
+        eps2 = periodicity_eps2(dx, dy)
+    if num_threads <= 0:
+        num_threads = openmp.omp_get_max_threads()
+    cdef long long *s0 = stats_ptr(stats, num_threads)
+
+    with nogil:
+        for i in prange(height, schedule='dynamic', num_threads=num_threads):
+            if mandel_cancelled(flag):
+                continue
+            if single:
+                mandel_simd_row_f32(width, &todo[i, 0], xmin, dx, j0, ymin + dy * (i0 + i),
+                                    max_iter, horizon2, eps2, &image[i, 0], &zAbs[i, 0])
+            else:
+                mandel_simd_row(width, &todo[i, 0], xmin, dx, j0, ymin + dy * (i0 + i),
+                                max_iter, horizon2, eps2, &image[i, 0], &zAbs[i, 0])
+            #
+            # the row is in the cache, the statistics are collected afterwards
+            #
+            if s0 != NULL:
+                s = s0 + STATS_COLS * openmp.omp_get_thread_num()
+                for j in range(width):
+                    if todo[i, j] != 0:
+                        stats_add(s, image[i, j], max_iter, zAbs[i, j])
+    return mandel_cancelled(flag) != 0
+
+def compute_mandelbrot_f32( double xmin, double dx, double ymin, double dy,
+                            int i0, int j0, int max_iter, double horizon,
+                            unsigned char[:, :] todo,
+                            int[:, :] image, double[:, :] zAbs,
+                            bint periodicity = True, int num_threads = 0,
+                            int[:] cancel = None, long long[:, :] stats = None):
+    """
+    float32 escape-time kernel, for overview zooms, see compute_mandelbrot_simd
+    """
+    return compute_mandelbrot_simd( xmin, dx, ymin, dy, i0, j0, max_iter, horizon,
+                                    todo, image, zAbs, periodicity = periodicity,
+                                    num_threads = num_threads, single = True, cancel = cancel,
+                                    stats = stats)
+
+#
+# Mariani-Silver, solid guessing: the border of a rectangle is iterated,
+#   if all border pixels have the same escape count, the interior is
+#   filled, otherwise the rectangle is split into 4 rectangles sharing
+#   their borders. This is a heuristic, thin filaments crossing a
+#   rectangle between two border pixels are lost.
+#   image[i, j] < 0: not yet calculated
+#
+@cython.cfunc
+cdef void ms_pixel(int i, int j, double xmin, double dx, double ymin, double dy,
+                   int max_iter, double horizon2, double eps2,
+                   int[:, :] image, double[:, :] zAbs) noexcept nogil:
+    cdef int per
+    if image[i, j] < 0:
+        image[i, j] = mandel_pixel(xmin + dx * j, ymin + dy * i,
+                                   max_iter, horizon2, eps2, &zAbs[i, j], &per)
+
+
+@cython.cfunc
+cdef void ms_rect(int x0, int y0, int x1, int y1,
+                  double xmin, double dx, double ymin, double dy,
+                  int max_iter, double horizon2, double eps2,
+                  int min_size, bint fill_escaped,
+                  int[:, :] image, double[:, :] zAbs) noexcept nogil:
+    """
+    x0, x1, y0, y1 inclusive
+    """
+    cdef int i, j, xm, ym, value
+    cdef bint solid = True
+
+    for j in range(x0, x1 + 1):
+        ms_pixel(y0, j, xmin, dx, ymin, dy, max_iter, horizon2, eps2, image, zAbs)
+        ms_pixel(y1, j, xmin, dx, ymin, dy, max_iter, horizon2, eps2, image, zAbs)
+    for i in range(y0 + 1, y1):
+        ms_pixel(i, x0, xmin, dx, ymin, dy, max_iter, horizon2, eps2, image, zAbs)
+        ms_pixel(i, x1, xmin, dx, ymin, dy, max_iter, horizon2, eps2, image, zAbs)
+
+    if x1 - x0 < 2 or y1 - y0 < 2:
+        return
+
+    value = image[y0, x0]
+    for j in range(x0, x1 + 1):
+        if image[y0, j] != value or image[y1, j] != value:
+            solid = False
+            break
+    if solid:
+        for i in range(y0 + 1, y1):
+            if image[i, x0] != value or image[i, x1] != value:
+                solid = False
+                break
+
+    if solid and (value == max_iter or fill_escaped):
+        for i in range(y0 + 1, y1):
+            for j in range(x0 + 1, x1):
+                image[i, j] = value
+                zAbs[i, j] = zAbs[y0, x0]
+        return
+
+    if x1 - x0 <= min_size or y1 - y0 <= min_size:
+        for i in range(y0 + 1, y1):
+            for j in range(x0 + 1, x1):
+                ms_pixel(i, j, xmin, dx, ymin, dy, max_iter, horizon2, eps2, image, zAbs)
+        return
+
+    xm = (x0 + x1) // 2
+    ym = (y0 + y1) // 2
+    ms_rect(x0, y0, xm, ym, xmin, dx, ymin, dy, max_iter, horizon2, eps2,
+            min_size, fill_escaped, image, zAbs)
+    ms_rect(xm, y0, x1, ym, xmin, dx, ymin, dy, max_iter, horizon2, eps2,
+            min_size, fill_escaped, image, zAbs)
+    ms_rect(x0, ym, xm, y1, xmin, dx, ymin, dy, max_iter, horizon2, eps2,
+            min_size, fill_escaped, image, zAbs)
+    ms_rect(xm, ym, x1, y1, xmin, dx, ymin, dy, max_iter, horizon2, eps2,
+            min_size, fill_escaped, image, zAbs)
+
+
+def compute_mandelbrot_ms( int width, int height, double xmin, double xmax,
+                           double ymin, double ymax, int max_iter, double horizon,
+                           int block = 64, int min_size = 4,
+                           bint fill_escaped = True, bint periodicity = True):
+    """
+    Mariani-Silver version of compute_mandelbrot, same pixel positions.
+      The image is divided into blocks x blocks rectangles which are
+      processed in parallel, each of them is subdivided recursively
+      down to min_size.
+      fill_escaped == False: only interior rectangles are filled,
+      the smooth coloring needs |z| of every escaped pixel
+    """
+    cdef double[:, :] zAbs = np.zeros((height, width), dtype=np.float64)
+    cdef int[:, :] image = np.full((height, width), -1, dtype=np.int32)
+
+    cdef double dx = (xmax - xmin) / width
+    cdef double dy = (ymax - ymin) / height
+    cdef double horizon2 = horizon * horizon
+    cdef double eps2 = 0.0
+
+    cdef int nbx = (width + block - 1) // block
+    cdef int nby = (height + block - 1) // block
+    cdef int k, x0, y0
+
+    if periodicity:
+        eps2 = periodicity_eps2(dx, dy)
+
+    with nogil:
+        for k in prange(nbx * nby, schedule='dynamic'):
+            x0 = (k % nbx) * block
+            y0 = (k // nbx) * block
+            ms_rect(x0, y0, min(x0 + block, width) - 1, min(y0 + block, height) - 1,
+                    xmin, dx, ymin, dy, max_iter, horizon2, eps2,
+                    min_size, fill_escaped, image, zAbs)
+
+    return np.asarray(image), np.sqrt(np.asarray(zAbs))
+
+#
+# double-double arithmetic, a number is hi + lo, |lo| <= ulp(hi)/2,
+#   about 32 significant digits, enough for deltaM down to ~1e-28
+#   fma() makes two_prod exact, independent of -ffp-contract
+#
+from libc.math cimport fma
+
+@cython.cfunc
+@cython.inline
+cdef void two_sum(double a, double b, double *s, double *e) noexcept nogil:
+    cdef double bb
+    s[0] = a + b
+    bb = s[0] - a
+    e[0] = (a - (s[0] - bb)) + (b - bb)
+
+@cython.cfunc
+@cython.inline
+cdef void quick_two_sum(double a, double b, double *s, double *e) noexcept nogil:
+    s[0] = a + b
+    e[0] = b - (s[0] - a)
+
+@cython.cfunc
+@cython.inline
+cdef void dd_add(double ah, double al, double bh, double bl,
+                 double *ch, double *cl) noexcept nogil:
+    cdef double s, e, t, f
+    two_sum(ah, bh, &s, &e)
+    two_sum(al, bl, &t, &f)
+    e += t
+    quick_two_sum(s, e, &s, &e)
+    e += f
+    quick_two_sum(s, e, ch, cl)
+
+@cython.cfunc
+@cython.inline
+cdef void dd_mul(double ah, double al, double bh, double bl,
+                 double *ch, double *cl) noexcept nogil:
+    cdef double p, e
+    p = ah * bh
+    e = fma(ah, bh, -p)
+    e += ah * bl + al * bh
+    quick_two_sum(p, e, ch, cl)
 
-        if in_bulbP(x, y) or in_cardioidP(x, y):
+@cython.cfunc
+cdef void mandel_row_dd(int i,
+                        int width,
+                        double cxh, double cxl, double dx,
+                        double yh, double yl,
+                        int max_iter, double horizon2,
+                        int[:, :] image,
+                        double[:, :] zAbs) noexcept nogil:
+    cdef int j, iter
+    cdef double xh, xl, zxh, zxl, zyh, zyl
+    cdef double zx2h, zx2l, zy2h, zy2l, th, tl
+
+    for j in range(width):
+        dd_add(cxh, cxl, dx * (j - 0.5 * width), 0.0, &xh, &xl)
+        #
+        # the culling needs no double-double precision
+        #
+        if in_bulbP(xh, yh) or in_cardioidP(xh, yh):
             image[i, j] = max_iter
             zAbs[i, j] = 0.0
             continue
 
-        zx = 0.0
-        zy = 0.0
-        zx2 = 0.0
-        zy2 = 0.0
+        zxh = 0.0
+        zxl = 0.0
+        zyh = 0.0
+        zyl = 0.0
+        zx2h = 0.0
+        zx2l = 0.0
+        zy2h = 0.0
+        zy2l = 0.0
         iter = 0
 
-        while zx2 + zy2 < horizon2 and iter < max_iter:
-            zy = 2.0 * zx * zy + y
-            zx = zx2 - zy2 + x
-            zx2 = zx * zx
-            zy2 = zy * zy
+        while zx2h + zy2h < horizon2 and iter < max_iter:
+            # zy = 2 zx zy + y
+            dd_mul(zxh, zxl, zyh, zyl, &th, &tl)
+            dd_add(2.0 * th, 2.0 * tl, yh, yl, &zyh, &zyl)
+            # zx = zx2 - zy2 + x
+            dd_add(zx2h, zx2l, -zy2h, -zy2l, &th, &tl)
+            dd_add(th, tl, xh, xl, &zxh, &zxl)
+            dd_mul(zxh, zxl, zxh, zxl, &zx2h, &zx2l)
+            dd_mul(zyh, zyl, zyh, zyl, &zy2h, &zy2l)
             iter += 1
 
         image[i, j] = iter
-        zAbs[i, j] = zx2 + zy2
+        zAbs[i, j] = zx2h + zy2h
 
 
-def compute_mandelbrot( int width, int height, double xmin, double xmax,
-                        double ymin, double ymax, int max_iter, double horizon):
+def compute_mandelbrot_dd( int width, int height,
+                           double cxh, double cxl, double cyh, double cyl,
+                           double delta, int max_iter, double horizon):
+    """
+    the center ( cxh + cxl, cyh + cyl) is double-double,
+    the pixels are at the same positions as in compute_mandelbrot
+    """
+    cdef double[:, :] zAbs = np.zeros((height, width), dtype=np.float64)
+    cdef int[:, :] image = np.zeros((height, width), dtype=np.int32)
+
+    cdef double dx = delta / width
+    cdef double dy = delta / height
+    cdef double horizon2 = horizon * horizon
+
+    cdef int i
+    cdef double yh, yl
+
+    with nogil:
+        for i in prange(height, schedule='dynamic'):
+            dd_add(cyh, cyl, dy * (i - 0.5 * height), 0.0, &yh, &yl)
+            mandel_row_dd(i, width, cxh, cxl, dx, yh, yl,
+                          max_iter, horizon2,
+                          image, zAbs)
+
+    return np.asarray(image), np.sqrt(np.asarray(zAbs))
+
+#
+# perturbation, see mandelbrotDeep.py
+#   dz_{n+1} = (2 Z_n + dz_n) dz_n + dc, z = Z_m + dz
+#   start at iteration skip with the series approximation
+#   dz = alpha dc' + beta dc'^2 + gamma dc'^3, dc' = dc/r
+#   rebasing: if |z| < |dz| or m == refLast: dz = z, m = 0
+#
+@cython.cfunc
+cdef void perturb_row(int i, int width,
+                      double dcx0, double dcy, double ddc,
+                      double s0, double sy, double dds,
+                      double[:] Zr, double[:] Zi, int refLast, int skip,
+                      double ar, double ai, double br, double bi,
+                      double gr, double gi,
+                      int max_iter, double horizon2,
+                      int[:, :] image,
+                      double[:, :] zAbs) noexcept nogil:
+    cdef int j, m, iter
+    cdef double dcx, sx, tr, ti, ur, ui, dzr, dzi, zr, zi, z2
+
+    z2 = 0.0
+    for j in range(width):
+        dcx = dcx0 + ddc * j
+        sx = s0 + dds * j
+        #
+        # series approximation, Horner
+        #
+        tr = gr * sx - gi * sy + br
+        ti = gr * sy + gi * sx + bi
+        ur = tr * sx - ti * sy + ar
+        ui = tr * sy + ti * sx + ai
+        dzr = ur * sx - ui * sy
+        dzi = ur * sy + ui * sx
+
+        m = skip
+        iter = skip
+        while iter < max_iter:
+            tr = 2.0 * Zr[m] + dzr
+            ti = 2.0 * Zi[m] + dzi
+            ur = tr * dzr - ti * dzi + dcx
+            dzi = tr * dzi + ti * dzr + dcy
+            dzr = ur
+            m += 1
+            iter += 1
+            zr = Zr[m] + dzr
+            zi = Zi[m] + dzi
+            z2 = zr * zr + zi * zi
+            if z2 >= horizon2:
+                break
+            if z2 < dzr * dzr + dzi * dzi or m == refLast:
+                dzr = zr
+                dzi = zi
+                m = 0
+
+        image[i, j] = iter
+        zAbs[i, j] = z2
+
+
+def compute_perturbation( int width, int height,
+                          double dcx0, double dcy0, double ddc,
+                          double s0, double dds,
+                          double[:] Zr, double[:] Zi, int skip,
+                          double complex alpha, double complex beta,
+                          double complex gamma,
+                          int max_iter, double horizon):
 
     cdef double[:, :] zAbs = np.zeros((height, width), dtype=np.float64)
     cdef int[:, :] image = np.zeros((height, width), dtype=np.int32)
 
-    cdef double dx = (xmax - xmin) / width
-    cdef double dy = (ymax - ymin) / height
     cdef double horizon2 = horizon * horizon
+    cdef int refLast = Zr.shape[0] - 1
+    cdef double ar = alpha.real, ai = alpha.imag
+    cdef double br = beta.real, bi = beta.imag
+    cdef double gr = gamma.real, gi = gamma.imag
 
     cdef int i
-    cdef double y
 
     with nogil:
-        for i in prange(height, schedule='static'):
-            y = ymin + dy * i
-            mandel_row(i, width, xmin, dx, y,
-                       max_iter, horizon2,
-                       image, zAbs)
+        for i in prange(height, schedule='dynamic'):
+            perturb_row(i, width, dcx0, dcy0 + ddc * i, ddc,
+                        s0, s0 + dds * i, dds,
+                        Zr, Zi, refLast, skip,
+                        ar, ai, br, bi, gr, gi,
+                        max_iter, horizon2,
+                        image, zAbs)
 
     return np.asarray(image), np.sqrt(np.asarray(zAbs))
 
@@ -147,21 +850,33 @@ def compute_mandelbrotS(int width, int height,
 # cython: boundscheck=False, wraparound=False, cdivision=True
 #import numpy as np
 cimport numpy as np
-from libc.math cimport fabs
+from libc.math cimport fabs, sqrt
 
 def compute_julia(np.ndarray[np.float64_t, ndim=2] real_grid,
                   np.ndarray[np.float64_t, ndim=2] imag_grid,
                   double c_real, double c_imag,
-                  int max_iter, horizon):
-
+                  int max_iter, horizon,
+                  bint periodicity = False, bint return_period = False):
+    """
+    returns escape counts and |z|, 
+      periodicity checking and return_period as in compute_mandelbrot
+    """
     cdef int height = real_grid.shape[0]
     cdef int width = real_grid.shape[1]
     cdef np.ndarray[np.int32_t, ndim=2] output = np.zeros((height, width), dtype=np.int32)
     cdef np.ndarray[np.float64_t, ndim=2] zAbs = np.zeros((height, width), dtype=np.float64)
+    cdef np.ndarray[np.int32_t, ndim=2] period = np.zeros((height, width), dtype=np.int32)
 
-    cdef int i, j, iter
-    cdef double z_real, z_imag, z_real2, z_imag2
+    cdef int i, j, iter, lam, power
+    cdef double z_real, z_imag, z_real2, z_imag2, ck_real, ck_imag
     cdef double horizon_val = horizon
+    cdef double eps2 = 0.0
+    #
+    # the grid spacing, for the periodicity epsilon
+    #
+    if periodicity and width > 1 and height > 1:
+        eps2 = periodicity_eps2(real_grid[0, 1] - real_grid[0, 0], 
+                                imag_grid[1, 0] - imag_grid[0, 0])
 
     with nogil:
         for i in range(height):
@@ -169,6 +884,10 @@ def compute_julia(np.ndarray[np.float64_t, ndim=2] real_grid,
                 z_real = real_grid[i, j]
                 z_imag = imag_grid[i, j]
                 iter = 0
+                ck_real = z_real
+                ck_imag = z_imag
+                lam = 0
+                power = 1
 
                 while iter < max_iter:
                     z_real2 = z_real * z_real
@@ -180,18 +899,120 @@ def compute_julia(np.ndarray[np.float64_t, ndim=2] real_grid,
                     z_imag = 2.0 * z_real * z_imag + c_imag
                     z_real = z_real2 - z_imag2 + c_real
                     iter += 1
+                    if eps2 > 0.0:
+                        lam += 1
+                        if ((z_real - ck_real) * (z_real - ck_real) + 
+                            (z_imag - ck_imag) * (z_imag - ck_imag)) < eps2:
+                            break
+                        if lam == power:
+                            ck_real = z_real
+                            ck_imag = z_imag
+                            power *= 2
+                            lam = 0
 
-                output[i, j] = iter
-                #
-                zAbs[i, j] = z_imag*z_imag + z_real*z_real
+                if iter < max_iter and z_real * z_real + z_imag * z_imag <= horizon_val:
+                    # periodic
+                    output[i, j] = max_iter
+                    zAbs[i, j] = 0.0
+                    period[i, j] = orbit_period(z_real, z_imag, c_real, c_imag, lam, eps2)
+                else:
+                    output[i, j] = iter
+                    #
+                    zAbs[i, j] = z_imag*z_imag + z_real*z_real
     zAbs = np.sqrt( zAbs)                                           
+    if return_period:
+        return output, zAbs, period
     return output, zAbs
 
+#
+# Julia, nogil and prange, the coordinates are calculated from the bounds.
+#   The iteration is the one of compute_julia(), horizon is compared
+#   to |z|^2
+#
+@cython.cfunc
+@cython.inline
+cdef int julia_pixel(double x, double y, double cr, double ci,
+                     int max_iter, double horizon, double eps2,
+                     double *zabs, int *per) noexcept nogil:
+    """
+    escape count of z0 = x + i y, zabs: |z|^2, per: the period or 0
+    """
+    cdef int iter = 0, lam = 0, power = 1
+    cdef double zx = x, zy = y, zx2, zy2, ckx = x, cky = y
+
+    while iter < max_iter:
+        zx2 = zx * zx
+        zy2 = zy * zy
+        if zx2 + zy2 > horizon:
+            break
+        zy = 2.0 * zx * zy + ci
+        zx = zx2 - zy2 + cr
+        iter += 1
+        if eps2 > 0.0:
+            lam += 1
+            if (zx - ckx) * (zx - ckx) + (zy - cky) * (zy - cky) < eps2:
+                break
+            if lam == power:
+                ckx = zx
+                cky = zy
+                power *= 2
+                lam = 0
+
+    if iter < max_iter and zx * zx + zy * zy <= horizon:
+        zabs[0] = 0.0
+        per[0] = orbit_period(zx, zy, cr, ci, lam, eps2)
+        return max_iter
+
+    zabs[0] = zx * zx + zy * zy
+    per[0] = 0
+    return iter
+
+
+def compute_julia_bounds( int width, int height, double xmin, double xmax,
+                          double ymin, double ymax, double cr, double ci,
+                          int max_iter, double horizon,
+                          bint periodicity = True, bint return_period = False,
+                          int num_threads = 0, int[:] cancel = None):
+    """
+    returns escape counts and |z| of the Julia set of c = cr + i ci,
+      no grid arrays, see compute_mandelbrot
+      cancel: see mandel_cancelled(), the skipped pixels are 0
+    """
+    cdef double[:, :] zAbs = np.zeros((height, width), dtype=np.float64)
+    cdef int[:, :] image = np.zeros((height, width), dtype=np.int32)
+    cdef int[:, :] period = np.zeros((height, width), dtype=np.int32)
+
+    cdef double dx = (xmax - xmin) / width
+    cdef double dy = (ymax - ymin) / height
+    cdef double eps2 = 0.0
+
+    cdef int i, j
+    cdef double y
+    cdef const int *flag = cancel_ptr(cancel)
+
+    if periodicity:
+        eps2 = periodicity_eps2(dx, dy)
+    if num_threads <= 0:
+        num_threads = openmp.omp_get_max_threads()
+
+    with nogil:
+        for i in prange(height, schedule='dynamic', num_threads=num_threads):
+            y = ymin + dy * i
+            for j in range(width):
+                if mandel_cancelled(flag):
+                    break
+                image[i, j] = julia_pixel(xmin + dx * j, y, cr, ci, max_iter, horizon, eps2,
+                                          &zAbs[i, j], &period[i, j])
+
+    if return_period:
+        return np.asarray(image), np.sqrt(np.asarray(zAbs)), np.asarray(period)
+    return np.asarray(image), np.sqrt(np.asarray(zAbs))
+
 # mandelbrot_smooth.pyx
 import numpy as np
 cimport numpy as np
 cimport cython
-from libc.math cimport log, fabs
+from libc.math cimport log, fabs, hypot
 
 @cython.boundscheck(False)
 @cython.wraparound(False)
@@ -223,3 +1044,347 @@ def mandelbrot_dz(np.ndarray[np.complex128_t, ndim=2] C, int max_iter):
     return image
 
 
+#
+# DZ, nogil: z and dz in registers, linear coordinates, culling, prange.
+#   The formula is the one of mandelbrot_dz(), dz is updated with the
+#   new z, the escape radius is 4.
+#
+@cython.cfunc
+@cython.inline
+cdef double mandel_dz_pixel(double x, double y, int max_iter) noexcept nogil:
+    """
+    log(1 + smooth iteration + log(1 + distance)) of c = x + i y,
+      0. for interior and culled pixels
+    """
+    cdef int i
+    cdef double zx = 0.0, zy = 0.0, dzx = 1.0, dzy = 0.0
+    cdef double t, absZ, absDZ, nu, dist
+
+    if in_bulbP(x, y) or in_cardioidP(x, y):
+        return 0.0
+
+    for i in range(max_iter):
+        t = zx * zx - zy * zy + x
+        zy = 2.0 * zx * zy + y
+        zx = t
+        t = 2.0 * (zx * dzx - zy * dzy) + 1.0
+        dzy = 2.0 * (zx * dzy + zy * dzx)
+        dzx = t
+        if zx * zx + zy * zy > 16.0:
+            absZ = sqrt(zx * zx + zy * zy)
+            absDZ = sqrt(dzx * dzx + dzy * dzy)
+            if absDZ == 0.0:
+                return 0.0
+            nu = i + 1 - log(log(absZ + 1e-8)) / log(2.0)
+            dist = absZ * log(absZ) / absDZ
+            return log(1.0 + nu + log(1.0 + dist))
+    return 0.0
+
+
+def compute_mandelbrot_dz( double xmin, double dx, double ymin, double dy,
+                           int i0, int j0, int max_iter,
+                           double[:, :] image, int num_threads = 0,
+                           int[:] cancel = None):
+    """
+    smooth iteration plus distance, in one pass, see mandel_dz_pixel()
+      pixel ( i, j) is at ( xmin + dx*( j0 + j), ymin + dy*( i0 + i))
+      returns True, if cancelled
+    """
+    cdef int height = image.shape[0]
+    cdef int width = image.shape[1]
+    cdef int i, j
+    cdef double y
+    cdef const int *flag = cancel_ptr(cancel)
+
+    if num_threads <= 0:
+        num_threads = openmp.omp_get_max_threads()
+
+    with nogil:
+        for i in prange(height, schedule='dynamic', num_threads=num_threads):
+            y = ymin + dy * (i0 + i)
+            for j in range(width):
+                if mandel_cancelled(flag):
+                    break
+                image[i, j] = mandel_dz_pixel(xmin + dx * (j0 + j), y, max_iter)
+    return mandel_cancelled(flag) != 0
+
+#
+# G-buffer: the channels from which every smoothing mode is derived,
+#   one pass. The orbit is iterated to |z| = 4, the escape count of
+#   compute_mandelbrot() with horizon 4, and then on to |z| = 2**40, the
+#   DistEst horizon, extra counts these iterations. z and log|dz| are
+#   taken at 2**40, dz is updated with the old z
+#
+cdef double GBUFFER_HORIZON2_LOW = 16.0
+cdef double GBUFFER_HORIZON2 = 2.0 ** 80
+cdef int GBUFFER_EXTRA_MAX = 255
+
+@cython.cfunc
+@cython.inline
+cdef int gbuffer_pixel(double x, double y, int max_iter, double eps2,
+                       unsigned char *extra, float *zx_out, float *zy_out,
+                       float *logdz, float *smooth) noexcept nogil:
+    """
+    escape count of c = x + i y at horizon 4, max_iter for interior pixels
+    """
+    cdef int iter = 0, k = 0, lam = 0, power = 1
+    cdef double zx = 0.0, zy = 0.0, zx2 = 0.0, zy2 = 0.0
+    cdef double dzx = 0.0, dzy = 0.0, ckx = 0.0, cky = 0.0, t
+
+    extra[0] = 0
+    zx_out[0] = 0.0
+    zy_out[0] = 0.0
+    logdz[0] = 0.0
+    smooth[0] = 0.0
+    if in_bulbP(x, y) or in_cardioidP(x, y):
+        return max_iter
+
+    while zx2 + zy2 < GBUFFER_HORIZON2_LOW and iter < max_iter:
+        t = 2.0 * (zx * dzx - zy * dzy) + 1.0
+        dzy = 2.0 * (zx * dzy + zy * dzx)
+        dzx = t
+        zy = 2.0 * zx * zy + y
+        zx = zx2 - zy2 + x
+        zx2 = zx * zx
+        zy2 = zy * zy
+        iter += 1
+        if eps2 > 0.0:
+            lam += 1
+            if (zx - ckx) * (zx - ckx) + (zy - cky) * (zy - cky) < eps2:
+                break
+            if lam == power:
+                ckx = zx
+                cky = zy
+                power *= 2
+                lam = 0
+
+    if zx2 + zy2 < GBUFFER_HORIZON2_LOW:
+        return max_iter
+
+    while zx2 + zy2 < GBUFFER_HORIZON2 and k < GBUFFER_EXTRA_MAX:
+        t = 2.0 * (zx * dzx - zy * dzy) + 1.0
+        dzy = 2.0 * (zx * dzy + zy * dzx)
+        dzx = t
+        zy = 2.0 * zx * zy + y
+        zx = zx2 - zy2 + x
+        zx2 = zx * zx
+        zy2 = zy * zy
+        k += 1
+
+    extra[0] = k
+    zx_out[0] = zx
+    zy_out[0] = zy
+    logdz[0] = log(hypot(dzx, dzy))
+    smooth[0] = iter + k + 1 - log(0.5 * log(zx2 + zy2)) / log(2.0)
+    return iter
+
+
+def compute_mandelbrot_gbuffer( double xmin, double dx, double ymin, double dy,
+                                int i0, int j0, int max_iter,
+                                int[:, :] image, unsigned char[:, :] extra,
+                                float[:, :] zx, float[:, :] zy,
+                                float[:, :] logDz, float[:, :] smooth,
+                                bint periodicity = True, int num_threads = 0,
+                                int[:] cancel = None):
+    """
+    fills the channels of a G-buffer, in place, see gbuffer_pixel()
+      pixel ( i, j) is at ( xmin + dx*( j0 + j), ymin + dy*( i0 + i))
+      returns True, if cancelled
+    """
+    cdef int height = image.shape[0]
+    cdef int width = image.shape[1]
+    cdef double eps2 = 0.0
+    cdef int i, j
+    cdef double y
+    cdef const int *flag = cancel_ptr(cancel)
+
+    if periodicity:
+        eps2 = periodicity_eps2(dx, dy)
+    if num_threads <= 0:
+        num_threads = openmp.omp_get_max_threads()
+
+    with nogil:
+        for i in prange(height, schedule='dynamic', num_threads=num_threads):
+            y = ymin + dy * (i0 + i)
+            for j in range(width):
+                if mandel_cancelled(flag):
+                    break
+                image[i, j] = gbuffer_pixel(xmin + dx * (j0 + j), y, max_iter, eps2,
+                                            &extra[i, j], &zx[i, j], &zy[i, j],
+                                            &logDz[i, j], &smooth[i, j])
+    return mandel_cancelled(flag) != 0
+
+#
+# G-buffer at arbitrary points, x[k, l], y[k, l], e.g. the sub-samples of
+#   pixel k, dx: the spacing of the samples, for the periodicity epsilon
+#
+def compute_mandelbrot_gbuffer_points( double[:, :] x, double[:, :] y, double dx,
+                                       int max_iter,
+                                       int[:, :] image, unsigned char[:, :] extra,
+                                       float[:, :] zx, float[:, :] zy,
+                                       float[:, :] logDz, float[:, :] smooth,
+                                       bint periodicity = True, int num_threads = 0):
+    cdef int height = image.shape[0]
+    cdef int width = image.shape[1]
+    cdef double eps2 = 0.0
+    cdef int i, j
+
+    if periodicity:
+        eps2 = periodicity_eps2(dx, dx)
+    if num_threads <= 0:
+        num_threads = openmp.omp_get_max_threads()
+
+    with nogil:
+        for i in prange(height, schedule='dynamic', num_threads=num_threads):
+            for j in range(width):
+                image[i, j] = gbuffer_pixel(x[i, j], y[i, j], max_iter, eps2,
+                                            &extra[i, j], &zx[i, j], &zy[i, j],
+                                            &logDz[i, j], &smooth[i, j])
+
+from libc.math cimport isnan, isinf
+from libc.float cimport DBL_MAX
+
+#
+# the normalization of FractalEngine.normalizeMandelbrotSet() in one pass,
+#   no temporary arrays: the escape counts are scaled to data_norm,
+#   dist_est: the DistEst correction with |z|, zAbs is not used otherwise
+#
+def normalize_escape( int[:, :] image, double[:, :] zAbs, int max_iter,
+                      double data_norm, double horizon, bint dist_est,
+                      double log_helper, double[:, :] out, int num_threads = 0):
+    cdef int height = image.shape[0]
+    cdef int width = image.shape[1]
+    cdef double corr = (data_norm - 1.0) / (max_iter - 1)
+    cdef double log_horizon = log(log(horizon)) / log(2.0)
+    cdef double v, t
+    cdef int i, j
+
+    if num_threads <= 0:
+        num_threads = openmp.omp_get_max_threads()
+
+    with nogil:
+        for i in prange(height, schedule='static', num_threads=num_threads):
+            for j in range(width):
+                v = image[i, j] * corr
+                if dist_est and v != 0.0:
+                    t = zAbs[i, j]
+                    if t <= 0.0:
+                        t = log_helper
+                    t = log(t)
+                    if t <= 0.0:
+                        t = log_helper
+                    v = v + 1.0 - log(t) / log(2.0) * corr + log_horizon
+                    #
+                    # as np.nan_to_num()
+                    #
+                    if isnan(v):
+                        v = 0.0
+                    elif isinf(v):
+                        v = DBL_MAX if v > 0.0 else -DBL_MAX
+                out[i, j] = v
+
+#
+# Buddhabrot: the orbits of the escaping c are accumulated, the density
+#   of z in the view. c = cr[k] + i ci[k], the samples, each orbit point
+#   adds weight[k], see mandelbrotBuddha.py. Channel l counts the orbits
+#   that escape before channel_iter[l], Nebulabrot: 3 channels.
+#   Every thread accumulates into its own planes hist[thread, :, :, :],
+#   the planes are merged by the caller, no atomics, stats_threads()
+#   planes for num_threads = 0. hits[k]: the orbit points of c[k] in the
+#   view, for the importance map
+#
+@cython.cfunc
+@cython.inline
+cdef int buddha_escape(double x, double y, int max_iter) noexcept nogil:
+    """
+    escape count of c, horizon 2, max_iter for culled and bounded c
+    """
+    cdef int iter = 0
+    cdef double zx = 0.0, zy = 0.0, zx2 = 0.0, zy2 = 0.0
+
+    if in_bulbP(x, y) or in_cardioidP(x, y):
+        return max_iter
+    while zx2 + zy2 < 4.0 and iter < max_iter:
+        zy = 2.0 * zx * zy + y
+        zx = zx2 - zy2 + x
+        zx2 = zx * zx
+        zy2 = zy * zy
+        iter += 1
+    return iter
+
+@cython.cfunc
+cdef int buddha_orbit(double x, double y, int n, double w,
+                      double xmin, double ymin, double inv_dx,
+                      int width, int height, int n_channels, int *channel_iter,
+                      float *h) noexcept nogil:
+    """
+    the n points of the orbit of c are added to the channels whose
+      channel_iter exceeds n, returns the points in the view. The
+      arithmetic of buddha_escape, the orbit is the same, it ends
+      at the horizon
+    """
+    cdef int k, l, off, hits = 0
+    cdef double zx = 0.0, zy = 0.0, zx2 = 0.0, zy2 = 0.0, fx, fy
+    cdef long plane = <long>width * height
+
+    for k in range(n):
+        zy = 2.0 * zx * zy + y
+        zx = zx2 - zy2 + x
+        zx2 = zx * zx
+        zy2 = zy * zy
+        fx = (zx - xmin) * inv_dx
+        fy = (zy - ymin) * inv_dx
+        if fx >= 0.0 and fx < width and fy >= 0.0 and fy < height:
+            hits += 1
+            off = <int>fy * width + <int>fx
+            for l in range(n_channels):
+                if n < channel_iter[l]:
+                    h[l * plane + off] += <float>w
+        if zx2 + zy2 >= 4.0:
+            break
+    return hits
+
+def compute_buddhabrot( double[:] cr, double[:] ci, double[:] weight,
+                        double xmin, double ymin, double dx,
+                        int[:] channel_iter, float[:, :, :, :] hist,
+                        int[:] hits = None, int num_threads = 0,
+                        int[:] cancel = None):
+
+    cdef int n = cr.shape[0]
+    cdef int n_channels = hist.shape[1]
+    cdef int height = hist.shape[2]
+    cdef int width = hist.shape[3]
+    cdef double inv_dx = 1.0 / dx
+    cdef int max_iter = 0
+    cdef int k, l, iter, count
+    cdef const int *flag = cancel_ptr(cancel)
+    cdef int *hp = NULL
+    cdef long stride = <long>n_channels * width * height
+
+    if num_threads <= 0:
+        num_threads = openmp.omp_get_max_threads()
+    if channel_iter.shape[0] != n_channels:
+        raise ValueError("channel_iter: %d channels expected" % n_channels)
+    if hist.shape[0] < num_threads or not hist.is_c_contig():
+        raise ValueError("hist: contiguous, %d planes expected" % num_threads)
+    if hits is not None:
+        hp = &hits[0]
+    for l in range(n_channels):
+        max_iter = max(max_iter, channel_iter[l])
+    cdef float *h0 = &hist[0, 0, 0, 0]
+    cdef int *ch = &channel_iter[0]
+
+    with nogil:
+        for k in prange(n, schedule='dynamic', chunksize=64, num_threads=num_threads):
+            if mandel_cancelled(flag):
+                continue
+            iter = buddha_escape(cr[k], ci[k], max_iter)
+            count = 0
+            if iter < max_iter:
+                count = buddha_orbit(cr[k], ci[k], iter, weight[k],
+                                     xmin, ymin, inv_dx, width, height,
+                                     n_channels, ch,
+                                     h0 + stride * openmp.omp_get_thread_num())
+            if hp != NULL:
+                hp[k] = count
+    return mandel_cancelled(flag) != 0
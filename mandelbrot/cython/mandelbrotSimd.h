@@ -0,0 +1,73 @@
+/*
+ * mandelbrotSimd.h, the SIMD escape-time kernels of mandelbrotCython.pyx
+ *
+ * MANDEL_LANES pixels are iterated in lockstep, GCC/Clang vector
+ * extensions, the compiler emits AVX-512 (8 lanes), AVX2 (4 lanes)
+ * or SSE2 (2 lanes), depending on -march. mandel_simd_row_f32() is
+ * the float32 version with twice the lanes. A lane whose pixel escaped,
+ * reached max_iter or was found periodic is refilled with the next
+ * pixel of the row, the lanes stay busy.
+ *
+ * Without vector extensions or with -DMANDEL_NO_SIMD mandel_simd_row()
+ * is the scalar loop, MANDEL_SIMD is 0 then.
+ *
+ * The row kernel is in mandelbrotSimdRow.h, included for double and float.
+ *
+ * The results are the same as mandel_pixel() in mandelbrotCython.pyx:
+ *   image: the escape count, max_iter for interior pixels
+ *   zabs: |z|, 0. for culled and periodic pixels
+ */
+#ifndef MANDELBROT_SIMD_H
+#define MANDELBROT_SIMD_H
+
+#include <math.h>
+
+#if defined(__AVX512F__)
+#define MANDEL_LANES 8
+#elif defined(__AVX__)
+#define MANDEL_LANES 4
+#else
+#define MANDEL_LANES 2
+#endif
+
+static inline int simd_in_set(double x, double y)
+{
+    double xm = x - 0.25;
+    double q = xm * xm + y * y;
+    double xp = x + 1.0;
+    if (xp * xp + y * y < 0.0625)
+        return 1;
+    return q * (q + xm) < 0.25 * y * y;
+}
+
+#if (defined(__GNUC__) || defined(__clang__)) && !defined(MANDEL_NO_SIMD)
+#define MANDEL_SIMD 1
+#else
+#define MANDEL_SIMD 0
+#endif
+
+#define REAL double
+#define MASKINT long long
+#define LANES MANDEL_LANES
+#define ROW mandel_simd_row
+#define SIMD_SUFFIX _f64
+#include "mandelbrotSimdRow.h"
+#undef REAL
+#undef MASKINT
+#undef LANES
+#undef ROW
+#undef SIMD_SUFFIX
+
+#define REAL float
+#define MASKINT int
+#define LANES (2 * MANDEL_LANES)
+#define ROW mandel_simd_row_f32
+#define SIMD_SUFFIX _f32
+#include "mandelbrotSimdRow.h"
+#undef REAL
+#undef MASKINT
+#undef LANES
+#undef ROW
+#undef SIMD_SUFFIX
+
+#endif
@@ -0,0 +1,264 @@
+/*
+ * mandelbrotSimdRow.h, the row kernel of mandelbrotSimd.h, included
+ * once per floating point type. Expects
+ *   REAL: double or float
+ *   MASKINT: the integer of the same size, long long or int
+ *   LANES: the number of lanes
+ *   ROW: the name of the row function
+ *   SIMD_SUFFIX: appended to the local names
+ */
+#ifndef LANES_STOP
+/*
+ * the hot loop exits when LANES_STOP lanes are stopped, the others
+ * are frozen until then. 1 was as fast as LANES / 2 on AVX-512.
+ */
+#define LANES_STOP 1
+#endif
+#define SIMD_CAT_(a, b) a ## b
+#define SIMD_CAT(a, b) SIMD_CAT_(a, b)
+#define vreal SIMD_CAT(vreal, SIMD_SUFFIX)
+#define vmask SIMD_CAT(vmask, SIMD_SUFFIX)
+#define vselect SIMD_CAT(vselect, SIMD_SUFFIX)
+#define vany SIMD_CAT(vany, SIMD_SUFFIX)
+#define vcount SIMD_CAT(vcount, SIMD_SUFFIX)
+#define lanes_t SIMD_CAT(lanes_t, SIMD_SUFFIX)
+#define simd_refill SIMD_CAT(simd_refill, SIMD_SUFFIX)
+
+#if MANDEL_SIMD
+
+typedef REAL vreal __attribute__((vector_size(LANES * sizeof(REAL))));
+typedef MASKINT vmask __attribute__((vector_size(LANES * sizeof(REAL))));
+
+static inline vreal vselect(vmask m, vreal a, vreal b)
+{
+    return (vreal)(((vmask)a & m) | ((vmask)b & ~m));
+}
+
+static inline int vany(vmask m)
+{
+    int l;
+    for (l = 0; l < LANES; l++)
+        if (m[l])
+            return 1;
+    return 0;
+}
+
+static inline int vcount(vmask m)
+{
+    int l, n = 0;
+    for (l = 0; l < LANES; l++)
+        n += (m[l] != 0);
+    return n;
+}
+
+typedef struct {
+    vreal cx, zx, zy, iter, ckx, cky, lam, power;
+    vmask idle;
+    int pix[LANES];
+    int next;
+} lanes_t;
+
+/*
+ * assigns the next todo pixel of the row to lane l, culled pixels
+ * are written directly. Returns 0, if the row is exhausted.
+ */
+static inline int simd_refill(lanes_t *s, int l, int width, const unsigned char *todo,
+                              double xmin, double dx, int j0, double y, int max_iter,
+                              int *image, double *zabs)
+{
+    int j;
+    double x;
+    while (s->next < width) {
+        j = s->next++;
+        if (todo[j] == 0)
+            continue;
+        x = xmin + dx * (j0 + j);
+        if (simd_in_set(x, y)) {
+            image[j] = max_iter;
+            zabs[j] = 0.0;
+            continue;
+        }
+        s->cx[l] = x;
+        s->zx[l] = 0.0;
+        s->zy[l] = 0.0;
+        s->iter[l] = 0.0;
+        s->ckx[l] = 0.0;
+        s->cky[l] = 0.0;
+        s->lam[l] = 0.0;
+        s->power[l] = 1.0;
+        s->idle[l] = 0;
+        s->pix[l] = j;
+        return 1;
+    }
+    /*
+     * an idle lane iterates c = 0, z = 0, it never escapes
+     */
+    s->cx[l] = 0.0;
+    s->zx[l] = 0.0;
+    s->zy[l] = 0.0;
+    s->iter[l] = 0.0;
+    s->idle[l] = -1;
+    s->pix[l] = -1;
+    return 0;
+}
+
+static void ROW(int width, const unsigned char *todo,
+                double xmin, double dx, int j0, double y,
+                int max_iter, double horizon2, double eps2,
+                int *image, double *zabs)
+{
+    lanes_t s;
+    vreal cy, h2, maxv, eps2v, one, two, zero, zx2, zy2, ddx, ddy, t;
+    vmask stop, live, per, upd, fin, perm;
+    int l, active = 0;
+
+    for (l = 0; l < LANES; l++) {
+        cy[l] = y;
+        h2[l] = horizon2;
+        maxv[l] = (double) max_iter;
+        eps2v[l] = eps2;
+        one[l] = 1.0;
+        two[l] = 2.0;
+        zero[l] = 0.0;
+    }
+    s.next = 0;
+    for (l = 0; l < LANES; l++)
+        active += simd_refill(&s, l, width, todo, xmin, dx, j0, y, max_iter, image, zabs);
+
+    while (active > 0) {
+        /*
+         * the hot loop runs on local copies. Stopped lanes are frozen
+         * (fin), the loop exits when LANES_STOP lanes are stopped or idle
+         */
+        vreal cx = s.cx, zx = s.zx, zy = s.zy, iter = s.iter;
+        vreal ckx = s.ckx, cky = s.cky, lam = s.lam, power = s.power;
+        vmask idle = s.idle;
+        fin = idle & ~idle;
+        perm = fin;
+        while (1) {
+            zx2 = zx * zx;
+            zy2 = zy * zy;
+            /*
+             * escaped or max_iter
+             */
+            stop = ~((zx2 + zy2 < h2) & (iter < maxv)) & ~idle & ~fin;
+            if (vany(stop)) {
+                fin |= stop;
+                if (vcount(fin | idle) >= LANES_STOP)
+                    break;
+            }
+            live = ~fin;
+            t = two * zx * zy + cy;
+            zx = vselect(live, zx2 - zy2 + cx, zx);
+            zy = vselect(live, t, zy);
+            iter = vselect(live, iter + one, iter);
+            if (eps2 > 0.0) {
+                /*
+                 * Brent, per lane
+                 */
+                ddx = zx - ckx;
+                ddy = zy - cky;
+                per = (ddx * ddx + ddy * ddy < eps2v) & live & ~idle;
+                lam += one;
+                upd = lam == power;
+                ckx = vselect(upd, zx, ckx);
+                cky = vselect(upd, zy, cky);
+                power = vselect(upd, two * power, power);
+                lam = vselect(upd, zero, lam);
+                if (vany(per)) {
+                    fin |= per;
+                    perm |= per;
+                    if (vcount(fin | idle) >= LANES_STOP)
+                        break;
+                }
+            }
+        }
+        s.zx = zx;
+        s.zy = zy;
+        s.iter = iter;
+        s.ckx = ckx;
+        s.cky = cky;
+        s.lam = lam;
+        s.power = power;
+        /*
+         * the stopped lanes are refilled, zx2, zy2 belong to the
+         * frozen z of the escaped lanes
+         */
+        for (l = 0; l < LANES; l++) {
+            if (!fin[l])
+                continue;
+            if (perm[l]) {
+                image[s.pix[l]] = max_iter;
+                zabs[s.pix[l]] = 0.0;
+            } else {
+                image[s.pix[l]] = (int) iter[l];
+                zabs[s.pix[l]] = sqrt(zx2[l] + zy2[l]);
+            }
+            active -= 1 - simd_refill(&s, l, width, todo, xmin, dx, j0, y,
+                                      max_iter, image, zabs);
+        }
+    }
+}
+
+#else
+
+static void ROW(int width, const unsigned char *todo,
+                double xmin, double dx, int j0, double y,
+                int max_iter, double horizon2, double eps2,
+                int *image, double *zabs)
+{
+    int j, iter, lam, power;
+    REAL x, cy = (REAL) y, h2 = (REAL) horizon2, e2 = (REAL) eps2;
+    REAL zx, zy, zx2, zy2, ckx, cky;
+
+    for (j = 0; j < width; j++) {
+        if (todo[j] == 0)
+            continue;
+        if (simd_in_set(xmin + dx * (j0 + j), y)) {
+            image[j] = max_iter;
+            zabs[j] = 0.0;
+            continue;
+        }
+        x = (REAL) (xmin + dx * (j0 + j));
+        zx = zy = zx2 = zy2 = ckx = cky = 0.0;
+        iter = lam = 0;
+        power = 1;
+        while (zx2 + zy2 < h2 && iter < max_iter) {
+            zy = 2 * zx * zy + cy;
+            zx = zx2 - zy2 + x;
+            zx2 = zx * zx;
+            zy2 = zy * zy;
+            iter++;
+            if (eps2 > 0.0) {
+                lam++;
+                if ((zx - ckx) * (zx - ckx) + (zy - cky) * (zy - cky) < e2)
+                    break;
+                if (lam == power) {
+                    ckx = zx;
+                    cky = zy;
+                    power *= 2;
+                    lam = 0;
+                }
+            }
+        }
+        if (zx2 + zy2 < h2 && iter < max_iter) {
+            image[j] = max_iter;
+            zabs[j] = 0.0;
+        } else {
+            image[j] = iter;
+            zabs[j] = sqrt(zx2 + zy2);
+        }
+    }
+}
+
+#endif
+
+#undef vreal
+#undef vmask
+#undef vselect
+#undef vany
+#undef vcount
+#undef lanes_t
+#undef simd_refill
+#undef SIMD_CAT
+#undef SIMD_CAT_
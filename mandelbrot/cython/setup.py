@@ -15,11 +15,15 @@ from setuptools import setup, Extension
 from Cython.Build import cythonize
 import numpy as np
 
+#
+# -march=native: AVX2/AVX-512 for mandelbrotSimd.h
+#
 ext1 = Extension(
     name="mandelbrotCython",
     sources=["mandelbrotCython.pyx"],
-    include_dirs=[np.get_include()],
-    extra_compile_args=["-fopenmp"],
+    include_dirs=[np.get_include(), "."],
+    depends=["mandelbrotSimd.h", "mandelbrotSimdRow.h"],
+    extra_compile_args=["-fopenmp", "-O3", "-march=native"],
     extra_link_args=["-fopenmp"],
 )
 
@@ -1794,7 +1794,7 @@ class operatorWidget( QMainWindow):
     
     def cb_runOp( self):
         """
-        called from engine.calcMandelbrotSetCythonTiled
+        called from engine.calcMandelbrotSetCython
         """
         self.cb_resetUV()
         self.updateGUI()
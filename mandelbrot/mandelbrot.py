@@ -21,11 +21,15 @@ try:
 except: 
     cythonOK = False
 try: 
-    from numba import cuda
+    import mandelbrotNumba
     numbaOK = True
 except:
     numbaOK = False
 import mandelbrotPlaces
+import mandelbrotDeep
+import mandelbrotTiled
+import mandelbrotRender
+import mandelbrotBuddha
 import dynamicOperators
 import colorWidget
 
@@ -36,6 +40,7 @@ MAX_ITER_VALUES = [ 512, 16, 32, 64, 128, 256, 384, 512, 768,
 
 SCAN_POINT_VALUES = [ 200, 20, 100, 200, 500, 1000, 2000, 5000]
 JULIA_MODE_VALUES = [ 'Off', 'Small', 'Medium', 'Big', 'Large'] 
+TILE_SIZE_VALUES = [ 32, 64, 128, 256]
 ZOOM_VALUES = [ 4, 1., 1.2, 1.5, 2, 3, 4, 8, 16,]
 
 METADATA_MEMBERS = [
@@ -78,6 +83,16 @@ MBS_Attrs = METADATA_MEMBERS + \
       'isFilteredM', 'operatorWidget',
       'backgroundColor', 'engine', 'viewerMain', 'viewerJS', 'winDebugColoring',
       'operatorWidget', 'useMPL', 'colorPars', 'wCentral', 'switchPb', 
+      'deep', 'deepAction', 'cxMStr', 'cyMStr', 'deltaMStr', 
+      'marianiSilver', 'marianiSilverAction', 'tileSize', 'tileSizeMenu', 
+      'progressive', 'progressiveAction', 'reusePixels', 'reusePixelsAction', 
+      'resumable', 'resumableAction', 'simd', 'simdAction', 'benchmarkAction', 
+      'float32', 'float32Action', 'gBuffer', 'gBufferAction', 
+      'antiAlias', 'antiAliasAction', 'symmetry', 'symmetryAction', 
+      'asyncRender', 'asyncRenderAction', 'renderService', 
+      'resultCache', 'resultCacheAction', 'diskCache', 'diskCacheAction', 
+      'prefetch', 'prefetchMenu', 'prefetchShare', 'prefetchShareMenu', 
+      'autoMaxIter', 'autoMaxIterAction', 'density', 'densityMenu', 
      ]
 
 
@@ -149,6 +164,7 @@ class MBSMainWindow( QMainWindow):
         self.viewerMain.clickedShiftMB1.connect(self.cb_onViewerClickedShiftMB1)
         self.viewerMain.clickedMB2.connect(self.cb_onViewerClickedMB2)
         self.viewerMain.clickedMB3.connect(self.cb_onViewerClickedMB3)
+        self.viewerMain.dragged.connect(self.cb_onViewerDragged)
         self.viewerMain.deltaLbl.connect(self.cb_deltaLbl)
         self.viewerMain.coloringOutput.connect( self.viewerDebugColoring.mpl.createDebugColoringOutput)
         
@@ -159,6 +175,8 @@ class MBSMainWindow( QMainWindow):
         self.prepareCentralWidget()
         self.prepareStatusBar()
 
+        self.renderService = mandelbrotRender.RenderService( self, self.engine)
+
         self.updateGUI()
 
         self.engine.calcMandelbrotSet()
@@ -231,6 +249,9 @@ class MBSMainWindow( QMainWindow):
     def displayMBS( self, img):
         #print( "%s.displayEscapeCount" % self.name)
         self.displayImage( img)
+        if self.autoMaxIter == "True" and not self.isAnimating: 
+            self.maxIterMCombo.setCurrentIndex( 
+                utils.findCurrentIndex( self.maxIterM, MAX_ITER_VALUES))
         return
     
     def displayDynOp( self, img):
@@ -310,6 +331,27 @@ class MBSMainWindow( QMainWindow):
         self.scalarAction = None
         self.winDebugColoring = None
         self.busy = False
+        self.isAnimating = False
+        self.deepAction = None
+        self.marianiSilverAction = None
+        self.tileSizeMenu = None
+        self.progressiveAction = None
+        self.reusePixelsAction = None
+        self.resumableAction = None
+        self.simdAction = None
+        self.float32Action = None
+        self.gBufferAction = None
+        self.antiAliasAction = None
+        self.symmetryAction = None
+        self.asyncRenderAction = None
+        self.resultCacheAction = None
+        self.diskCacheAction = None
+        self.prefetchMenu = None
+        self.autoMaxIterAction = None
+        self.prefetchShareMenu = None
+        self.densityMenu = None
+        self.renderService = None
+        self.numbaAction = None
 
         self.cythonAction = None
         self.numpyAction = None
@@ -320,6 +362,9 @@ class MBSMainWindow( QMainWindow):
         self.cxM = -0.75
         self.cyM = 0.
         self.deltaM = 3.
+        self.cxMStr = None
+        self.cyMStr = None
+        self.deltaMStr = None
         self.cxJ = 0.
         self.cyJ = 0.
         self.deltaJ = 3.
@@ -332,10 +377,93 @@ class MBSMainWindow( QMainWindow):
         self.scalar = "False" 
         if self.scalarAction is not None: 
             self.scalarAction.setChecked( self.scalar == "True")
+
+        self.numba = "False" 
+        if self.numbaAction is not None: 
+            self.numbaAction.setChecked( self.numba == "True")
+
+        self.deep = "False" 
+        if self.deepAction is not None: 
+            self.deepAction.setChecked( self.deep == "True")
+
+        self.marianiSilver = "False" 
+        if self.marianiSilverAction is not None: 
+            self.marianiSilverAction.setChecked( self.marianiSilver == "True")
+
+        self.progressive = "True" 
+        if self.progressiveAction is not None: 
+            self.progressiveAction.setChecked( self.progressive == "True")
+
+        self.reusePixels = "True" 
+        if self.reusePixelsAction is not None: 
+            self.reusePixelsAction.setChecked( self.reusePixels == "True")
+
+        self.resumable = "True" 
+        if self.resumableAction is not None: 
+            self.resumableAction.setChecked( self.resumable == "True")
+
+        self.simd = "False" 
+        if self.simdAction is not None: 
+            self.simdAction.setChecked( self.simd == "True")
+
+        self.float32 = "False" 
+        if self.float32Action is not None: 
+            self.float32Action.setChecked( self.float32 == "True")
+
+        self.gBuffer = "False" 
+        if self.gBufferAction is not None: 
+            self.gBufferAction.setChecked( self.gBuffer == "True")
+
+        self.antiAlias = "False" 
+        if self.antiAliasAction is not None: 
+            self.antiAliasAction.setChecked( self.antiAlias == "True")
+
+        self.symmetry = "False" 
+        if self.symmetryAction is not None: 
+            self.symmetryAction.setChecked( self.symmetry == "True")
+
+        self.asyncRender = "False" 
+        if self.asyncRenderAction is not None: 
+            self.asyncRenderAction.setChecked( self.asyncRender == "True")
+
+        self.resultCache = "True" 
+        if self.resultCacheAction is not None: 
+            self.resultCacheAction.setChecked( self.resultCache == "True")
+
+        self.diskCache = "False" 
+        if self.diskCacheAction is not None: 
+            self.diskCacheAction.setChecked( self.diskCache == "True")
+
+        self.autoMaxIter = "False" 
+        if self.autoMaxIterAction is not None: 
+            self.autoMaxIterAction.setChecked( self.autoMaxIter == "True")
+
+        self.prefetch = 'Zoom'
+        if self.prefetchMenu is not None: 
+            for elm in self.prefetchMenu.actions():
+                elm.setChecked( elm.text() == self.prefetch)
+
+        self.prefetchShare = 0.5
+        if self.prefetchShareMenu is not None: 
+            for elm in self.prefetchShareMenu.actions():
+                elm.setChecked( elm.text() == "%d%%" % ( 100*self.prefetchShare))
+
+        self.density = 'Off'
+        if self.densityMenu is not None: 
+            for elm in self.densityMenu.actions():
+                elm.setChecked( elm.text() == self.density)
+
+        self.tileSize = mandelbrotTiled.TILE_SIZE
+        if self.tileSizeMenu is not None: 
+            for elm in self.tileSizeMenu.actions():
+                elm.setChecked( elm.text() == str( self.tileSize))
         
         self.cxM = -0.75
         self.cyM = 0.
         self.deltaM = 3.
+        self.cxMStr = None
+        self.cyMStr = None
+        self.deltaMStr = None
         self.cxJ = 0.
         self.cyJ = 0.
         self.deltaJ = 3.
@@ -439,6 +567,12 @@ class MBSMainWindow( QMainWindow):
         self.repeatAction.triggered.connect( self.cb_repeat)
         self.fileMenu.addAction( self.repeatAction)
         #
+        # benchmark
+        #
+        self.benchmarkAction = QAction('Benchmark kernels (1 core)', self)        
+        self.benchmarkAction.triggered.connect( self.engine.benchmarkKernels)
+        self.fileMenu.addAction( self.benchmarkAction)
+        #
         # exit
         #
         self.exitAction = QAction('Exit', self)        
@@ -490,6 +624,159 @@ class MBSMainWindow( QMainWindow):
             self.tiledAction.setChecked( self.tiled == "True")
             self.flagsMenu.addAction( self.tiledAction)
         #
+        # Mariani-Silver
+        #
+        if cythonOK:
+            self.marianiSilverAction = QAction('Cython/C-Mariani-Silver', self, checkable = True)
+            self.marianiSilverAction.triggered.connect( self.cb_marianiSilver)
+            self.marianiSilverAction.setStatusTip('Solid guessing, fills rectangles with a uniform border, \nDebugSpeed compares with the full render')
+            self.marianiSilverAction.setChecked( self.marianiSilver == "True")
+            self.flagsMenu.addAction( self.marianiSilverAction)
+        #
+        # tile size
+        #
+        if cythonOK:
+            self.tileSizeMenu = self.flagsMenu.addMenu('Cython/C-tiled, tile size')
+            temp = QActionGroup( self)
+            for elm in TILE_SIZE_VALUES:
+                action = QAction( str( elm), self, checkable = True)
+                action.triggered.connect( self.mkTileSizeCb( elm))
+                action.setChecked( elm == self.tileSize)
+                temp.addAction( action)
+                self.tileSizeMenu.addAction( action)
+        #
+        # progressive
+        #
+        if cythonOK:
+            self.progressiveAction = QAction('Cython/C-progressive', self, checkable = True)
+            self.progressiveAction.triggered.connect( self.cb_progressive)
+            self.progressiveAction.setStatusTip('Coarse-to-fine passes, 1/8, 1/4, 1/2, full resolution')
+            self.progressiveAction.setChecked( self.progressive == "True")
+            self.flagsMenu.addAction( self.progressiveAction)
+        #
+        # reuse pixels
+        #
+        if cythonOK:
+            self.reusePixelsAction = QAction('Cython/C-reuse pixels', self, checkable = True)
+            self.reusePixelsAction.triggered.connect( self.cb_reusePixels)
+            self.reusePixelsAction.setStatusTip('Integer zoom-in and pan: copy the pixels of the previous frame, snaps the center')
+            self.reusePixelsAction.setChecked( self.reusePixels == "True")
+            self.flagsMenu.addAction( self.reusePixelsAction)
+        #
+        # SIMD
+        #
+        if cythonOK:
+            self.simdAction = QAction('Cython/C-SIMD', self, checkable = True)
+            self.simdAction.triggered.connect( self.cb_simd)
+            self.simdAction.setStatusTip('Lanes of pixels in lockstep (AVX2/AVX-512), no resumable iterations')
+            self.simdAction.setChecked( self.simd == "True")
+            self.flagsMenu.addAction( self.simdAction)
+        #
+        # G-buffer
+        #
+        if cythonOK:
+            self.gBufferAction = QAction('Cython/C-G-buffer', self, checkable = True)
+            self.gBufferAction.triggered.connect( self.cb_gBuffer)
+            self.gBufferAction.setStatusTip('Keep z, dz and the smooth iteration, changing the smooth mode does not re-calculate the view')
+            self.gBufferAction.setChecked( self.gBuffer == "True")
+            self.flagsMenu.addAction( self.gBufferAction)
+        #
+        # adaptive anti-aliasing
+        #
+        if cythonOK:
+            self.antiAliasAction = QAction('Cython/C-adaptive AA', self, checkable = True)
+            self.antiAliasAction.triggered.connect( self.cb_antiAlias)
+            self.antiAliasAction.setStatusTip('Edge and boundary pixels are re-sampled with 16 jittered sub-samples, G-buffer, not in animations')
+            self.antiAliasAction.setChecked( self.antiAlias == "True")
+            self.flagsMenu.addAction( self.antiAliasAction)
+        #
+        # symmetry
+        #
+        if cythonOK:
+            self.symmetryAction = QAction('Cython/C-symmetry', self, checkable = True)
+            self.symmetryAction.triggered.connect( self.cb_symmetry)
+            self.symmetryAction.setStatusTip('Mirror the pixels across the real axis (Mandelbrot) and the origin (Julia), snaps the grid < 1/4 pixel')
+            self.symmetryAction.setChecked( self.symmetry == "True")
+            self.flagsMenu.addAction( self.symmetryAction)
+        #
+        # background rendering
+        #
+        self.asyncRenderAction = QAction('Render in background', self, checkable = True)
+        self.asyncRenderAction.triggered.connect( self.cb_asyncRender)
+        self.asyncRenderAction.setStatusTip('Render in a worker thread, the GUI stays responsive, \na new request replaces the pending one and cancels the render in flight')
+        self.asyncRenderAction.setChecked( self.asyncRender == "True")
+        self.flagsMenu.addAction( self.asyncRenderAction)
+        #
+        # result cache, Cython and Numba
+        #
+        self.resultCacheAction = QAction('Result cache', self, checkable = True)
+        self.resultCacheAction.triggered.connect( self.cb_resultCache)
+        self.resultCacheAction.setStatusTip('Keep the raw results of the recent views in memory (LRU), \nrevisited views are not calculated')
+        self.resultCacheAction.setChecked( self.resultCache == "True")
+        self.flagsMenu.addAction( self.resultCacheAction)
+        #
+        # the disk tier of the result cache, opt-in
+        #
+        self.diskCacheAction = QAction('Disk cache', self, checkable = True)
+        self.diskCacheAction.triggered.connect( self.cb_diskCache)
+        self.diskCacheAction.setStatusTip('Result cache: the evicted views go to ~/.cache/mandelbrot, up to 2 GB')
+        self.diskCacheAction.setChecked( self.diskCache == "True")
+        self.flagsMenu.addAction( self.diskCacheAction)
+        #
+        # auto maxIterM, Cython and Numba
+        #
+        self.autoMaxIterAction = QAction('Auto maxIterM', self, checkable = True)
+        self.autoMaxIterAction.triggered.connect( self.cb_autoMaxIter)
+        self.autoMaxIterAction.setStatusTip('The iteration statistics of a frame raise or lower maxIterM \nfor the next frame, also during animations')
+        self.autoMaxIterAction.setChecked( self.autoMaxIter == "True")
+        self.flagsMenu.addAction( self.autoMaxIterAction)
+        #
+        # prefetch, the idle worker calculates the likely next views into the result cache
+        #
+        self.prefetchMenu = self.flagsMenu.addMenu('Prefetch')
+        temp = QActionGroup( self)
+        for elm in mandelbrotRender.PREFETCH_VALUES:
+            action = QAction( elm, self, checkable = True)
+            action.triggered.connect( self.mkPrefetchCb( elm))
+            action.setChecked( elm == self.prefetch)
+            temp.addAction( action)
+            self.prefetchMenu.addAction( action)
+        self.prefetchShareMenu = self.flagsMenu.addMenu('Prefetch, CPU share')
+        temp = QActionGroup( self)
+        for elm in mandelbrotRender.PREFETCH_SHARE_VALUES:
+            action = QAction( "%d%%" % ( 100*elm), self, checkable = True)
+            action.triggered.connect( self.mkPrefetchShareCb( elm))
+            action.setChecked( elm == self.prefetchShare)
+            temp.addAction( action)
+            self.prefetchShareMenu.addAction( action)
+        #
+        # density of the escaping orbits, Cython and Numba
+        #
+        self.densityMenu = self.flagsMenu.addMenu('Density')
+        temp = QActionGroup( self)
+        for elm in mandelbrotBuddha.DENSITY_VALUES:
+            action = QAction( elm, self, checkable = True)
+            action.triggered.connect( self.mkDensityCb( elm))
+            action.setChecked( elm == self.density)
+            temp.addAction( action)
+            self.densityMenu.addAction( action)
+        #
+        # float32 at overview zooms, Cython and Numpy
+        #
+        self.float32Action = QAction('float32 overview', self, checkable = True)
+        self.float32Action.triggered.connect( self.cb_float32)
+        self.float32Action.setStatusTip('float32 if the pixel spacing is large and maxIter small, see FractalEngine.selectPrecision')
+        self.float32Action.setChecked( self.float32 == "True")
+        self.flagsMenu.addAction( self.float32Action)
+        #
+        # resumable, Cython and Numpy
+        #
+        self.resumableAction = QAction('Resumable iterations', self, checkable = True)
+        self.resumableAction.triggered.connect( self.cb_resumable)
+        self.resumableAction.setStatusTip('Keep the orbits, raising maxIter continues the bounded pixels')
+        self.resumableAction.setChecked( self.resumable == "True")
+        self.flagsMenu.addAction( self.resumableAction)
+        #
         # Numpy/Numexpr
         #
         self.numpyAction = QAction('Numpy/NumExpr', self, checkable = True)        
@@ -498,6 +785,15 @@ class MBSMainWindow( QMainWindow):
         self.numpyAction.setChecked( self.numpy == "True")
         self.flagsMenu.addAction( self.numpyAction)
         #
+        # Numba
+        #
+        if numbaOK:
+            self.numbaAction = QAction('Numba', self, checkable = True)        
+            self.numbaAction.triggered.connect( self.cb_numba)
+            self.numbaAction.setStatusTip('Enable the Numba CPU kernels, parallel, \nthe first call of a session loads the compiled code')
+            self.numbaAction.setChecked( self.numba == "True")
+            self.flagsMenu.addAction( self.numbaAction)
+        #
         # scalar
         #
         self.scalarAction = QAction('Scalar', self, checkable = True)        
@@ -506,6 +802,14 @@ class MBSMainWindow( QMainWindow):
         self.scalarAction.setChecked( self.scalar == "True")
         self.flagsMenu.addAction( self.scalarAction)
         #
+        # deep, perturbation
+        #
+        self.deepAction = QAction('Perturbation', self, checkable = True)        
+        self.deepAction.triggered.connect( self.cb_deep)
+        self.deepAction.setStatusTip('Enforce the perturbation (deep zoom) engine, \nselected automatically when float64 pixelates')
+        self.deepAction.setChecked( self.deep == "True")
+        self.flagsMenu.addAction( self.deepAction)
+        #
         # ResetMarker black/white
         #
         self.rmColorAction = QAction('RM is black', self, checkable = True)        
@@ -1001,6 +1305,26 @@ class MBSMainWindow( QMainWindow):
         self.centerMenu.addAction( getattr( self, temp))
         return 
 
+    def moveCenter( self, x, y, zoom = 1.):
+        """
+        moves the center to ( x, y), delta -> delta/zoom. 
+        The decimal strings cxMStr, cyMStr, deltaMStr keep the 
+        digits that do not fit into cxM, cyM, deltaM, see mandelbrotDeep.py. 
+        The offset is taken in whole pixels, times deltaMStr/widthM in decimal
+        """
+        deltaMStr = mandelbrotDeep.decimalMember( self, 'deltaM')
+        ix = int( round( ( x - self.cxM)/self.deltaM*self.widthM))
+        iy = int( round( ( y - self.cyM)/self.deltaM*self.widthM))
+        self.cxMStr = mandelbrotDeep.addPixelsDecimal( 
+            mandelbrotDeep.decimalMember( self, 'cxM'), deltaMStr, ix, self.widthM)
+        self.cyMStr = mandelbrotDeep.addPixelsDecimal( 
+            mandelbrotDeep.decimalMember( self, 'cyM'), deltaMStr, iy, self.widthM)
+        self.deltaMStr = mandelbrotDeep.divideDecimal( deltaMStr, zoom)
+        self.cxM = mandelbrotDeep.decimalToFloat( self.cxMStr)
+        self.cyM = mandelbrotDeep.decimalToFloat( self.cyMStr)
+        self.deltaM = mandelbrotDeep.decimalToFloat( self.deltaMStr, mandelbrotDeep.DELTA_MIN)
+        return 
+    
     def updateGUI( self):
 
         self.execDynOpCb.setChecked( self.execDynOp == "True")
@@ -1102,8 +1426,8 @@ class MBSMainWindow( QMainWindow):
     
     @pyqtSlot()
     def cb_repeat( self):
-        self.engine.calcMandelbrotSet()
-        self.engine.calcJuliaSet()
+        self.renderService.request( 'M')
+        self.renderService.request( 'J')
         return
     
     @pyqtSlot( float, float)
@@ -1112,12 +1436,10 @@ class MBSMainWindow( QMainWindow):
         MB1 zoom-in
         """
         #print( "%s.onViewerClickedMB1: x %g y %g " % ( self.name, x, y))
-        self.cxM = x
-        self.cyM = y
-        self.deltaM = self.deltaM/self.zoom
+        self.moveCenter( x, y, self.zoom)
         #self.viewerMain.setWorldRect() # for PG
-        self.engine.calcMandelbrotSet()
-        self.engine.calcJuliaSet()
+        self.renderService.request( 'M')
+        self.renderService.request( 'J')
         
         return
 
@@ -1131,18 +1453,27 @@ class MBSMainWindow( QMainWindow):
         
         return
     
+    @pyqtSlot( float, float)
+    def cb_onViewerDragged( self, x, y):
+        """
+        drag-panning, with Flags-Cython/C-reuse pixels only the 
+        strips which came into view are calculated. The drag events
+        are not blocked, a new position replaces the pending one
+        """
+        self.moveCenter( x, y)
+        self.renderService.request( 'M', display = False)
+        return
+
     @pyqtSlot( float, float)
     def cb_onViewerClickedMB2( self, x, y):
         """
         MB2 - move ROI
         """
         print( "mandelbrot: MB2 x %g y %g " % ( x, y)) 
-        self.cxM = x
-        self.cyM = y
-        self.deltaM = self.deltaM
+        self.moveCenter( x, y)
         #self.viewerMain.setWorldRect() # for PG
-        self.engine.calcMandelbrotSet()
-        self.engine.calcJuliaSet()
+        self.renderService.request( 'M')
+        self.renderService.request( 'J')
         
         return
 
@@ -1391,6 +1722,33 @@ class MBSMainWindow( QMainWindow):
                         ColorParsObj = self.colorPars) 
         return
 
+    def mkTileSizeCb( self, size):
+        def f():
+            self.tileSize = size
+            if self.tiled == "True": 
+                self.engine.calcMandelbrotSet()
+            return 
+        return f
+
+    def mkPrefetchCb( self, policy):
+        def f():
+            self.prefetch = policy
+            return 
+        return f
+
+    def mkPrefetchShareCb( self, share):
+        def f():
+            self.prefetchShare = share
+            return 
+        return f
+
+    def mkDensityCb( self, mode):
+        def f():
+            self.density = mode
+            self.renderService.request( 'M')
+            return 
+        return f
+
     def mkCenterCb( self, name):
         def f():
             #self.logWidget.append( "mkCenter: resetMarker to %s: (%g, %g)" % 
@@ -1451,6 +1809,8 @@ class MBSMainWindow( QMainWindow):
             self.cython = "False"
             self.tiled = "False"
             self.tiledAction.setChecked( self.tiled == "True") 
+            self.marianiSilver = "False"
+            self.marianiSilverAction.setChecked( self.marianiSilver == "True") 
         self.engine.calcMandelbrotSet()
         return 
 
@@ -1472,6 +1832,122 @@ class MBSMainWindow( QMainWindow):
         self.engine.calcMandelbrotSet()
         return 
 
+    @pyqtSlot( bool)
+    def cb_marianiSilver( self, i):
+        if i:
+            self.marianiSilver = "True"
+            self.cython = "True"
+            self.cythonAction.setChecked( self.cython == "True")
+            self.numba = "False" 
+            if numbaOK: 
+                self.numbaAction.setChecked( self.numba == "True") 
+            self.scalar = "False" 
+            self.scalarAction.setChecked( self.scalar == "True") 
+            self.numpy = "False"
+            self.numpyAction.setChecked( self.numpy == "True") 
+        else:
+            self.marianiSilver = "False"
+
+        self.engine.calcMandelbrotSet()
+        return 
+
+    @pyqtSlot( bool)
+    def cb_progressive( self, i):
+        if i:
+            self.progressive = "True"
+        else:
+            self.progressive = "False"
+        return 
+
+    @pyqtSlot( bool)
+    def cb_reusePixels( self, i):
+        if i:
+            self.reusePixels = "True"
+        else:
+            self.reusePixels = "False"
+        return 
+
+    @pyqtSlot( bool)
+    def cb_simd( self, i):
+        if i:
+            self.simd = "True"
+        else:
+            self.simd = "False"
+        return 
+
+    @pyqtSlot( bool)
+    def cb_gBuffer( self, i):
+        if i:
+            self.gBuffer = "True"
+        else:
+            self.gBuffer = "False"
+        return 
+
+    @pyqtSlot( bool)
+    def cb_antiAlias( self, i):
+        if i:
+            self.antiAlias = "True"
+        else:
+            self.antiAlias = "False"
+        return 
+
+    @pyqtSlot( bool)
+    def cb_symmetry( self, i):
+        if i:
+            self.symmetry = "True"
+        else:
+            self.symmetry = "False"
+        return 
+
+    @pyqtSlot( bool)
+    def cb_asyncRender( self, i):
+        if i:
+            self.asyncRender = "True"
+        else:
+            self.asyncRender = "False"
+            self.renderService.cancel()
+        return 
+
+    @pyqtSlot( bool)
+    def cb_autoMaxIter( self, i):
+        if i:
+            self.autoMaxIter = "True"
+        else:
+            self.autoMaxIter = "False"
+        return 
+
+    @pyqtSlot( bool)
+    def cb_resultCache( self, i):
+        if i:
+            self.resultCache = "True"
+        else:
+            self.resultCache = "False"
+        return 
+
+    @pyqtSlot( bool)
+    def cb_diskCache( self, i):
+        if i:
+            self.diskCache = "True"
+        else:
+            self.diskCache = "False"
+        return 
+
+    @pyqtSlot( bool)
+    def cb_float32( self, i):
+        if i:
+            self.float32 = "True"
+        else:
+            self.float32 = "False"
+        return 
+
+    @pyqtSlot( bool)
+    def cb_resumable( self, i):
+        if i:
+            self.resumable = "True"
+        else:
+            self.resumable = "False"
+        return 
+
     @pyqtSlot( bool)
     def cb_numpy( self, i):
         if i:
@@ -1480,6 +1956,8 @@ class MBSMainWindow( QMainWindow):
             self.cythonAction.setChecked( self.cython == "True") 
             self.tiled = "False"
             self.tiledAction.setChecked( self.tiled == "True") 
+            self.marianiSilver = "False"
+            self.marianiSilverAction.setChecked( self.marianiSilver == "True") 
             self.scalar = "False" 
             self.scalarAction.setChecked( self.scalar == "True") 
             self.numba = "False" 
@@ -1489,6 +1967,8 @@ class MBSMainWindow( QMainWindow):
             self.cython = "False"
             self.tiled = "False"
             self.tiledAction.setChecked( self.tiled == "True") 
+            self.marianiSilver = "False"
+            self.marianiSilverAction.setChecked( self.marianiSilver == "True") 
 
         self.engine.calcMandelbrotSet()
         return 
@@ -1502,13 +1982,22 @@ class MBSMainWindow( QMainWindow):
             if cythonOK:
                 self.cythonAction.setChecked( self.cython == "True")
                 self.tiledAction.setChecked( self.cython == "True")
+                self.marianiSilver = "False"
+                self.marianiSilverAction.setChecked( self.marianiSilver == "True")
+            self.scalar = "False" 
+            self.scalarAction.setChecked( self.scalar == "True") 
+            self.numpy = "False"
+            self.numpyAction.setChecked( self.numpy == "True") 
         else:
             self.numba = "False"
-            self.cython = "True"
-            self.tiled = "True"
             if cythonOK:
+                self.cython = "True"
+                self.tiled = "True"
                 self.cythonAction.setChecked( self.cython == "True") 
                 self.tiledAction.setChecked( self.tiled == "True") 
+            else: 
+                self.numpy = "True"
+                self.numpyAction.setChecked( self.numpy == "True") 
 
         self.engine.calcMandelbrotSet()
         return 
@@ -1526,6 +2015,8 @@ class MBSMainWindow( QMainWindow):
                 self.tiled = "False"
                 self.cythonAction.setChecked( self.cython == "True")
                 self.tiledAction.setChecked( self.cython == "True")
+                self.marianiSilver = "False"
+                self.marianiSilverAction.setChecked( self.marianiSilver == "True")
             else: 
                 self.numpy = "True"
             self.numpyAction.setChecked( self.numpy == "True") 
@@ -1536,6 +2027,16 @@ class MBSMainWindow( QMainWindow):
         self.engine.calcMandelbrotSet()
         return 
 
+    @pyqtSlot( bool)
+    def cb_deep( self, i):
+        if i:
+            self.deep = "True" 
+        else:
+            self.deep = "False" 
+
+        self.engine.calcMandelbrotSet()
+        return 
+
     @pyqtSlot( bool)
     def cb_rmColor( self, i):
         if i:
@@ -1622,6 +2123,9 @@ class MBSMainWindow( QMainWindow):
         deltaEnd = self.deltaM
         cxEnd = self.cxM
         cyEnd = self.cyM
+        cxEndStr = mandelbrotDeep.decimalMember( self, 'cxM')
+        cyEndStr = mandelbrotDeep.decimalMember( self, 'cyM')
+        deltaEndStr = mandelbrotDeep.decimalMember( self, 'deltaM')
         cxStart = -0.75
         cyStart = 0.
         self.cxM = cxStart
@@ -1634,16 +2138,27 @@ class MBSMainWindow( QMainWindow):
         
         startTime = time.time()
         
-        frames = int( math.log( deltaEnd/deltaStart)/math.log( self.animationFactor))
+        #
+        # framesPerOctave frames halve delta exactly. Frame i+framesPerOctave
+        # re-uses 1/4 of the pixels of frame i, see FractalEngine.reuseFrame().
+        # The last frame is at deltaEnd
+        #
+        framesPerOctave = max( 1, int( round( math.log( 0.5)/math.log( self.animationFactor))))
+        frames = int( math.ceil( math.log( deltaEnd/deltaStart)/math.log( 0.5)*framesPerOctave)) + 1
         radiusStart = 0.1
         radiusEnd = deltaEnd/5.
         t = np.linspace(0, 1, frames)
         tReverse = np.linspace(1, 0, frames)
         #
         # delta *= 0.05 gives an exponential decay, 
-        # here is the functional expression
-        #
-        delta = deltaStart * np.exp( np.log( deltaEnd/deltaStart) * t)
+        # here is the functional expression, 2**(-1/framesPerOctave) per frame.
+        # Powers of 2 are split off to make the octave ratios exact
+        #
+        delta = np.array( [ deltaStart/2**( i // framesPerOctave) * 
+                            2.**( -( i % framesPerOctave)/float( framesPerOctave)) 
+                            for i in range( frames)])
+        delta = np.maximum( delta, deltaEnd)
+        delta[-1] = deltaEnd
         
         if self.spiral > 0: 
             theta = 2 * np.pi * self.spiral * t
@@ -1686,9 +2201,20 @@ class MBSMainWindow( QMainWindow):
                 self.logWidget.append( "cb_animateZoom: cannot use 50% of width, not in VALUES")
 
         colorIndexOld = self.colorPars.rotateColorMapIndex
+        #
+        # the older frames keep the centre quarter, see FractalEngine.storeFrame()
+        #
+        self.engine.frameHistory = framesPerOctave
+        if framesPerOctave*3*self.widthM**2 > FractalEngine.FRAME_BYTES: 
+            self.logWidget.append( "cb_animateZoom: one octave exceeds FRAME_BYTES, fewer pixels are re-used")
         for i in range( len( cx)):
-            self.cxM = cx[i]
-            self.cyM = cy[i]
+            #
+            # the frames approach the target with the digits of cxEndStr, cyEndStr
+            #
+            self.cxMStr = mandelbrotDeep.addDecimal( cxEndStr, cx[i] - cxEnd)
+            self.cyMStr = mandelbrotDeep.addDecimal( cyEndStr, cy[i] - cyEnd)
+            self.cxM = mandelbrotDeep.decimalToFloat( self.cxMStr)
+            self.cyM = mandelbrotDeep.decimalToFloat( self.cyMStr)
             self.deltaM = delta[i]
             temp = (deltaStart - self.deltaM) / (deltaStart - deltaEnd)
             self.colorPars.vmin = vminStart + temp * (vminEnd - vminStart)
@@ -1700,6 +2226,9 @@ class MBSMainWindow( QMainWindow):
                 self.stopRequested = False
                 self.logWidget.append( "animate: stopped") 
                 break
+        with self.engine.renderLock:
+            self.engine.frameHistory = FractalEngine.FRAME_HISTORY
+            self.engine.frameCache = self.engine.frameCache[-FractalEngine.FRAME_HISTORY:]
         self.widthM = widthMOld
         self.updateGUI()
         self.logWidget.append( "animate: DONE, %g" % 
@@ -1711,6 +2240,10 @@ class MBSMainWindow( QMainWindow):
         self.colorWidget.vmaxSlider.setValue( int( self.colorPars.vmax))
         self.cxM = cxEnd
         self.cyM = cyEnd
+        self.deltaM = deltaEnd
+        self.cxMStr = cxEndStr
+        self.cyMStr = cyEndStr
+        self.deltaMStr = deltaEndStr
         self.engine.calcMandelbrotSet()
         self.app.processEvents()
         self.isAnimating = False
@@ -1719,25 +2252,25 @@ class MBSMainWindow( QMainWindow):
     @pyqtSlot( int)
     def cb_maxIterMCombo( self, i):
         self.maxIterM = int( MAX_ITER_VALUES[i])
-        self.engine.calcMandelbrotSet()
+        self.renderService.request( 'M')
         return
 
     @pyqtSlot( int)
     def cb_maxIterJCombo( self, i):
         self.maxIterJ = int( MAX_ITER_VALUES[i])
-        self.engine.calcJuliaSet()
+        self.renderService.request( 'J')
         return
 
     @pyqtSlot( int)
     def cb_widthMCombo( self, i):
         self.widthM = int( utils.WIDTH_VALUES[i])
-        self.engine.calcMandelbrotSet()
+        self.renderService.request( 'M')
         return
 
     @pyqtSlot( int)
     def cb_widthJCombo( self, i):
         self.widthJ = int( utils.WIDTH_VALUES[i])
-        self.engine.calcMandelbrotSet()
+        self.renderService.request( 'J')
         return
 
     @pyqtSlot( int)
@@ -1803,7 +2336,7 @@ class MBSMainWindow( QMainWindow):
 
         self.viewerJS.resize( int( self.figSizeJ[0]), int( self.figSizeJ[1]))
 
-        self.engine.calcJuliaSet()
+        self.renderService.request( 'J')
 
         return
 
@@ -1814,10 +2347,12 @@ class MBSMainWindow( QMainWindow):
 
     @pyqtSlot()
     def cb_zoomOut( self):
-        self.deltaM *= self.zoom
+        self.deltaMStr = mandelbrotDeep.scaleDecimal( 
+            mandelbrotDeep.decimalMember( self, 'deltaM'), self.zoom)
+        self.deltaM = mandelbrotDeep.decimalToFloat( self.deltaMStr, mandelbrotDeep.DELTA_MIN)
         if self.deltaM > 3.:
             self.cb_reset()
-        self.engine.calcMandelbrotSet()
+        self.renderService.request( 'M')
         return
 
     @pyqtSlot()
@@ -1826,11 +2361,14 @@ class MBSMainWindow( QMainWindow):
         self.cxM = -0.75
         self.cyM = 0.
         self.deltaM = 3.
+        self.cxMStr = None
+        self.cyMStr = None
+        self.deltaMStr = None
         self.cxJ = 0.
         self.cyJ = 0.
         self.deltaJ = 3.
         #self.viewerMain.setWorldRect() # for PG
-        self.engine.calcMandelbrotSet()
+        self.renderService.request( 'M')
 
         return
 
@@ -1912,6 +2450,7 @@ class MBSMainWindow( QMainWindow):
     @pyqtSlot()
     def cb_stop( self):
         self.stopRequested = True
+        self.renderService.cancel()
         return
 
     @pyqtSlot()
@@ -1936,6 +2475,8 @@ class MBSMainWindow( QMainWindow):
 
     @pyqtSlot()
     def cb_close( self):
+        if self.resultCache == "True" and self.diskCache == "True": 
+            self.engine.resultCache.flush()
         self.viewerMain.close()
         self.viewerJS.close()
         self.viewerDebugColoring.close()
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Buddhabrot and Nebulabrot, the density of the escaping orbits
+
+  - the samples c are drawn from an importance map: the c-plane
+    |x|, |y| < BUDDHA_RADIUS is divided into BUDDHA_GRID x BUDDHA_GRID
+    cells, cell k is chosen with probability p[k], c is uniform in the
+    cell. Each orbit point adds the weight 1/( nCells p[k]), the
+    density is the same as with uniform samples, with less noise
+  - pilot: BUDDHA_PILOT uniform samples per cell. p[k] follows the mean
+    number of orbit points per sample of cell k that land in the view,
+    the map is refined after every batch. Zoomed views: the samples
+    concentrate on the few cells whose orbits reach the view
+  - if no pilot orbit reaches the view, a coarse compute_mandelbrot
+    pass over the cell centers gives the map, the escape counts, long
+    orbits start close to the boundary
+  - BUDDHA_UNIFORM of the samples are uniform, every cell keeps p > 0
+  - the kernels accumulate per thread, the planes are merged after
+    every batch, see mandelbrotCython.compute_buddhabrot. The planes
+    are limited to BUDDHA_PLANES_BYTES, large views run on fewer threads
+
+  render = Buddhabrot( xmin, ymin, dx, width, channelIters( maxIter, nebula))
+  render.pilot( cancel)
+  while render.nSamples < BUDDHA_SAMPLES:
+      render.batch( cancel)
+  image = render.image()     # ( width, width, nChannels), 0. ... 1.
+
+pixel ( i, j) is at ( xmin + dx*j, ymin + dx*i), as dataMandelbrotSet
+"""
+import sys
+sys.path.append( "./cython")
+try:
+    import mandelbrotCython
+    cythonOK = True
+except:
+    cythonOK = False
+try:
+    import mandelbrotNumba
+    numbaOK = True
+except:
+    numbaOK = False
+import numpy as np
+
+DENSITY_VALUES = [ 'Off', 'Buddhabrot', 'Nebulabrot']
+#
+# the importance map
+#
+BUDDHA_RADIUS = 2.
+BUDDHA_GRID = 256
+BUDDHA_PILOT = 4
+BUDDHA_UNIFORM = 0.1
+#
+# samples per batch and per render, the image is shown after each batch
+#
+BUDDHA_BATCH = 2**16
+BUDDHA_SAMPLES = 2**21
+#
+# Nebulabrot: red, green, blue count the orbits that escape before
+# maxIter*ratio, at least NEBULA_MIN_ITER
+#
+NEBULA_RATIOS = [ 1., 0.1, 0.01]
+NEBULA_MIN_ITER = 16
+#
+# the tone mapping: the BUDDHA_QUANTILE of the non-zero pixels is white,
+# gamma
+#
+BUDDHA_QUANTILE = 0.999
+BUDDHA_GAMMA = 0.5
+#
+# the per-thread planes, float32, e.g. Nebulabrot at 1200: 17 MB per thread
+#
+BUDDHA_PLANES_BYTES = 128*2**20
+
+def channelIters( maxIter, nebula = False):
+    """
+    the maxIter of the channels, int32
+    """
+    if not nebula:
+        return np.array( [ maxIter], dtype=np.int32)
+    return np.array( [ max( int( maxIter*r), NEBULA_MIN_ITER) for r in NEBULA_RATIOS],
+                     dtype=np.int32)
+
+class Buddhabrot( object):
+    """
+    the density of one view, accumulated in batches
+      nSamples: the samples so far, nHits: those whose orbits reached the view
+      useCython: otherwise mandelbrotNumba, nPlanes: one per thread,
+        stats_threads(), statsThreads(), at most BUDDHA_PLANES_BYTES, 
+        the kernels run on nPlanes threads
+    """
+    def __init__( self, xmin, ymin, dx, width, channelIter, useCython = True, nPlanes = 1):
+        self.xmin = xmin
+        self.ymin = ymin
+        self.dx = dx
+        self.width = width
+        self.channelIter = channelIter
+        self.useCython = useCython
+        planeBytes = 4*len( channelIter)*width*width
+        self.nPlanes = max( 1, min( nPlanes, BUDDHA_PLANES_BYTES//planeBytes))
+        self.planes = np.zeros(( self.nPlanes, len( channelIter), width, width), dtype=np.float32)
+        self.density = np.zeros(( len( channelIter), width, width), dtype=np.float64)
+        self.cell = 2.*BUDDHA_RADIUS/BUDDHA_GRID
+        self.nCells = BUDDHA_GRID*BUDDHA_GRID
+        self.cellHits = np.zeros( self.nCells, dtype=np.float64)
+        self.cellSamples = np.zeros( self.nCells, dtype=np.float64)
+        self.prob = None
+        self.nSamples = 0
+        self.nHits = 0
+        self.rng = np.random.default_rng( 0)
+        return
+
+    def kernel( self, cr, ci, weight, cancel):
+        """
+        returns the orbit points in the view per sample, the planes are
+          added to density
+        """
+        hits = np.zeros( len( cr), dtype=np.int32)
+        self.planes.fill( 0.)
+        if self.useCython:
+            mandelbrotCython.compute_buddhabrot( cr, ci, weight, self.xmin, self.ymin, self.dx,
+                                                 self.channelIter, self.planes, hits,
+                                                 num_threads = self.nPlanes, cancel = cancel)
+        else:
+            mandelbrotNumba.setNumThreads( self.nPlanes)
+            try:
+                mandelbrotNumba.compute_buddhabrot( cr, ci, weight, self.xmin, self.ymin, self.dx,
+                                                    self.channelIter, self.planes, hits,
+                                                    cancel = cancel)
+            finally:
+                mandelbrotNumba.setNumThreads()
+        for plane in self.planes:
+            self.density += plane
+        self.nSamples += len( cr)
+        self.nHits += np.count_nonzero( hits)
+        return hits
+
+    def samples( self, cells):
+        """
+        c uniform in the cells
+        """
+        x = -BUDDHA_RADIUS + self.cell*( cells % BUDDHA_GRID + self.rng.random( len( cells)))
+        y = -BUDDHA_RADIUS + self.cell*( cells // BUDDHA_GRID + self.rng.random( len( cells)))
+        return ( x, y)
+
+    def pilot( self, cancel = None):
+        """
+        BUDDHA_PILOT uniform samples per cell, the first importance map
+        """
+        cells = np.repeat( np.arange( self.nCells), BUDDHA_PILOT)
+        ( cr, ci) = self.samples( cells)
+        hits = self.kernel( cr, ci, np.ones( len( cells)), cancel)
+        self.update( cells, hits)
+        if self.cellHits.sum() == 0:
+            self.prob = self.boundaryMap()
+        return
+
+    def update( self, cells, hits):
+        """
+        p[k] ~ the mean hits per sample of cell k, mixed with BUDDHA_UNIFORM
+        """
+        self.cellHits += np.bincount( cells, hits, minlength = self.nCells)
+        self.cellSamples += np.bincount( cells, minlength = self.nCells)
+        score = self.cellHits/np.maximum( self.cellSamples, 1.)
+        if score.sum() == 0:
+            return
+        self.prob = ( 1. - BUDDHA_UNIFORM)*score/score.sum() + BUDDHA_UNIFORM/self.nCells
+        return
+
+    def boundaryMap( self):
+        """
+        the escape counts of the cell centers, 0 for the interior
+        """
+        maxIter = int( self.channelIter.max())
+        todo = np.ones(( BUDDHA_GRID, BUDDHA_GRID), dtype=np.uint8)
+        escapeCount = np.zeros(( BUDDHA_GRID, BUDDHA_GRID), dtype=np.int32)
+        zAbs = np.zeros(( BUDDHA_GRID, BUDDHA_GRID), dtype=np.float64)
+        x0 = -BUDDHA_RADIUS + self.cell/2.
+        if self.useCython:
+            mandelbrotCython.compute_mandelbrot_masked( x0, self.cell, x0, self.cell, 0, 0, maxIter, 2.,
+                                                        todo, escapeCount, zAbs)
+        else:
+            mandelbrotNumba.compute_mandelbrot_masked( x0, self.cell, x0, self.cell, 0, 0, maxIter, 2.,
+                                                       todo, escapeCount, zAbs)
+        score = np.where( escapeCount < maxIter, escapeCount, 0).astype( np.float64).ravel()
+        if score.sum() == 0:
+            return np.full( self.nCells, 1./self.nCells)
+        return ( 1. - BUDDHA_UNIFORM)*score/score.sum() + BUDDHA_UNIFORM/self.nCells
+
+    def batch( self, cancel = None, n = BUDDHA_BATCH):
+        """
+        n samples from the importance map, the map is refined
+        """
+        cells = self.rng.choice( self.nCells, size = n, p = self.prob)
+        ( cr, ci) = self.samples( cells)
+        hits = self.kernel( cr, ci, 1./( self.nCells*self.prob[ cells]), cancel)
+        self.update( cells, hits)
+        return
+
+    def image( self):
+        """
+        ( width, width, nChannels), the channels are tone mapped to 0. ... 1.
+        """
+        output = np.zeros(( self.width, self.width, len( self.channelIter)), dtype=np.float64)
+        for ( l, temp) in enumerate( self.density):
+            if not np.any( temp > 0.):
+                continue
+            white = np.quantile( temp[ temp > 0.], BUDDHA_QUANTILE)
+            output[:, :, l] = np.clip( temp/white, 0., 1.)**BUDDHA_GAMMA
+        return output
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+the raw results of rendered views, two levels
+
+  - memory: least recently used entries, the size is limited by
+    MEMORY_BYTES, evicted entries are spilled to the disk by a writer
+    thread, the render does not wait for the compression
+  - disk: one compressed .npz file per entry in CACHE_DIR, the size is
+    limited by DISK_BYTES, the files with the oldest access time are
+    removed. A disk hit moves the entry to the memory. Opt-in, the
+    default diskBytes is 0, the memory tier only
+
+  cache = ResultCache()
+  entry = cache.get( key)       # None or { name: np.ndarray}
+  entry = cache.get( key, near) # near( other): other matches key, memory only
+  cache.put( key, entry)        # the arrays are copied
+  cache.put( key, entry, copy = False) # the cache owns the arrays, release()
+  cache.flush()                 # the recent entries go to the disk
+
+key: a tuple of numbers and strings, see FractalEngine.resultKey(),
+  the file name is the hash of repr( key)
+"""
+import numpy as np
+import collections
+import hashlib
+import os
+import queue
+import threading
+#
+# the size limits of the tiers, bytes
+#
+MEMORY_BYTES = 256*2**20
+DISK_BYTES = 2*2**30
+#
+# at exit the most recent entries up to FLUSH_BYTES are written,
+# the compression takes ~50 ms/MB
+#
+FLUSH_BYTES = 32*2**20
+CACHE_DIR = os.path.join( os.path.expanduser( "~"), ".cache", "mandelbrot")
+
+class ResultCache( object):
+    """
+    hits, diskHits, misses: counters, see info()
+      diskBytes: 0, no disk tier, e.g. DISK_BYTES
+      release: called with the entries dropped from the memory tier and 
+        not spilled, in the thread of put(), e.g. the arrays go back to 
+        a buffer pool
+    """
+    def __init__( self, memoryBytes = MEMORY_BYTES, diskBytes = 0, cacheDir = CACHE_DIR, 
+                  release = None):
+        self.memoryBytes = memoryBytes
+        self.release = release
+        self.diskBytes = diskBytes
+        self.cacheDir = cacheDir
+        self.memory = collections.OrderedDict()
+        self.nBytes = 0
+        self.hits = 0
+        self.diskHits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        self.spilling = {}
+        self.queue = queue.Queue()
+        self.writer = threading.Thread( target = self.write, daemon = True)
+        self.writer.start()
+        return
+
+    def get( self, key, near = None):
+        """
+        returns the entry of key or None, the arrays must not be modified.
+          near: a function of a key, if there is no entry of key, the
+          most recent memory entry whose key is near is returned
+        """
+        with self.lock:
+            entry = self.memory.get( key)
+            if entry is None and near is not None:
+                for temp in reversed( self.memory.keys()):
+                    if near( temp):
+                        ( key, entry) = ( temp, self.memory[ temp])
+                        break
+            if entry is not None:
+                self.memory.move_to_end( key)
+                self.hits += 1
+                return entry
+            entry = self.spilling.get( key)
+        #
+        # the decompression does not block put() and the writer thread
+        #
+        if entry is None:
+            entry = self.readDisk( key)
+        with self.lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.diskHits += 1
+            if key in self.memory:
+                return self.memory[ key]
+            self.insert( key, entry)
+            return entry
+
+    def contains( self, key):
+        """
+        True, if key is in the memory or on the disk, the counters are not changed. 
+          The files are ignored without the disk tier
+        """
+        with self.lock:
+            return key in self.memory or key in self.spilling or \
+                ( self.diskBytes > 0 and os.path.exists( self.fileName( key)))
+
+    def put( self, key, entry, copy = True):
+        """
+        returns True, if entry has been inserted. copy False: the arrays 
+          are not copied, they must not be modified afterwards
+        """
+        with self.lock:
+            if key in self.memory:
+                return False
+            if copy:
+                entry = { name: np.array( value) for ( name, value) in entry.items()}
+            self.insert( key, entry)
+        return True
+
+    def insert( self, key, entry):
+        self.memory[ key] = entry
+        self.nBytes += entrySize( entry)
+        while self.nBytes > self.memoryBytes and len( self.memory) > 1:
+            ( temp, evicted) = self.memory.popitem( last = False)
+            self.nBytes -= entrySize( evicted)
+            if self.diskBytes > 0:
+                self.spilling[ temp] = evicted
+                self.queue.put( temp)
+            elif self.release is not None:
+                self.release( evicted)
+        return
+
+    def write( self):
+        """
+        the writer thread, spilled entries stay readable until written
+        """
+        while True:
+            key = self.queue.get()
+            with self.lock:
+                entry = self.spilling.get( key)
+            if entry is not None:
+                self.writeDisk( key, entry)
+            with self.lock:
+                if entry is not None and self.spilling.get( key) is entry:
+                    del self.spilling[ key]
+            self.queue.task_done()
+
+    def flush( self, nBytes = FLUSH_BYTES):
+        """
+        at exit, the most recent memory entries, up to nBytes, are
+          written to the disk
+        """
+        self.queue.join()
+        with self.lock:
+            for ( key, entry) in reversed( self.memory.items()):
+                nBytes -= entrySize( entry)
+                if nBytes < 0:
+                    break
+                self.writeDisk( key, entry)
+        return
+
+    def fileName( self, key):
+        return os.path.join( self.cacheDir,
+                             hashlib.sha1( repr( key).encode()).hexdigest() + ".npz")
+
+    def readDisk( self, key):
+        """
+        the entry of the file of key or None, called without the lock
+        """
+        if self.diskBytes <= 0:
+            return None
+        fName = self.fileName( key)
+        try:
+            with np.load( fName) as data:
+                entry = { name: data[ name] for name in data.files}
+            if entry.pop( 'key', None) != repr( key):
+                return None
+            os.utime( fName)
+        except Exception:
+            return None
+        return entry
+
+    def writeDisk( self, key, entry):
+        """
+        the files with the oldest access times are removed, if the
+          size exceeds diskBytes
+        """
+        if self.diskBytes <= 0:
+            return
+        fName = self.fileName( key)
+        if os.path.exists( fName):
+            return
+        try:
+            os.makedirs( self.cacheDir, exist_ok = True)
+            np.savez_compressed( fName, key = repr( key), **entry)
+        except Exception as e:
+            print( "ResultCache.writeDisk: %s" % repr( e))
+            return
+        files = []
+        for name in os.listdir( self.cacheDir):
+            if not name.endswith( ".npz"):
+                continue
+            temp = os.stat( os.path.join( self.cacheDir, name))
+            files.append( ( temp.st_mtime, temp.st_size, name))
+        total = sum( temp[1] for temp in files)
+        for ( mtime, size, name) in sorted( files):
+            if total <= self.diskBytes:
+                break
+            os.remove( os.path.join( self.cacheDir, name))
+            total -= size
+        return
+
+    def info( self):
+        """
+        for debugSpeed
+        """
+        return "cache %d hits (%d disk), %d misses, %.1f MB" % \
+            ( self.hits, self.diskHits, self.misses, self.nBytes/2.**20)
+
+def entrySize( entry):
+    return sum( value.nbytes for value in entry.values())
@@ -0,0 +1,432 @@
+#!/usr/bin/env python3
+"""
+perturbation theory for deep zooms
+
+  - one high-precision reference orbit Z_n is calculated at the
+    view center, fixed-point arithmetic with (gmpy2) integers
+  - every pixel c = C + dc is iterated as a float64 delta
+      dz_{n+1} = (2 Z_n + dz_n) dz_n + dc
+  - series approximation: dz_n = A_n dc + B_n dc^2 + C_n dc^3
+    allows us to skip the first iterations
+  - glitches are detected and removed by rebasing: if |Z_m + dz| < |dz|
+    or the reference orbit ends, dz becomes Z_m + dz and m starts at 0
+  - for zooms beyond 1e-290 the deltas are stored with an extended
+    exponent (FloatExp, mantissa * 2**e) until they are representable
+    as float64
+
+cxM, cyM, deltaM are doubles in MBSMainWindow. Deep places need more
+digits, therefore the decimal strings cxMStr, cyMStr, deltaMStr
+accompany the doubles. They are refinements of the doubles as long
+as float( cxMStr) == cxM.
+"""
+import sys
+sys.path.append( "./cython")
+try:
+    import mandelbrotCython
+    cythonOK = True
+except:
+    cythonOK = False
+try:
+    from gmpy2 import mpz
+except:
+    mpz = int
+
+import math
+from decimal import Decimal, localcontext
+from fractions import Fraction
+import numpy as np
+
+#
+# deltaM below DELTA_MIN cannot be stored as double, the decimal
+# string is the only source of truth
+#
+DELTA_MIN = 1e-300
+#
+# the series approximation is valid as long as the 3rd order term
+# is small compared to the 1st order term
+#
+SA_TOLERANCE = 1e-12
+#
+# deltas with exponents below FE_MIN_EXP are handled by FloatExp,
+# FE_DOUBLE_EXP: switch back to float64
+#
+FE_MIN_EXP = -960
+FE_DOUBLE_EXP = -900
+FE_ZERO_EXP = -(1 << 40)
+#
+# extra bits for the reference orbit
+#
+GUARD_BITS = 64
+#
+# these members of mandelbrot.METADATA_MEMBERS are written as decimal strings
+#
+DECIMAL_MEMBERS = [ 'cxM', 'cyM', 'deltaM']
+
+#
+# === decimal strings
+#
+def syncDecimal( value, decStr, lower = None):
+    """
+    returns decStr, if it is a refinement of value, repr( value) otherwise.
+    Use lower = DELTA_MIN for deltaM.
+    """
+    if decStr is not None:
+        if decimalToFloat( decStr, lower) == value:
+            return decStr
+    return repr( float( value))
+
+def decimalMember( MBSObj, name):
+    """
+    the decimal string of MBSObj.cxM, MBSObj.cyM or MBSObj.deltaM
+    """
+    lower = None
+    if name == 'deltaM':
+        lower = DELTA_MIN
+    return syncDecimal( getattr( MBSObj, name), getattr( MBSObj, name + 'Str'), lower)
+
+def decimalToFloat( decStr, lower = None):
+    temp = float( decStr)
+    if lower is not None and temp < lower:
+        temp = lower
+    return temp
+
+def decimalToDD( decStr):
+    """
+    double-double ( hi, lo), hi + lo approximates decStr to ~32 digits,
+    used by compute_mandelbrot_dd
+    """
+    f = Fraction( Decimal( decStr))
+    hi = float( f)
+    lo = float( f - Fraction( hi))
+    return ( hi, lo)
+
+def addDecimal( decStr, offset):
+    """
+    decStr + offset, offset is a double
+    """
+    d = Decimal( decStr)
+    with localcontext() as ctx:
+        ctx.prec = max( 40, digitsNeeded( decStr) + 20)
+        temp = d + Decimal( repr( offset))
+    return str( temp)
+
+def addPixelsDecimal( decStr, deltaStr, nPixels, width):
+    """
+    decStr + deltaStr*nPixels/width, e.g. a click nPixels from the center, 
+      all in decimal, the offset is not limited by the float64 spacing at decStr
+    """
+    d = Decimal( decStr)
+    with localcontext() as ctx:
+        ctx.prec = max( 40, digitsNeeded( decStr) + 20, digitsNeeded( deltaStr) + 20)
+        temp = d + Decimal( deltaStr) * nPixels / width
+    return str( temp)
+
+def scaleDecimal( decStr, factor):
+    """
+    decStr*factor, e.g. deltaM*zoom
+    """
+    d = Decimal( decStr)
+    with localcontext() as ctx:
+        ctx.prec = max( 40, digitsNeeded( decStr) + 20)
+        temp = d * Decimal( repr( factor))
+    return str( temp)
+
+def divideDecimal( decStr, divisor):
+    """
+    decStr/divisor, e.g. deltaM/zoom
+    """
+    d = Decimal( decStr)
+    with localcontext() as ctx:
+        ctx.prec = max( 40, digitsNeeded( decStr) + 20)
+        temp = d / Decimal( repr( divisor))
+    return str( temp)
+
+def digitsNeeded( decStr):
+    d = Decimal( decStr)
+    if d == 0:
+        return 0
+    return abs( d.adjusted()) + len( d.as_tuple().digits)
+
+def log2Decimal( decStr):
+    """
+    floor( log2( |decStr|)), works far below 1e-308
+    """
+    f = abs( Fraction( Decimal( decStr)))
+    return f.numerator.bit_length() - f.denominator.bit_length()
+
+def toFixed( decStr, bits):
+    """
+    decimal string to a fixed-point integer, value * 2**bits
+    """
+    f = Fraction( Decimal( decStr))
+    return mpz( ( f.numerator << bits) // f.denominator)
+
+def fixedToFloat( x, bits):
+    x = int( x)
+    s = max( 0, bits - 62)
+    return math.ldexp( float( x >> s), s - bits)
+#
+# === the reference orbit
+#
+def referenceOrbit( cxStr, cyStr, maxIter, bits):
+    """
+    Z_0 = 0, Z_{n+1} = Z_n**2 + C in fixed-point arithmetic,
+    the orbit stops after the first Z_n with |Z_n| > 2,
+    returns Z as complex128 array, Z[-1] is the last element
+    """
+    cx = toFixed( cxStr, bits)
+    cy = toFixed( cyStr, bits)
+    four = mpz( 4) << (2*bits)
+
+    Z = np.zeros( maxIter + 1, dtype=np.complex128)
+    x = mpz( 0)
+    y = mpz( 0)
+    n = 0
+    while n < maxIter:
+        x2 = x*x
+        y2 = y*y
+        y = ((x*y) >> (bits - 1)) + cy
+        x = ((x2 - y2) >> bits) + cx
+        n += 1
+        Z[n] = complex( fixedToFloat( x, bits), fixedToFloat( y, bits))
+        if x*x + y*y > four:
+            break
+    return Z[:n+1]
+#
+# === FloatExp, extended exponent
+#
+def _ldexpc( m, k):
+    return complex( math.ldexp( m.real, k), math.ldexp( m.imag, k))
+
+class FloatExp( object):
+    """
+    m * 2**e, m complex, 0.5 <= max( |m.real|, |m.imag|) < 1
+    """
+    __slots__ = ( 'm', 'e')
+
+    def __init__( self, m, e = 0):
+        self.m = complex( m)
+        self.e = int( e)
+        self.normalize()
+
+    def normalize( self):
+        a = max( abs( self.m.real), abs( self.m.imag))
+        if a == 0.:
+            self.e = FE_ZERO_EXP
+            return self
+        k = math.frexp( a)[1]
+        self.m = _ldexpc( self.m, -k)
+        self.e += k
+        return self
+
+    def __mul__( self, other):
+        if isinstance( other, FloatExp):
+            return FloatExp( self.m*other.m, self.e + other.e)
+        return FloatExp( self.m*other, self.e)
+
+    def __add__( self, other):
+        e = max( self.e, other.e)
+        return FloatExp( _ldexpc( self.m, max( self.e - e, -2000)) +
+                         _ldexpc( other.m, max( other.e - e, -2000)), e)
+
+    def log2abs( self):
+        if self.m == 0.:
+            return -math.inf
+        return math.log2( abs( self.m)) + self.e
+
+    def toComplex( self):
+        return _ldexpc( self.m, self.e)
+#
+# array versions, a FloatExp array is a tuple ( m, e)
+#
+def _ldexpArr( m, k):
+    k = np.clip( k, -2200, 2200).astype( np.int32)
+    return np.ldexp( m.real, k) + 1j*np.ldexp( m.imag, k)
+
+def _feNorm( m, e):
+    a = np.maximum( np.abs( m.real), np.abs( m.imag))
+    k = np.frexp( a)[1]
+    m = _ldexpArr( m, -k)
+    e = np.where( a == 0., FE_ZERO_EXP, e + k)
+    return m, e
+
+def _feMul( a, b):
+    return _feNorm( a[0]*b[0], a[1] + b[1])
+
+def _feAdd( a, b):
+    e = np.maximum( a[1], b[1])
+    return _feNorm( _ldexpArr( a[0], a[1] - e) + _ldexpArr( b[0], b[1] - e), e)
+
+#
+# === series approximation
+#
+def seriesApproximation( Z, er, maxIter):
+    """
+    coefficients of dz_n = A_n dc + B_n dc^2 + C_n dc^3, scaled by the
+    max. delta r = 2**er:
+      alpha = A r, beta = B r^2, gamma = C r^3,
+      dz_n = alpha dc' + beta dc'^2 + gamma dc'^3, dc' = dc/r, |dc'| <= 1
+
+    returns ( skip, alpha, beta, gamma), FloatExp objects, if er < FE_MIN_EXP
+    """
+    refLast = len( Z) - 1
+    nMax = min( refLast - 1, maxIter - 1)
+
+    if er < FE_MIN_EXP:
+        r = FloatExp( 1., er)
+        alpha = FloatExp( 0.)
+        beta = FloatExp( 0.)
+        gamma = FloatExp( 0.)
+        logTol = math.log2( SA_TOLERANCE)
+        n = 0
+        while n < nMax:
+            twoZ = 2.*Z[n]
+            alphaNew = alpha*twoZ + r
+            betaNew = beta*twoZ + alpha*alpha
+            gammaNew = gamma*twoZ + alpha*beta*2.
+            if gammaNew.log2abs() > logTol + alphaNew.log2abs():
+                break
+            alpha, beta, gamma = alphaNew, betaNew, gammaNew
+            n += 1
+        return n, alpha, beta, gamma
+
+    r = math.ldexp( 1., er)
+    alpha = 0j
+    beta = 0j
+    gamma = 0j
+    n = 0
+    while n < nMax:
+        twoZ = 2.*Z[n]
+        alphaNew = twoZ*alpha + r
+        betaNew = twoZ*beta + alpha*alpha
+        gammaNew = twoZ*gamma + 2.*alpha*beta
+        if abs( gammaNew) > SA_TOLERANCE*abs( alphaNew):
+            break
+        alpha, beta, gamma = alphaNew, betaNew, gammaNew
+        n += 1
+    return n, alpha, beta, gamma
+
+#
+# === the per-pixel iteration
+#
+def perturbationNumpy( Z, dc, dz, n, maxIter, horizon):
+    """
+    dc, dz: flat complex128 arrays, all pixels start at iteration n,
+    reference index m == n
+    returns escapeCount (int32), zAbs
+    """
+    refLast = len( Z) - 1
+    horizon2 = horizon*horizon
+    escapeCount = np.full( dc.shape, maxIter, dtype=np.int32)
+    zAbs = np.zeros( dc.shape, dtype=np.float64)
+    idx = np.arange( dc.size)
+    m = np.full( dc.shape, n, dtype=np.int64)
+    it = n
+    rebases = 0
+
+    if n == refLast:
+        dz = Z[m] + dz
+        m[:] = 0
+
+    while idx.size > 0 and it < maxIter:
+        dz = (2.*Z[m] + dz)*dz + dc
+        m += 1
+        it += 1
+        z = Z[m] + dz
+        z2 = z.real*z.real + z.imag*z.imag
+        escaped = z2 >= horizon2
+        escapeCount[ idx[ escaped]] = it
+        zAbs[ idx[ escaped]] = z2[ escaped]
+        #
+        # glitch detection, rebasing
+        #
+        rebase = (z2 < dz.real*dz.real + dz.imag*dz.imag) | (m == refLast)
+        rebase &= ~escaped
+        if rebase.any():
+            rebases += int( rebase.sum())
+            dz = np.where( rebase, z, dz)
+            m[ rebase] = 0
+        #
+        # compact the active set
+        #
+        if escaped.any():
+            keep = ~escaped
+            idx = idx[ keep]
+            dz = dz[ keep]
+            dc = dc[ keep]
+            m = m[ keep]
+            z2 = z2[ keep]
+    zAbs[ idx] = z2 if it > n else 0.
+    return escapeCount, np.sqrt( zAbs), rebases
+
+def floatExpPhase( Z, dcS, er, skip, coeffs, maxIter):
+    """
+    dc = dcS * 2**er underflows float64. dz is iterated with an
+    extended exponent until it is representable.
+    returns dz, complex128, and the iteration number
+    """
+    refLast = len( Z) - 1
+    alpha, beta, gamma = coeffs
+    ones = np.ones( dcS.shape, dtype=np.complex128)
+    dz = ( np.zeros( dcS.shape, dtype=np.complex128),
+           np.full( dcS.shape, FE_ZERO_EXP, dtype=np.int64))
+    for coeff, power in ( ( alpha, 1), ( beta, 2), ( gamma, 3)):
+        if coeff.m == 0.:
+            continue
+        term = _feNorm( coeff.m*dcS**power, np.full( dcS.shape, coeff.e, dtype=np.int64))
+        dz = _feAdd( dz, term)
+    dc = _feNorm( dcS*ones, np.full( dcS.shape, er, dtype=np.int64))
+
+    n = skip
+    while n < refLast and n < maxIter:
+        if dz[1].max() > FE_DOUBLE_EXP:
+            break
+        t = _feNorm( dz[0]*( 2.*Z[n]), dz[1])
+        t = _feAdd( t, _feMul( dz, dz))
+        dz = _feAdd( t, dc)
+        n += 1
+    return _ldexpArr( dz[0], dz[1]), n
+
+def computeMandelbrotDeep( cxStr, cyStr, deltaStr, width, maxIter, horizon, useCython = True):
+    """
+    returns escapeCount (int32, width x width), zAbs, info (hsh)
+    """
+    #
+    # pixel (i, j): c = C + dc, dc = ( -delta/2 + j*delta/width, -delta/2 + i*delta/width)
+    # r = 2**er >= delta > max |dc|
+    #
+    er = log2Decimal( deltaStr) + 1
+    spacing = log2Decimal( deltaStr) - int( math.log2( width))
+    bits = max( 64, -spacing + GUARD_BITS)
+    ds = float( Fraction( Decimal( deltaStr)) / Fraction( 2)**er)
+
+    Z = referenceOrbit( cxStr, cyStr, maxIter, bits)
+    skip, alpha, beta, gamma = seriesApproximation( Z, er, maxIter)
+
+    u = ds*( -0.5 + np.arange( width, dtype=np.float64)/width)
+    info = { 'refLen': len( Z), 'skip': skip, 'bits': bits, 'floatExp': er < FE_MIN_EXP,
+             'cython': False, 'rebases': 0}
+
+    if er < FE_MIN_EXP:
+        dcS = ( u[None,:] + 1j*u[:,None]).ravel()
+        dz, n = floatExpPhase( Z, dcS, er, skip, ( alpha, beta, gamma), maxIter)
+        dc = _ldexpArr( dcS, np.full( dcS.shape, er, dtype=np.int64))
+        ( escapeCount, zAbs, info[ 'rebases']) = perturbationNumpy( Z, dc, dz, n, maxIter, horizon)
+        return escapeCount.reshape( width, width), zAbs.reshape( width, width), info
+
+    if useCython and cythonOK:
+        info[ 'cython'] = True
+        r = math.ldexp( 1., er)
+        ( escapeCount, zAbs) = mandelbrotCython.compute_perturbation(
+            width, width,
+            u[0]*r, u[0]*r, ds*r/width,
+            u[0], ds/width,
+            np.ascontiguousarray( Z.real), np.ascontiguousarray( Z.imag),
+            skip, alpha, beta, gamma, maxIter, horizon)
+        return escapeCount, zAbs, info
+
+    dcS = ( u[None,:] + 1j*u[:,None]).ravel()
+    dz = ((gamma*dcS + beta)*dcS + alpha)*dcS
+    dc = dcS*math.ldexp( 1., er)
+    ( escapeCount, zAbs, info[ 'rebases']) = perturbationNumpy( Z, dc, dz, skip, maxIter, horizon)
+    return escapeCount.reshape( width, width), zAbs.reshape( width, width), info
@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+Numba CPU kernels, the fallback if the Cython extension is not built
+
+  - @njit( parallel = True, fastmath = True, cache = True), the rows
+    are distributed by prange, the compiled code is cached in
+    __pycache__, the first call of a session loads it from there.
+    nogil: the GUI thread runs while the RenderService renders
+  - the same algorithms as the Cython kernels: cardioid and bulb
+    culling, Brent's periodicity check, see mandelbrotCython.pyx
+  - the results follow the Cython conventions, escape counts (int32),
+    max_iter for interior pixels, zAbs is |z|, 0. for culled and
+    periodic pixels
+  - stats: the iteration statistics, per thread, the layout of
+    mandelbrotCython.stats_add(), statsThreads() rows
+  - compute_buddhabrot: the orbit density, one histogram per thread,
+    statsThreads() planes
+  - cancel: None or a one-element int32 array, the kernels poll it in
+    the prange loops, see FractalEngine.startRender()
+
+pixel ( i, j) is at ( xmin + dx*( j0 + j), ymin + dy*( i0 + i))
+"""
+import numpy as np
+import numba
+from numba import njit, prange
+#
+# periodicity: eps = PERIODICITY_EPS * pixel spacing, see mandelbrotCython
+#
+PERIODICITY_EPS = 1e-3
+STATS_SIZE = 34
+
+@njit( cache = True)
+def cancelled( cancel):
+    return cancel is not None and cancel[ 0] != 0
+
+@njit( fastmath = True, cache = True)
+def inCardioid( x, y):
+    xm = x - 0.25
+    q = xm * xm + y * y
+    return q * ( q + xm) < 0.25 * y * y
+
+@njit( fastmath = True, cache = True)
+def inBulb( x, y):
+    xp = x + 1.0
+    return xp * xp + y * y < 0.0625
+
+@njit( fastmath = True, cache = True)
+def mandelPixel( x, y, maxIter, horizon2, eps2):
+    """
+    returns ( escape count, |z|^2) of c = x + i y
+    """
+    if inBulb( x, y) or inCardioid( x, y):
+        return ( maxIter, 0.)
+    zx = 0.
+    zy = 0.
+    zx2 = 0.
+    zy2 = 0.
+    ckx = 0.
+    cky = 0.
+    lam = 0
+    power = 1
+    it = 0
+    while zx2 + zy2 < horizon2 and it < maxIter:
+        zy = 2.0 * zx * zy + y
+        zx = zx2 - zy2 + x
+        zx2 = zx * zx
+        zy2 = zy * zy
+        it += 1
+        if eps2 > 0.:
+            lam += 1
+            if ( zx - ckx) * ( zx - ckx) + ( zy - cky) * ( zy - cky) < eps2:
+                return ( maxIter, 0.)
+            if lam == power:
+                ckx = zx
+                cky = zy
+                power *= 2
+                lam = 0
+    return ( it, zx2 + zy2)
+
+@njit( fastmath = True, cache = True)
+def statsAdd( s, it, maxIter, z2):
+    """
+    s: the row of the thread, see mandelbrotCython.stats_add
+    """
+    if it < maxIter:
+        s[ 0] += 1
+        b = 0
+        while it > 0:
+            it >>= 1
+            b += 1
+        s[ 2 + b] += 1
+    elif z2 > 0.:
+        s[ 1] += 1
+
+@njit( parallel = True, fastmath = True, cache = True, nogil = True)
+def compute_mandelbrot_masked( xmin, dx, ymin, dy, i0, j0, maxIter, horizon,
+                               todo, image, zAbs, periodicity = True, stats = None, cancel = None):
+    """
+    the pixels where todo is True, see mandelbrotCython.compute_mandelbrot_masked
+    """
+    ( height, width) = todo.shape
+    horizon2 = float( horizon)**2
+    eps2 = 0.
+    if periodicity:
+        eps2 = ( PERIODICITY_EPS * min( abs( dx), abs( dy)))**2
+    for i in prange( height):
+        if cancelled( cancel):
+            continue
+        y = ymin + dy * ( i0 + i)
+        for j in range( width):
+            if not todo[ i, j]:
+                continue
+            ( it, z2) = mandelPixel( xmin + dx * ( j0 + j), y, maxIter, horizon2, eps2)
+            image[ i, j] = it
+            zAbs[ i, j] = np.sqrt( z2)
+            if stats is not None:
+                statsAdd( stats[ numba.get_thread_id()], it, maxIter, z2)
+
+@njit( fastmath = True, cache = True)
+def juliaPixel( x, y, cr, ci, maxIter, horizon, eps2):
+    """
+    returns ( escape count, |z|^2) of z0 = x + i y,
+      |z|^2 is compared to horizon, see mandelbrotCython.julia_pixel
+    """
+    zx = x
+    zy = y
+    ckx = x
+    cky = y
+    lam = 0
+    power = 1
+    it = 0
+    while it < maxIter:
+        zx2 = zx * zx
+        zy2 = zy * zy
+        if zx2 + zy2 > horizon:
+            return ( it, zx2 + zy2)
+        zy = 2.0 * zx * zy + ci
+        zx = zx2 - zy2 + cr
+        it += 1
+        if eps2 > 0.:
+            lam += 1
+            if ( zx - ckx) * ( zx - ckx) + ( zy - cky) * ( zy - cky) < eps2:
+                return ( maxIter, 0.)
+            if lam == power:
+                ckx = zx
+                cky = zy
+                power *= 2
+                lam = 0
+    return ( maxIter, zx * zx + zy * zy)
+
+@njit( parallel = True, fastmath = True, cache = True, nogil = True)
+def compute_julia( xmin, dx, ymin, dy, cr, ci, maxIter, horizon, image, zAbs,
+                   periodicity = True, cancel = None):
+    """
+    the Julia set of c = cr + i ci, see mandelbrotCython.compute_julia_bounds
+    """
+    ( height, width) = image.shape
+    eps2 = 0.
+    if periodicity:
+        eps2 = ( PERIODICITY_EPS * min( abs( dx), abs( dy)))**2
+    for i in prange( height):
+        if cancelled( cancel):
+            continue
+        y = ymin + dy * i
+        for j in range( width):
+            ( it, z2) = juliaPixel( xmin + dx * j, y, cr, ci, maxIter, horizon, eps2)
+            image[ i, j] = it
+            zAbs[ i, j] = np.sqrt( z2)
+
+@njit( fastmath = True, cache = True)
+def mandelDzPixel( x, y, maxIter):
+    """
+    log( 1 + smooth iteration + log( 1 + distance)), see mandelbrotCython.mandel_dz_pixel
+    """
+    if inBulb( x, y) or inCardioid( x, y):
+        return 0.
+    zx = 0.
+    zy = 0.
+    dzx = 1.
+    dzy = 0.
+    for i in range( maxIter):
+        t = zx * zx - zy * zy + x
+        zy = 2.0 * zx * zy + y
+        zx = t
+        t = 2.0 * ( zx * dzx - zy * dzy) + 1.0
+        dzy = 2.0 * ( zx * dzy + zy * dzx)
+        dzx = t
+        if zx * zx + zy * zy > 16.0:
+            absZ = np.sqrt( zx * zx + zy * zy)
+            absDZ = np.sqrt( dzx * dzx + dzy * dzy)
+            if absDZ == 0.:
+                return 0.
+            nu = i + 1 - np.log( np.log( absZ + 1e-8)) / np.log( 2.0)
+            dist = absZ * np.log( absZ) / absDZ
+            return np.log( 1.0 + nu + np.log( 1.0 + dist))
+    return 0.
+
+@njit( parallel = True, fastmath = True, cache = True, nogil = True)
+def compute_mandelbrot_dz( xmin, dx, ymin, dy, maxIter, image, cancel = None):
+    """
+    smooth iteration plus distance, see mandelbrotCython.compute_mandelbrot_dz
+    """
+    ( height, width) = image.shape
+    for i in prange( height):
+        if cancelled( cancel):
+            continue
+        y = ymin + dy * i
+        for j in range( width):
+            image[ i, j] = mandelDzPixel( xmin + dx * j, y, maxIter)
+
+@njit( fastmath = True, cache = True)
+def buddhaEscape( x, y, maxIter):
+    """
+    escape count of c, horizon 2, see mandelbrotCython.buddha_escape
+    """
+    if inBulb( x, y) or inCardioid( x, y):
+        return maxIter
+    zx = 0.
+    zy = 0.
+    zx2 = 0.
+    zy2 = 0.
+    it = 0
+    while zx2 + zy2 < 4.0 and it < maxIter:
+        zy = 2.0 * zx * zy + y
+        zx = zx2 - zy2 + x
+        zx2 = zx * zx
+        zy2 = zy * zy
+        it += 1
+    return it
+
+@njit( fastmath = True, cache = True)
+def buddhaOrbit( x, y, n, w, xmin, ymin, invDx, channelIter, h):
+    """
+    h: the planes of the thread, see mandelbrotCython.buddha_orbit
+    """
+    ( nChannels, height, width) = h.shape
+    hits = 0
+    zx = 0.
+    zy = 0.
+    zx2 = 0.
+    zy2 = 0.
+    for k in range( n):
+        zy = 2.0 * zx * zy + y
+        zx = zx2 - zy2 + x
+        zx2 = zx * zx
+        zy2 = zy * zy
+        fx = ( zx - xmin) * invDx
+        fy = ( zy - ymin) * invDx
+        if fx >= 0. and fx < width and fy >= 0. and fy < height:
+            hits += 1
+            for l in range( nChannels):
+                if n < channelIter[ l]:
+                    h[ l, int( fy), int( fx)] += w
+        if zx2 + zy2 >= 4.0:
+            break
+    return hits
+
+@njit( parallel = True, fastmath = True, cache = True, nogil = True)
+def compute_buddhabrot( cr, ci, weight, xmin, ymin, dx, channelIter, hist, hits, cancel = None):
+    """
+    the orbit density, hist[ thread], see mandelbrotCython.compute_buddhabrot
+    """
+    maxIter = channelIter.max()
+    invDx = 1. / dx
+    for k in prange( cr.shape[0]):
+        if cancelled( cancel):
+            hits[ k] = 0
+            continue
+        it = buddhaEscape( cr[ k], ci[ k], maxIter)
+        count = 0
+        if it < maxIter:
+            count = buddhaOrbit( cr[ k], ci[ k], it, weight[ k], xmin, ymin, invDx,
+                                 channelIter, hist[ numba.get_thread_id()])
+        hits[ k] = count
+
+def statsThreads():
+    return numba.config.NUMBA_NUM_THREADS
+
+def setNumThreads( nThreads = None):
+    """
+    None: all cores
+    """
+    if nThreads is None:
+        nThreads = numba.config.NUMBA_NUM_THREADS
+    numba.set_num_threads( nThreads)
+    return
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+rendering in the background, the GUI does not block
+
+  - RenderService owns a worker thread. request( 'M') or request( 'J')
+    takes a snapshot of the view, a RenderView, and returns at once
+  - the latest request wins: a pending request of the same kind is
+    replaced, the render in flight is cancelled, see
+    FractalEngine.startRender()
+  - the worker calls FractalEngine.calcMandelbrotSet(), calcJuliaSet()
+    with the RenderView as engine.parent (thread-local). The results
+    reach the viewers through MBSUpdated, JuliaSetUpdated, the signals
+    are queued to the GUI thread
+  - the log messages of the worker are queued to the GUI thread, the
+    progress label and processEvents() are not used by the worker
+  - the worker does not write to the window, the members written by
+    the render (dataMandelbrotSet, isFilteredM, flags) stay in the
+    RenderView and are copied to the window in the GUI thread, see
+    applyView(). If the render changed the view (the grid is snapped
+    to a cached frame or to the symmetry axis, auto maxIter), the new
+    view is copied, unless the window moved on meanwhile
+  - the engine serializes the renders and the prefetch, they share its
+    frame cache and buffers, FractalEngine.renderLock
+  - prefetch: when the worker is idle, the likely next views (zoom out,
+    zoom in at the center, home, see PREFETCH_VALUES) are calculated
+    into the result cache, FractalEngine.prefetchMandelbrotSet(). A
+    request cancels the prefetch. window.prefetch selects the views,
+    window.prefetchShare the fraction of a core, no prefetch for
+    the density modes
+
+dynamic operators (execDynOp) and the color table (widthM 256) are
+rendered synchronously, they work on the widgets.
+"""
+import threading
+import numpy as np
+from PyQt5.QtCore import QObject, pyqtSignal
+import mandelbrotDeep
+#
+# the members of MBSMainWindow which define a render, copied at request time
+#
+VIEW_MEMBERS = {
+    'M': [ 'cxM', 'cyM', 'deltaM', 'cxMStr', 'cyMStr', 'deltaMStr', 'widthM', 'maxIterM'],
+    'J': [ 'cxM', 'cyM', 'cxJ', 'cyJ', 'deltaJ', 'widthJ', 'maxIterJ'],
+}
+#
+# the prefetch policies, the candidate views in the order they are calculated
+#
+PREFETCH_VALUES = {
+    'Off': [],
+    'Zoom out': [ 'zoom out'],
+    'Zoom': [ 'zoom out', 'zoom in'],
+    'Zoom, home': [ 'zoom out', 'zoom in', 'home'],
+}
+PREFETCH_SHARE_VALUES = [ 0.25, 0.5, 1.]
+
+class LogProxy( object):
+    """
+    logWidget.append() of the worker, queued to the GUI thread
+    """
+    def __init__( self, service):
+        self.service = service
+        return
+
+    def append( self, text):
+        self.service.logMessage.emit( text)
+        return
+
+class NullApp( object):
+    def processEvents( self):
+        return
+
+class NullWidget( object):
+    """
+    progressLbl, the worker does not touch widgets
+    """
+    def __getattr__( self, name):
+        return lambda *args: None
+
+class RenderView( object):
+    """
+    engine.parent during a render of the worker: the view members are a
+      snapshot, see VIEW_MEMBERS, the other members are read from the
+      window. All writes stay in the view, see RenderService.applyView().
+      cancelFlag: see FractalEngine.startRender()
+    """
+    def __init__( self, service, kind, values = None):
+        window = service.window
+        if values is None:
+            values = { name: getattr( window, name) for name in VIEW_MEMBERS[ kind]}
+        object.__setattr__( self, 'window', window)
+        object.__setattr__( self, 'values', values)
+        object.__setattr__( self, 'original', dict( values))
+        object.__setattr__( self, 'cancelFlag', np.zeros( 1, dtype=np.int32))
+        object.__setattr__( self, 'logWidget', LogProxy( service))
+        object.__setattr__( self, 'app', NullApp())
+        object.__setattr__( self, 'progressLbl', NullWidget())
+        return
+
+    def __getattr__( self, name):
+        values = object.__getattribute__( self, 'values')
+        if name in values:
+            return values[ name]
+        return getattr( object.__getattribute__( self, 'window'), name)
+
+    def __setattr__( self, name, value):
+        self.values[ name] = value
+        return
+
+class RenderService( QObject):
+    """
+    the render requests of the GUI, one worker thread
+
+      service = RenderService( window, engine)
+      service.request( 'M')         # returns at once
+      service.request( 'J')
+      service.cancel()              # Stop
+
+    the prefetch candidates are RenderViews of kind 'P', the
+      prefetching view is in flight as ( 'P', view)
+    """
+    logMessage = pyqtSignal( str)
+    viewChanged = pyqtSignal( object)
+
+    def __init__( self, window, engine):
+        super().__init__()
+        self.window = window
+        self.engine = engine
+        self.pending = {}
+        self.prefetching = []
+        self.inFlight = None
+        self.nDropped = 0
+        self.cond = threading.Condition()
+        self.logMessage.connect( self.window.logWidget.append)
+        self.viewChanged.connect( self.applyView)
+        self.thread = threading.Thread( target = self.work, daemon = True)
+        self.thread.start()
+        return
+
+    def request( self, kind, display = True):
+        """
+        kind: 'M' or 'J'. A pending request of kind is dropped,
+          the render of kind in flight is cancelled
+        """
+        with self.cond:
+            if kind in self.pending:
+                del self.pending[ kind]
+                self.nDropped += 1
+            self.prefetching = []
+            if self.inFlight is not None and self.inFlight[0] in ( kind, 'P'):
+                self.inFlight[1].cancelFlag[0] = 1
+            if self.window.asyncRender != "True" or self.window.execDynOp == "True" or \
+               ( kind == 'M' and self.window.widthM == 256):
+                sync = True
+            else:
+                sync = False
+                self.pending[ kind] = ( RenderView( self, kind), display)
+                self.cond.notify()
+        if sync:
+            if kind == 'M':
+                return self.engine.calcMandelbrotSet( display)
+            return self.engine.calcJuliaSet( display)
+        return
+
+    def cancel( self):
+        """
+        drops the pending requests, cancels the renders
+        """
+        with self.cond:
+            self.nDropped += len( self.pending)
+            self.pending.clear()
+            self.prefetching = []
+            if self.inFlight is not None and self.inFlight[0] == 'P':
+                self.inFlight[1].cancelFlag[0] = 1
+        self.engine.cancelRenders()
+        return
+
+    def work( self):
+        while True:
+            with self.cond:
+                while not self.pending and not self.prefetching:
+                    self.cond.wait()
+                if self.pending:
+                    kind = 'M' if 'M' in self.pending else 'J'
+                    ( view, display) = self.pending.pop( kind)
+                else:
+                    kind = 'P'
+                    view = self.prefetching.pop( 0)
+                self.inFlight = ( kind, view)
+            self.engine.local.view = view
+            try:
+                if kind == 'M':
+                    self.engine.calcMandelbrotSet( display)
+                elif kind == 'J':
+                    self.engine.calcJuliaSet( display)
+                else:
+                    self.engine.prefetchMandelbrotSet( self.window.prefetchShare, view.label)
+            except Exception as e:
+                self.logMessage.emit( "RenderService: %s failed, %s" % ( kind, repr( e)))
+            finally:
+                self.engine.local.view = None
+                with self.cond:
+                    self.inFlight = None
+                    if kind == 'M' and view.cancelFlag[0] == 0 and not self.pending:
+                        self.prefetching = self.prefetchViews( view)
+            if kind != 'P' and view.cancelFlag[0] == 0:
+                self.viewChanged.emit( view)
+
+    def prefetchViews( self, view):
+        """
+        the candidates after the render of view, see PREFETCH_VALUES, 
+          the views are derived like cb_zoomOut(), moveCenter(), cb_zoomHome()
+        """
+        zoom = self.window.zoom
+        views = []
+        if self.window.density != "Off": 
+            return views
+        for label in PREFETCH_VALUES.get( self.window.prefetch, []):
+            values = dict( view.values)
+            if label == 'zoom out':
+                values[ 'deltaMStr'] = mandelbrotDeep.scaleDecimal(
+                    mandelbrotDeep.decimalMember( view, 'deltaM'), zoom)
+                values[ 'deltaM'] = mandelbrotDeep.decimalToFloat( values[ 'deltaMStr'], mandelbrotDeep.DELTA_MIN)
+                if values[ 'deltaM'] > 3.:
+                    continue
+            elif label == 'zoom in':
+                values[ 'deltaMStr'] = mandelbrotDeep.divideDecimal(
+                    mandelbrotDeep.decimalMember( view, 'deltaM'), zoom)
+                values[ 'deltaM'] = mandelbrotDeep.decimalToFloat( values[ 'deltaMStr'], mandelbrotDeep.DELTA_MIN)
+            else:
+                values.update( cxM = -0.75, cyM = 0., deltaM = 3.,
+                               cxMStr = None, cyMStr = None, deltaMStr = None)
+            #
+            # one core, the tile pool serves the requests
+            #
+            values[ 'tiled'] = "False"
+            temp = RenderView( self, 'M', values)
+            object.__setattr__( temp, 'label', label)
+            views.append( temp)
+        return views
+
+    def applyView( self, view):
+        """
+        GUI thread: the members written by the render are copied to the
+          window, the flags with their actions. The view members only
+          if the window still shows the requested view
+        """
+        current = True
+        for ( name, value) in view.original.items():
+            if getattr( self.window, name) != value:
+                current = False
+        changed = False
+        for ( name, value) in view.values.items():
+            if name not in view.original:
+                setattr( self.window, name, value)
+                action = getattr( self.window, name + 'Action', None)
+                if action is not None:
+                    action.setChecked( value == "True")
+            elif current and value != view.original[ name]:
+                setattr( self.window, name, value)
+                changed = True
+        if changed:
+            self.window.updateGUI()
+        return
@@ -1,143 +1,187 @@
 #!/usr/bin/env python3
 import sys
 sys.path.append( "./cython")
-try: 
+try:
     import mandelbrotCython
     cythonOK = True
-except: 
+except:
     cythonOK = False
 
 import numpy as np
-import matplotlib.pyplot as plt 
 import os
+import queue
+import threading
 #
-# for tiled worker
+# default edge length of the tiles, pixels
 #
-from PyQt5.QtCore import QThread, pyqtSignal, pyqtSlot
-
-class TileWorker(QThread):
-
-    # see remark in mandelbrot.py l.2164
-    #finished = pyqtSignal(int, int, np.ndarray, np.ndarray)  # row, col, tile result
-
-    def __init__(self, col, row):
-        super().__init__()
-        self.row, self.col = row, col
-
-    @pyqtSlot(int, int, np.ndarray, np.ndarray)
-    def collect( self, col, row, tile, zAbs): 
-        with TileWorker.lock:
-            w = int( float( self.width)/float( self.NCOL))
-            h = int( float( self.width)/float( self.NROW))
-            x0 = self.col*w
-            y0 = self.row*h
-            TileWorker.finalImage[ y0:y0+h, x0:x0+w] = tile
-            TileWorker.finalZAbs[ y0:y0+h, x0:x0+w] = zAbs
-            TileWorker.finished_count += 1
-        return 
-
-    def run(self):
-        w = int( float( self.width)/float( self.NCOL))
-        h = int( float( self.width)/float( self.NROW))
-        x0 = self.col*w
-        y0 = self.row*h
-        #
-        # notice self.xmin, etc. are class variables
-        #
-        xmin = self.xmin + (self.xmax - self.xmin) * x0 / self.width
-        xmax = self.xmin + (self.xmax - self.xmin) * (x0 + w) / self.width
-        ymin = self.ymin + (self.ymax - self.ymin) * y0 / self.width
-        ymax = self.ymin + (self.ymax - self.ymin) * (y0 + h) / self.width
-        ( tile, zAbs) = mandelbrotCython.compute_mandelbrot(
-            w, h, xmin, xmax, ymin, ymax, 
-            self.max_iter, self.horizon)
-        self.collect(self.col, self.row, tile, zAbs)
-
-class TileWorkerDz(QThread):
-
-    # see comment above
-    #finished = pyqtSignal(int, int, np.ndarray)  # row, col, tile result
-
-    def __init__(self, col, row):
-        super().__init__()
-        self.row, self.col = row, col
-
-    def collect( self, col, row, tile):
-        
-        with TileWorker.lock:
-            TileWorkerDz.finished_count += 1                
-            w = int( float( self.width)/float( self.NCOL))
-            h = int( float( self.width)/float( self.NROW))
-            x0 = self.col*w
-            y0 = self.row*h
-            TileWorkerDz.finalImage[ y0:y0+h, x0:x0+w] = tile
-        return 
-
-    def run(self):
-        w = int( float( self.width)/float( self.NCOL))
-        h = int( float( self.width)/float( self.NROW))
-        x0 = self.col*w
-        y0 = self.row*h
-        #
-        # notice self.xmin, etc. are class variables
-        #
-        xmin = self.xmin + (self.xmax - self.xmin) * x0 / self.width
-        xmax = self.xmin + (self.xmax - self.xmin) * (x0 + w) / self.width
-        ymin = self.ymin + (self.ymax - self.ymin) * y0 / self.width
-        ymax = self.ymin + (self.ymax - self.ymin) * (y0 + h) / self.width
-
-        x = np.linspace(xmin, xmax, w)
-        y = np.linspace(ymin, ymax, w)
-        X, Y = np.meshgrid(x, y)
-        C = X + 1j * Y
-
-        # Compute smoothed Mandelbrot
-        tile = mandelbrotCython.mandelbrot_dz(C, max_iter=TileWorkerDz.max_iter)
-        self.collect( self.row, self.col, tile)
-        #self.finished.emit(self.row, self.col, tile)
-
-class TileWorkerJulia(QThread):
-
-    def __init__(self, col, row):
-        super().__init__()
-        self.row, self.col = row, col
-
-    @pyqtSlot(int, int, np.ndarray, np.ndarray)
-    def collect( self, col, row, tile, zAbs): 
-        with TileWorkerJulia.lock:
-            w = int( float( self.width)/float( self.NCOL))
-            h = int( float( self.width)/float( self.NROW))
-            x0 = self.col*w
-            y0 = self.row*h
-            TileWorkerJulia.finalImage[ y0:y0+h, x0:x0+w] = tile
-            TileWorkerJulia.finalZAbs[ y0:y0+h, x0:x0+w] = zAbs
-            TileWorkerJulia.finished_count += 1
-        return 
-
-    def run(self):
-        xmin = self.cxJ - self.deltaJ/2.
-        xmax = self.cxJ + self.deltaJ/2.
-        ymin = self.cyJ - self.deltaJ/2.
-        ymax = self.cyJ + self.deltaJ/2.
-        w = int( float( self.width)/float( self.NCOL))
-        h = int( float( self.width)/float( self.NROW))
-        x0 = self.col*w
-        y0 = self.row*h
-        #
-        # notice self.xmin, etc. are class variables
-        #
-        xminTile = xmin + (xmax - xmin) * x0 / self.width
-        xmaxTile = xmin + (xmax - xmin) * (x0 + w) / self.width
-        yminTile = ymin + (ymax - ymin) * y0 / self.width
-        ymaxTile = ymin + (ymax - ymin) * (y0 + h) / self.width
-
-        real = np.linspace(xminTile, xmaxTile, w)
-        imag = np.linspace(yminTile, ymaxTile, w)
-        real_grid, imag_grid = np.meshgrid(real, imag)
-
-        (tile, zAbs) = mandelbrotCython.compute_julia( real_grid, imag_grid, 
-                                                       self.cxM, self.cyM, 
-                                                       self.maxIterJ, self.horizon)
-        self.collect(self.col, self.row, tile, zAbs)
-
-
+TILE_SIZE = 64
+#
+# while waiting for the tiles, the GUI thread wakes up after
+# WAIT_INTERVAL seconds to process events
+#
+WAIT_INTERVAL = 0.1
+
+def makeTiles( width, height, tileSize = TILE_SIZE):
+    """
+    returns a list of ( x0, y0, w, h), covering a width x height image
+    """
+    tiles = []
+    for y0 in range( 0, height, tileSize):
+        for x0 in range( 0, width, tileSize):
+            tiles.append( ( x0, y0, min( tileSize, width - x0), min( tileSize, height - y0)))
+    return tiles
+
+class TileJob( object):
+    """
+    the tiles of one frame, remaining is decremented by the workers
+    """
+    def __init__( self, func, nTiles):
+        self.func = func
+        self.remaining = nTiles
+        self.error = None
+        self.cond = threading.Condition()
+
+class TilePool( object):
+    """
+    persistent worker threads pulling tiles from a shared queue.
+      Fast tiles do not wait for slow tiles, a worker which is done
+      takes the next tile. The Cython kernels release the GIL.
+
+      pool = TilePool()
+      pool.run( func, makeTiles( width, width, 64), app.processEvents)
+        func( tile) calculates one tile and stores the result
+
+    workerIndex(): 0 <= index < nThreads in a worker, for per-thread data
+    """
+    def __init__( self, nThreads = None):
+        if nThreads is None:
+            nThreads = os.cpu_count() or 4
+        self.nThreads = nThreads
+        self.queue = queue.Queue()
+        self.local = threading.local()
+        self.threads = []
+        for i in range( nThreads):
+            temp = threading.Thread( target = self.work, args = ( i,), daemon = True)
+            temp.start()
+            self.threads.append( temp)
+        return
+
+    def workerIndex( self):
+        return self.local.index
+
+    def work( self, index):
+        self.local.index = index
+        while True:
+            ( job, tile) = self.queue.get()
+            try:
+                job.func( tile)
+            except Exception as e:
+                if job.error is None:
+                    job.error = e
+            with job.cond:
+                job.remaining -= 1
+                if job.remaining == 0:
+                    job.cond.notify_all()
+
+    def run( self, func, tiles, processEvents = None):
+        """
+        blocks until all tiles are done,
+          processEvents() is called every WAIT_INTERVAL seconds
+        """
+        job = TileJob( func, len( tiles))
+        if len( tiles) == 0:
+            return
+        for tile in tiles:
+            self.queue.put( ( job, tile))
+        while True:
+            with job.cond:
+                if job.remaining > 0:
+                    job.cond.wait( WAIT_INTERVAL)
+                if job.remaining == 0:
+                    break
+            if processEvents is not None:
+                processEvents()
+        if job.error is not None:
+            raise job.error
+        return
+#
+# the tile functions, the results are written into the views of
+# the frame arrays. xmin, dx, etc. refer to the whole frame,
+# pixel ( i, j) is at ( xmin + dx*j, ymin + dy*i)
+# cancel: the cancel flag of the render, see FractalEngine.startRender()
+# stats: the iteration statistics, the row of the worker, see 
+#   mandelbrotCython.stats_add(), TilePool.workerIndex()
+#
+def mandelbrotTile( tile, xmin, dx, ymin, dy, i0, j0, maxIter, horizon, todo, escapeCount, zAbs, 
+                    simd = False, single = False, cancel = None, stats = None):
+    """
+    the pixels where todo is True,
+      i0, j0: pixel ( i, j) is at ( xmin + dx*( j0 + j), ymin + dy*( i0 + i))
+      simd: compute_mandelbrot_simd
+      single: compute_mandelbrot_f32, float32 orbits
+    """
+    ( x0, y0, w, h) = tile
+    tileTodo = todo[ y0:y0+h, x0:x0+w]
+    if not tileTodo.any():
+        return
+    if single:
+        kernel = mandelbrotCython.compute_mandelbrot_f32
+    elif simd:
+        kernel = mandelbrotCython.compute_mandelbrot_simd
+    else:
+        kernel = mandelbrotCython.compute_mandelbrot_masked
+    kernel(
+        xmin, dx, ymin, dy, i0 + y0, j0 + x0, maxIter, horizon,
+        tileTodo.view( np.uint8), escapeCount[ y0:y0+h, x0:x0+w], zAbs[ y0:y0+h, x0:x0+w],
+        num_threads = 1, cancel = cancel, stats = stats)
+    return
+
+def mandelbrotResumeTile( tile, xmin, dx, ymin, dy, i0, j0, maxIter, horizon, todo, 
+                          escapeCount, zAbs, zx, zy, status, cancel = None, stats = None):
+    """
+    resumable, the orbits of the todo pixels continue from zx, zy
+    """
+    ( x0, y0, w, h) = tile
+    tileTodo = todo[ y0:y0+h, x0:x0+w]
+    if not tileTodo.any():
+        return
+    mandelbrotCython.compute_mandelbrot_resume(
+        xmin, dx, ymin, dy, i0 + y0, j0 + x0, maxIter, horizon,
+        tileTodo.view( np.uint8), escapeCount[ y0:y0+h, x0:x0+w], zAbs[ y0:y0+h, x0:x0+w],
+        zx[ y0:y0+h, x0:x0+w], zy[ y0:y0+h, x0:x0+w], status[ y0:y0+h, x0:x0+w],
+        num_threads = 1, cancel = cancel, stats = stats)
+    return
+
+def mandelbrotDzTile( tile, xmin, dx, ymin, dy, maxIter, result, cancel = None):
+    """
+    smooth iteration plus distance, compute_mandelbrot_dz
+    """
+    ( x0, y0, w, h) = tile
+    mandelbrotCython.compute_mandelbrot_dz( xmin, dx, ymin, dy, y0, x0, maxIter, 
+                                            result[ y0:y0+h, x0:x0+w], num_threads = 1, 
+                                            cancel = cancel)
+    return
+
+def mandelbrotGBufferTile( tile, xmin, dx, ymin, dy, maxIter, gBuffer, cancel = None):
+    """
+    the channels of FractalEngine.GBuffer, compute_mandelbrot_gbuffer
+    """
+    ( x0, y0, w, h) = tile
+    mandelbrotCython.compute_mandelbrot_gbuffer( 
+        xmin, dx, ymin, dy, y0, x0, maxIter, 
+        *[ temp[ y0:y0+h, x0:x0+w] for temp in gBuffer.channels()], num_threads = 1, 
+        cancel = cancel)
+    return
+
+def juliaTile( tile, xmin, dx, ymin, dy, cx, cy, maxIter, horizon, escapeCount, zAbs, 
+               cancel = None):
+    """
+    compute_julia_bounds for the bounds of the tile
+    """
+    ( x0, y0, w, h) = tile
+    (tileEC, tileZAbs) = mandelbrotCython.compute_julia_bounds( 
+        w, h, xmin + dx*x0, xmin + dx*( x0 + w), ymin + dy*y0, ymin + dy*( y0 + h), 
+        cx, cy, maxIter, horizon, num_threads = 1, cancel = cancel)
+    escapeCount[ y0:y0+h, x0:x0+w] = tileEC
+    zAbs[ y0:y0+h, x0:x0+w] = tileZAbs
+    return
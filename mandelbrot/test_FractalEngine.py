@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+FractalEngine: the symmetry, snapSymmetric(), mirrorRange(), mirrorRows(),
+the frames of animations, storeFrame().
+The engine runs headless, parent is a namespace with the members of
+MBSMainWindow which the renders read
+"""
+import os
+import types
+import numpy as np
+import pytest
+
+pytest.importorskip( "PyQt5")
+pytest.importorskip( "pyqtgraph")
+os.environ.setdefault( "QT_QPA_PLATFORM", "offscreen")
+from PyQt5.QtWidgets import QApplication
+import FractalEngine
+
+class Log( object):
+    def __init__( self):
+        self.lines = []
+
+    def append( self, text):
+        self.lines.append( text)
+
+class App( object):
+    def processEvents( self):
+        return
+
+class ColorPars( object):
+    smooth = "None"
+
+@pytest.fixture( scope = "module")
+def app():
+    return QApplication.instance() or QApplication( [])
+
+def makeEngine( **kw):
+    """
+    returns ( engine, parent, frames), frames: the arrays of MBSUpdated
+    """
+    parent = types.SimpleNamespace( 
+        widthM = 400, cxM = -0.75, cyM = 0., deltaM = 3., maxIterM = 512, 
+        cxMStr = None, cyMStr = None, deltaMStr = None, 
+        deep = "False", cython = "True", tiled = "False", numpy = "False", numba = "False", 
+        scalar = "False", marianiSilver = "False", progressive = "False", reusePixels = "False", 
+        resumable = "False", simd = "False", float32 = "False", gBuffer = "False", 
+        antiAlias = "False", symmetry = "False", resultCache = "False", diskCache = "False", 
+        autoMaxIter = "False", density = "Off", tileSize = 64, debugSpeed = "False", 
+        isAnimating = False, execDynOp = "False", operatorWidget = None, logWidget = Log(), 
+        app = App(), isFilteredM = False, dataMandelbrotSet = None)
+    for ( name, value) in kw.items():
+        setattr( parent, name, value)
+    engine = FractalEngine.FractalEngine( None, ColorPars())
+    engine.parent = parent
+    frames = []
+    engine.MBSUpdated.connect( frames.append)
+    return ( engine, parent, frames)
+
+def test_snapSymmetric( app):
+    ( engine, parent, frames) = makeEngine()
+    dv = 3./400
+    for vmin in ( -1.4987, -1.5, -0.3333):
+        temp = engine.snapSymmetric( vmin, dv, 400)
+        assert abs( temp - vmin) <= dv/4.
+        assert engine.mirrorAxis( temp, dv, 0) is not None
+    #
+    # the axis is not in the view
+    #
+    assert engine.snapSymmetric( 0.1, dv, 400) == 0.1
+    assert engine.snapSymmetric( -4., dv, 400) == -4.
+
+def test_mirrorRange( app):
+    """
+    the pixels a <= k < b mirror the pixels m - k across v = 0
+    """
+    ( engine, parent, frames) = makeEngine()
+    dv = 3./400
+    for vmin in ( -1.5, -1.5 + dv/2., -0.6):
+        vmin = engine.snapSymmetric( vmin, dv, 400)
+        ( a, b, m) = engine.mirrorRange( vmin, dv, 0, 400)
+        assert m - b + 1 >= 0 and m - a + 1 <= a
+        for k in range( a, b):
+            assert vmin + dv*k == pytest.approx( -( vmin + dv*( m - k)), abs = dv*1e-6)
+    assert engine.mirrorRange( 0.1, dv, 0, 400) is None
+
+def test_mirrorRows( app):
+    """
+    rows 3, 4 mirror rows 1, 0, zy changes sign
+    """
+    ( engine, parent, frames) = makeEngine()
+    escapeCount = np.arange( 6*4, dtype=np.int32).reshape( 6, 4)
+    original = escapeCount.copy()
+    zy = np.ones(( 6, 4), dtype=np.float64)
+    done = np.zeros(( 6, 4), dtype=bool)
+    todo = np.ones(( 6, 4), dtype=bool)
+    mirror = ( 3, 5, 4)
+    mirrored = engine.mirrorTodo( mirror, todo, done)
+    assert not todo[ 3:5].any() and todo[ 5].all()
+    engine.mirrorRows( mirror, mirrored, done, escapeCount, np.zeros(( 6, 4)), zy = zy)
+    assert np.array_equal( escapeCount[ 3:5], original[ 1::-1])
+    assert np.array_equal( escapeCount[ 5], original[ 5])
+    assert np.all( zy[ 3:5] == -1.) and np.all( zy[ 5] == 1.)
+    assert done[ 3:5].all() and not done[ 5].any()
+
+def test_symmetricRender( app):
+    """
+    the mirrored render equals the full render of the snapped view, 
+      up to the rounding of the pixel coordinates, the decimal center 
+      follows the snapped cyM
+    """
+    pytest.importorskip( "mandelbrotCython")
+    ( engine, parent, frames) = makeEngine( symmetry = "True", cyM = 0.0013, 
+                                            cyMStr = '0.00130000000000000000001')
+    engine.calcMandelbrotSet()
+    assert parent.cyM != 0.0013
+    assert float( parent.cyMStr) == parent.cyM
+    ( other, otherParent, otherFrames) = makeEngine( cyM = parent.cyM)
+    other.calcMandelbrotSet()
+    assert np.mean( frames[-1] == otherFrames[-1]) > 0.9999
+
+def test_storeFrameCrop( app, monkeypatch):
+    """
+    animations: the older frames keep the centre quarter, frame 
+      i + framesPerOctave re-uses it, the frames stay below FRAME_BYTES
+    """
+    pytest.importorskip( "mandelbrotCython")
+    ( engine, parent, frames) = makeEngine( widthM = 200, reusePixels = "True", 
+                                            isAnimating = True, cxM = -0.7436, cyM = 0.1318)
+    engine.frameHistory = 3
+    for i in range( 4):
+        parent.deltaM = 3.*2.**( -i/3.)
+        engine.calcMandelbrotSet( display = False)
+    assert [ temp.escapeCount.shape for temp in engine.frameCache] == \
+        [ ( 100, 100), ( 100, 100), ( 200, 200)]
+    ( other, otherParent, otherFrames) = makeEngine( widthM = 200, cxM = parent.cxM, 
+                                                     cyM = parent.cyM, deltaM = parent.deltaM)
+    other.calcMandelbrotSet( display = False)
+    assert np.mean( parent.dataMandelbrotSet == otherParent.dataMandelbrotSet) > 0.9999
+
+    monkeypatch.setattr( FractalEngine, "FRAME_BYTES", 200*200*12)
+    parent.deltaM /= 2.**( 1/3.)
+    engine.calcMandelbrotSet( display = False)
+    assert len( engine.frameCache) == 1
+
+def test_juliaMirror( app):
+    """
+    the snapped grid is written back to cxJ, cyJ
+    """
+    ( engine, parent, frames) = makeEngine( symmetry = "True", cxJ = 0.0013, cyJ = -0.0021, 
+                                            deltaJ = 3.)
+    dx = 3./400
+    ( xmin, ymin, mirror) = engine.juliaMirror( 0.0013 - 1.5, -0.0021 - 1.5, dx, 400)
+    assert mirror is not None
+    assert parent.cxJ == xmin + 1.5 and parent.cyJ == ymin + 1.5
+    assert abs( parent.cxJ - 0.0013) <= dx/4. and abs( parent.cyJ + 0.0021) <= dx/4.
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+mandelbrotCache.ResultCache: LRU order, eviction, release, the disk tier
+"""
+import numpy as np
+import mandelbrotCache
+from mandelbrotCache import ResultCache
+
+def entry( value, n = 1024):
+    """
+    n*8 bytes
+    """
+    return { 'zAbs': np.full( n, value, dtype=np.float64)}
+
+def test_lruEviction( tmp_path):
+    cache = ResultCache( memoryBytes = 3*8192, cacheDir = str( tmp_path))
+    for k in range( 3):
+        cache.put( k, entry( k))
+    assert cache.get( 0) is not None
+    cache.put( 3, entry( 3))
+    #
+    # 1 is the least recently used, 0 has been read
+    #
+    assert list( cache.memory.keys()) == [ 2, 0, 3]
+    assert cache.get( 1) is None
+    assert cache.nBytes == 3*8192
+    assert not list( tmp_path.iterdir())
+
+def test_putCopies( tmp_path):
+    cache = ResultCache( cacheDir = str( tmp_path))
+    temp = entry( 1.)
+    assert cache.put( 'a', temp)
+    temp[ 'zAbs'][:] = 2.
+    assert cache.get( 'a')[ 'zAbs'][0] == 1.
+    assert not cache.put( 'a', temp)
+    assert cache.put( 'b', temp, copy = False)
+    assert cache.get( 'b')[ 'zAbs'] is temp[ 'zAbs']
+
+def test_release( tmp_path):
+    released = []
+    cache = ResultCache( memoryBytes = 2*8192, cacheDir = str( tmp_path), 
+                         release = released.append)
+    for k in range( 4):
+        cache.put( k, entry( k), copy = False)
+    assert [ temp[ 'zAbs'][0] for temp in released] == [ 0., 1.]
+
+def test_near( tmp_path):
+    cache = ResultCache( cacheDir = str( tmp_path))
+    cache.put(( 'M', 1.), entry( 1.))
+    cache.put(( 'M', 2.), entry( 2.))
+    temp = cache.get(( 'M', 1.1), lambda other: abs( other[1] - 1.1) < 0.5)
+    assert temp[ 'zAbs'][0] == 1.
+    assert cache.get(( 'M', 5.), lambda other: abs( other[1] - 5.) < 0.5) is None
+    assert ( cache.hits, cache.misses) == ( 1, 1)
+
+def test_diskTier( tmp_path):
+    """
+    evicted entries are spilled, a disk hit returns them to the memory
+    """
+    cache = ResultCache( memoryBytes = 8192, diskBytes = mandelbrotCache.DISK_BYTES, 
+                         cacheDir = str( tmp_path))
+    cache.put( 'a', entry( 1.))
+    cache.put( 'b', entry( 2.))
+    cache.queue.join()
+    assert len( list( tmp_path.glob( "*.npz"))) == 1
+    assert cache.contains( 'a')
+    temp = cache.get( 'a')
+    assert temp[ 'zAbs'][0] == 1.
+    assert cache.diskHits == 1
+    assert list( cache.memory.keys()) == [ 'a']
+
+def test_diskLimit( tmp_path):
+    """
+    the files with the oldest access times are removed
+    """
+    cache = ResultCache( memoryBytes = 8192, diskBytes = 1, cacheDir = str( tmp_path))
+    for k in range( 4):
+        cache.put( k, entry( k))
+    cache.queue.join()
+    assert len( list( tmp_path.glob( "*.npz"))) <= 1
+
+def test_diskOff( tmp_path):
+    """
+    without the disk tier the files of an earlier session are ignored
+    """
+    cache = ResultCache( memoryBytes = 8192, diskBytes = mandelbrotCache.DISK_BYTES, 
+                         cacheDir = str( tmp_path))
+    cache.put( 'a', entry( 1.))
+    cache.put( 'b', entry( 2.))
+    cache.queue.join()
+    other = ResultCache( cacheDir = str( tmp_path))
+    assert not other.contains( 'a')
+    assert other.get( 'a') is None
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+mandelbrotCython: the SIMD and float32 kernels against the scalar kernel,
+Mariani-Silver against the full render
+"""
+import numpy as np
+import pytest
+
+mandelbrotCython = pytest.importorskip( "mandelbrotCython")
+
+WIDTH = 160
+MAX_ITER = 1000
+( XMIN, YMIN, DX) = ( -2., -1.5, 3./WIDTH)
+
+def masked( kernel, todo = None, **kw):
+    if todo is None:
+        todo = np.ones(( WIDTH, WIDTH), dtype=np.uint8)
+    escapeCount = np.zeros(( WIDTH, WIDTH), dtype=np.int32)
+    zAbs = np.zeros(( WIDTH, WIDTH), dtype=np.float64)
+    kernel( XMIN, DX, YMIN, DX, 0, 0, MAX_ITER, 4., todo, escapeCount, zAbs, **kw)
+    return ( escapeCount, zAbs)
+
+def test_simdMatchesScalar():
+    """
+    the lanes run the scalar iteration, lane refill must not mix pixels
+    """
+    ( reference, zAbsReference) = masked( mandelbrotCython.compute_mandelbrot_masked)
+    ( escapeCount, zAbs) = masked( mandelbrotCython.compute_mandelbrot_simd)
+    assert mandelbrotCython.simd_lanes() >= 1
+    assert np.mean( escapeCount == reference) > 0.999
+    same = escapeCount == reference
+    assert np.allclose( zAbs[ same], zAbsReference[ same], rtol = 1e-9)
+
+def test_simdMasked():
+    """
+    pixels outside todo are not written
+    """
+    todo = np.zeros(( WIDTH, WIDTH), dtype=np.uint8)
+    todo[ ::3, 1::2] = 1
+    ( escapeCount, zAbs) = masked( mandelbrotCython.compute_mandelbrot_simd, todo)
+    assert not escapeCount[ todo == 0].any()
+    assert escapeCount[ todo == 1].all()
+
+def test_float32Overview():
+    """
+    float32 at an overview zoom, a few boundary pixels differ
+    """
+    ( reference, zAbsReference) = masked( mandelbrotCython.compute_mandelbrot_masked)
+    ( escapeCount, zAbs) = masked( mandelbrotCython.compute_mandelbrot_f32)
+    assert np.mean( escapeCount == reference) > 0.99
+
+def test_cancel():
+    cancel = np.ones( 1, dtype=np.int32)
+    ( escapeCount, zAbs) = masked( mandelbrotCython.compute_mandelbrot_simd, cancel = cancel)
+    assert not escapeCount.any()
+
+@pytest.mark.parametrize( "fillEscaped", [ True, False])
+def test_marianiSilverMatchesFull( fillEscaped):
+    """
+    solid guessing: the filled rectangles have the escape counts of
+      the full render, fill_escaped False: every escaped pixel is calculated
+    """
+    ( escapeCount, zAbs) = mandelbrotCython.compute_mandelbrot_ms( 
+        300, 300, -2., 1., -1.5, 1.5, MAX_ITER, 4., fill_escaped = fillEscaped)
+    ( reference, zAbsReference) = mandelbrotCython.compute_mandelbrot( 
+        300, 300, -2., 1., -1.5, 1.5, MAX_ITER, 4., periodicity = True)
+    ( escapeCount, reference) = ( np.asarray( escapeCount), np.asarray( reference))
+    assert np.mean( escapeCount == reference) > 0.999
+    if not fillEscaped:
+        escaped = reference < MAX_ITER
+        assert np.array_equal( np.asarray( zAbs)[ escaped], np.asarray( zAbsReference)[ escaped])
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+mandelbrotDeep: FloatExp, the decimal strings, perturbation vs float64
+"""
+import math
+from decimal import Decimal
+from fractions import Fraction
+import numpy as np
+import pytest
+import mandelbrotDeep
+from mandelbrotDeep import FloatExp
+
+def test_floatExpNormalize():
+    temp = FloatExp( 3. + 4.j, 10)
+    assert 0.5 <= max( abs( temp.m.real), abs( temp.m.imag)) < 1.
+    assert temp.toComplex() == ( 3. + 4.j)*2**10
+    assert FloatExp( 0.).e == mandelbrotDeep.FE_ZERO_EXP
+
+def test_floatExpBelowFloat64():
+    """
+    2**-1500 is not a double, its square and sum are kept exactly
+    """
+    a = FloatExp( 0.75, -1500)
+    assert a.toComplex() == 0.
+    assert ( a*a).log2abs() == pytest.approx( 2*math.log2( 0.75) - 3000)
+    assert ( a + a).log2abs() == pytest.approx( math.log2( 1.5) - 1500)
+    assert ( a*FloatExp( 1., 1500)).toComplex() == 0.75
+
+def test_floatExpArrays():
+    rng = np.random.default_rng( 1)
+    m = rng.standard_normal( 8) + 1j*rng.standard_normal( 8)
+    e = rng.integers( -1200, -1000, 8)
+    ( am, ae) = mandelbrotDeep._feNorm( m, e)
+    ( pm, pe) = mandelbrotDeep._feMul(( am, ae), ( am, ae))
+    ( sm, se) = mandelbrotDeep._feAdd(( am, ae), ( am, ae))
+    for k in range( 8):
+        a = FloatExp( m[ k], e[ k])
+        assert ( pm[ k], pe[ k]) == pytest.approx((( a*a).m, ( a*a).e))
+        assert ( sm[ k], se[ k]) == pytest.approx((( a + a).m, ( a + a).e))
+
+def test_addPixelsDecimal():
+    assert Decimal( mandelbrotDeep.addPixelsDecimal( '0.25', '3', -400, 800)) == Decimal( '-1.25')
+    #
+    # one pixel at 1e-40 moves the 40th digit, float64 cannot
+    #
+    temp = mandelbrotDeep.addPixelsDecimal( '-0.75', '8e-40', 1, 800)
+    assert Decimal( temp) - Decimal( '-0.75') == Decimal( '1e-42')
+
+def test_scaleDivideDecimal():
+    temp = mandelbrotDeep.divideDecimal( '3e-400', 2.)
+    assert Decimal( temp) == Decimal( '1.5e-400')
+    assert Decimal( mandelbrotDeep.scaleDecimal( temp, 2.)) == Decimal( '3e-400')
+
+def test_log2Decimal():
+    """
+    the bit lengths of numerator and denominator, within 1 of log2
+    """
+    temp = -400*math.log2( 10.)
+    assert temp - 1. < mandelbrotDeep.log2Decimal( '1e-400') < temp + 1.
+    assert mandelbrotDeep.log2Decimal( '-8') == 3
+
+def test_syncDecimal():
+    assert mandelbrotDeep.syncDecimal( 0.1, '0.1000000000000000000001') == '0.1000000000000000000001'
+    assert mandelbrotDeep.syncDecimal( 0.2, '0.1000000000000000000001') == '0.2'
+    assert mandelbrotDeep.syncDecimal( np.float64( 0.2), None) == '0.2'
+    assert mandelbrotDeep.syncDecimal( 1e-320, '1e-320', mandelbrotDeep.DELTA_MIN) == '1e-320'
+
+def test_decimalToDD():
+    ( hi, lo) = mandelbrotDeep.decimalToDD( '0.1000000000000000000000000000001')
+    assert hi == 0.1
+    assert abs( Fraction( hi) + Fraction( lo) - 
+                Fraction( Decimal( '0.1000000000000000000000000000001'))) < Fraction( 1, 10**31)
+
+def escapeCountsFloat64( cx, cy, delta, width, maxIter):
+    u = delta*( -0.5 + np.arange( width)/width)
+    c = ( cx + u[ None, :]) + 1j*( cy + u[ :, None])
+    z = np.zeros_like( c)
+    count = np.full( c.shape, maxIter, dtype=np.int32)
+    for n in range( maxIter):
+        todo = count == maxIter
+        z[ todo] = z[ todo]**2 + c[ todo]
+        count[ todo & ( np.abs( z) > 2.)] = n + 1
+    return count
+
+def test_perturbationMatchesFloat64():
+    """
+    a shallow view, both methods are exact up to rounding
+    """
+    ( width, maxIter) = ( 32, 300)
+    ( escapeCount, zAbs, info) = mandelbrotDeep.computeMandelbrotDeep( 
+        '-0.7453', '0.1127', '0.002', width, maxIter, 2., useCython = False)
+    reference = escapeCountsFloat64( -0.7453, 0.1127, 0.002, width, maxIter)
+    assert escapeCount.shape == ( width, width)
+    assert np.mean( escapeCount == reference) > 0.99
+
+def test_perturbationFloatExp():
+    """
+    delta 1e-320 is below DELTA_MIN, the deltas are FloatExp
+    """
+    ( escapeCount, zAbs, info) = mandelbrotDeep.computeMandelbrotDeep( 
+        '-1.5', '0', '1e-320', 8, 100, 2., useCython = False)
+    assert info[ 'floatExp']
+    assert np.all( escapeCount == 100)
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+mandelbrotNumba against the Cython kernels, cancel. Numba uses
+fastmath, the results agree up to a few boundary pixels
+"""
+import numpy as np
+import pytest
+
+mandelbrotNumba = pytest.importorskip( "mandelbrotNumba")
+
+WIDTH = 128
+MAX_ITER = 500
+( XMIN, YMIN, DX) = ( -2., -1.5, 3./WIDTH)
+
+def maskedNumba( **kw):
+    todo = np.ones(( WIDTH, WIDTH), dtype=np.uint8)
+    escapeCount = np.zeros(( WIDTH, WIDTH), dtype=np.int32)
+    zAbs = np.zeros(( WIDTH, WIDTH), dtype=np.float64)
+    mandelbrotNumba.compute_mandelbrot_masked( XMIN, DX, YMIN, DX, 0, 0, MAX_ITER, 4., 
+                                               todo, escapeCount, zAbs, **kw)
+    return ( escapeCount, zAbs)
+
+def test_maskedMatchesCython():
+    mandelbrotCython = pytest.importorskip( "mandelbrotCython")
+    ( escapeCount, zAbs) = maskedNumba()
+    todo = np.ones(( WIDTH, WIDTH), dtype=np.uint8)
+    reference = np.zeros(( WIDTH, WIDTH), dtype=np.int32)
+    zAbsReference = np.zeros(( WIDTH, WIDTH), dtype=np.float64)
+    mandelbrotCython.compute_mandelbrot_masked( XMIN, DX, YMIN, DX, 0, 0, MAX_ITER, 4., 
+                                                todo, reference, zAbsReference)
+    same = escapeCount == reference
+    assert np.mean( same) > 0.999
+    assert np.allclose( zAbs[ same], zAbsReference[ same], rtol = 1e-6)
+
+def test_stats():
+    """
+    the rows of the threads add up to the escaped and bounded pixels
+    """
+    stats = np.zeros(( mandelbrotNumba.statsThreads(), mandelbrotNumba.STATS_SIZE), dtype=np.int64)
+    ( escapeCount, zAbs) = maskedNumba( stats = stats)
+    total = stats.sum( axis = 0)
+    assert total[ 0] == np.count_nonzero( escapeCount < MAX_ITER)
+    assert total[ 1] == np.count_nonzero(( escapeCount == MAX_ITER) & ( zAbs > 0.))
+    assert total[ 2:].sum() == total[ 0]
+
+def test_cancel():
+    """
+    a set flag skips all rows, the arrays are not touched
+    """
+    cancel = np.ones( 1, dtype=np.int32)
+    ( escapeCount, zAbs) = maskedNumba( cancel = cancel)
+    assert not escapeCount.any()
+    image = np.zeros(( WIDTH, WIDTH), dtype=np.int32)
+    mandelbrotNumba.compute_julia( XMIN, DX, YMIN, DX, -0.8, 0.156, MAX_ITER, 4., 
+                                   image, np.zeros(( WIDTH, WIDTH)), cancel = cancel)
+    assert not image.any()
+    dz = np.zeros(( WIDTH, WIDTH))
+    mandelbrotNumba.compute_mandelbrot_dz( XMIN, DX, YMIN, DX, MAX_ITER, dz, cancel = cancel)
+    assert not dz.any()
+
+def test_juliaMatchesCython():
+    mandelbrotCython = pytest.importorskip( "mandelbrotCython")
+    ( xmin, dx) = ( -1.5, 3./WIDTH)
+    image = np.zeros(( WIDTH, WIDTH), dtype=np.int32)
+    zAbs = np.zeros(( WIDTH, WIDTH), dtype=np.float64)
+    mandelbrotNumba.compute_julia( xmin, dx, xmin, dx, -0.8, 0.156, MAX_ITER, 4., image, zAbs)
+    ( reference, zAbsReference) = mandelbrotCython.compute_julia_bounds( 
+        WIDTH, WIDTH, xmin, xmin + dx*WIDTH, xmin, xmin + dx*WIDTH, -0.8, 0.156, MAX_ITER, 4.)
+    assert np.mean( image == np.asarray( reference)) > 0.999
+
+def test_dzMatchesCython():
+    mandelbrotCython = pytest.importorskip( "mandelbrotCython")
+    dz = np.zeros(( WIDTH, WIDTH))
+    mandelbrotNumba.compute_mandelbrot_dz( XMIN, DX, YMIN, DX, MAX_ITER, dz)
+    reference = np.zeros(( WIDTH, WIDTH))
+    mandelbrotCython.compute_mandelbrot_dz( XMIN, DX, YMIN, DX, 0, 0, MAX_ITER, reference)
+    assert np.mean( np.isclose( dz, reference, rtol = 1e-6)) > 0.999
+
+def test_buddhabrotMatchesCython():
+    mandelbrotCython = pytest.importorskip( "mandelbrotCython")
+    rng = np.random.default_rng( 0)
+    ( cr, ci) = ( rng.uniform( -2., 2., 4096), rng.uniform( -2., 2., 4096))
+    weight = np.ones( len( cr))
+    channelIter = np.array( [ 200, 20], dtype=np.int32)
+    density = []
+    for kernel in ( mandelbrotNumba.compute_buddhabrot, mandelbrotCython.compute_buddhabrot):
+        if kernel is mandelbrotNumba.compute_buddhabrot:
+            nPlanes = mandelbrotNumba.statsThreads()
+        else:
+            nPlanes = mandelbrotCython.stats_threads()
+        hist = np.zeros(( nPlanes, 2, 64, 64), dtype=np.float32)
+        hits = np.zeros( len( cr), dtype=np.int32)
+        kernel( cr, ci, weight, -2., -2., 4./64, channelIter, hist, hits)
+        density.append( hist.sum( axis = 0))
+    assert density[0].sum() > 0.
+    assert np.allclose( density[0], density[1], rtol = 1e-3, atol = 1.)
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+mandelbrotTiled: the tiles, TilePool
+"""
+import threading
+import time
+import numpy as np
+import pytest
+import mandelbrotTiled
+from mandelbrotTiled import TilePool
+
+def test_makeTiles():
+    tiles = mandelbrotTiled.makeTiles( 100, 70, 32)
+    covered = np.zeros(( 70, 100), dtype=np.int32)
+    for ( x0, y0, w, h) in tiles:
+        covered[ y0:y0+h, x0:x0+w] += 1
+    assert np.all( covered == 1)
+    assert len( tiles) == 4*3
+
+def test_runAllTiles():
+    pool = TilePool( 4)
+    tiles = mandelbrotTiled.makeTiles( 256, 256, 16)
+    done = []
+    workers = set()
+    lock = threading.Lock()
+    def f( tile):
+        with lock:
+            done.append( tile)
+            workers.add( pool.workerIndex())
+    pool.run( f, tiles)
+    assert sorted( done) == sorted( tiles)
+    assert workers <= set( range( pool.nThreads))
+    pool.run( f, [])
+    assert len( done) == len( tiles)
+
+def test_processEvents():
+    """
+    the caller processes events while waiting
+    """
+    pool = TilePool( 2)
+    calls = []
+    pool.run( lambda tile: time.sleep( 0.25), [ ( 0, 0, 1, 1)], lambda: calls.append( 1))
+    assert len( calls) >= 1
+
+def test_error():
+    """
+    an exception of a tile is raised by run(), the pool survives
+    """
+    pool = TilePool( 2)
+    def f( tile):
+        if tile[0] == 1:
+            raise ValueError( "tile")
+    with pytest.raises( ValueError):
+        pool.run( f, [ ( k, 0, 1, 1) for k in range( 4)])
+    pool.run( lambda tile: None, [ ( 0, 0, 1, 1)])
+
+def test_mandelbrotTile():
+    """
+    the tiles give the same escape counts as one masked call
+    """
+    mandelbrotCython = pytest.importorskip( "mandelbrotCython")
+    width = 96
+    ( xmin, ymin, dx) = ( -2., -1.5, 3./width)
+    todo = np.ones(( width, width), dtype=np.uint8)
+    escapeCount = np.zeros(( width, width), dtype=np.int32)
+    zAbs = np.zeros(( width, width), dtype=np.float64)
+    mandelbrotCython.compute_mandelbrot_masked( xmin, dx, ymin, dx, 0, 0, 256, 4., 
+                                                todo, escapeCount, zAbs)
+    tiled = np.zeros_like( escapeCount)
+    zAbsTiled = np.zeros_like( zAbs)
+    pool = TilePool( 3)
+    pool.run( lambda tile: mandelbrotTiled.mandelbrotTile( tile, xmin, dx, ymin, dx, 0, 0, 256, 4., 
+                                                          todo, tiled, zAbsTiled), 
+              mandelbrotTiled.makeTiles( width, width, 32))
+    assert np.array_equal( tiled, escapeCount)
+    assert np.array_equal( zAbsTiled, zAbs)
@@ -9,7 +9,7 @@ import numpy as np
 from PIL import Image
 from PIL import PngImagePlugin
 import os, hashlib, time
-import mandelbrot, dynamicOperators
+import mandelbrot, dynamicOperators, mandelbrotDeep
 import inspect
 import MPLViewer, PGViewer
 
@@ -1188,14 +1188,20 @@ def readPng( fName,
     if calledFromObj.name == "MBSMainWindow":
         print( "")
         print( "Reading Mandelbrot parameters") 
-        MBSObj.cxM = float( hsh[ 'cxM'])
-        print( "  cxM: %g " % MBSObj.cxM)
+        #
+        # cxM, cyM, deltaM are decimal strings, deep places need all digits
+        #
+        MBSObj.cxMStr = hsh[ 'cxM']
+        MBSObj.cxM = mandelbrotDeep.decimalToFloat( hsh[ 'cxM'])
+        print( "  cxM: %s " % MBSObj.cxMStr)
         del hsh[ 'cxM'] 
-        MBSObj.cyM = float( hsh[ 'cyM'])
-        print( "  cyM: %g " % MBSObj.cyM)
+        MBSObj.cyMStr = hsh[ 'cyM']
+        MBSObj.cyM = mandelbrotDeep.decimalToFloat( hsh[ 'cyM'])
+        print( "  cyM: %s " % MBSObj.cyMStr)
         del hsh[ 'cyM'] 
-        MBSObj.deltaM = float( hsh[ 'deltaM'])
-        print( "  deltaM: %g " % MBSObj.deltaM)
+        MBSObj.deltaMStr = hsh[ 'deltaM']
+        MBSObj.deltaM = mandelbrotDeep.decimalToFloat( hsh[ 'deltaM'], mandelbrotDeep.DELTA_MIN)
+        print( "  deltaM: %s " % MBSObj.deltaMStr)
         del hsh[ 'deltaM'] 
         MBSObj.widthM = int( hsh[ 'widthM'])
         print( "  widthM: %g " % MBSObj.widthM)
@@ -1364,8 +1370,12 @@ def writePng( midFix = None,
     if MBSObj is not None: 
         print( "Mandelbrot parameters")
         for elm in mandelbrot.METADATA_MEMBERS:
-            meta.add_text( elm, str( getattr( MBSObj, elm)))
-            print( "  %14s : %s" % ( elm, str( getattr( MBSObj, elm))))
+            if elm in mandelbrotDeep.DECIMAL_MEMBERS:
+                temp = mandelbrotDeep.decimalMember( MBSObj, elm)
+            else:
+                temp = str( getattr( MBSObj, elm))
+            meta.add_text( elm, temp)
+            print( "  %14s : %s" % ( elm, temp))
         
     print( "ColorPars")
     for elm in COLORPARS_METADATA_MEMBERS: